@@ -1,38 +1,40 @@
 import streamlit as st
-import folium
 import geopandas as gpd
 import pandas as pd
 from streamlit_folium import folium_static
 import os
-from datetime import datetime, timedelta
-import shapely
-from shapely.ops import unary_union
+from datetime import datetime
 import random
+import uuid
+
+import coverage
+import coverage_api
+import coverage_index
+import coverage_summary
+import data_store
+import footprint_catalog
+import map_render
+import prefetch
+import profiling
+import tile_server
+from config import base_dir, satellite_configs, aoi_file, landsat8_file, landsat9_file, commercial_file
 
 # Add a title for better UI
 st.title("Saudi Arabia EEZ Satellite Coverage Map")
 
-base_dir = r'.'
 summary_csv_path = os.path.join(base_dir, "satellite_frame_summary.csv")  # Update to your CSV file location
 
 # Sidebar navigation
 page = st.sidebar.selectbox("Choose a page", ["Map View", "Summary Table"])
 
-if page == "Map View":
-    # Define satellite configurations (file path and revisit frequency in days)
-    satellite_configs = [
-        {'file': os.path.join(base_dir, 'S1A_intersected_aoi.geojson'), 'name': 'Sentinel-1A', 'revisit_frequency': 12},
-        {'file': os.path.join(base_dir, 'S1C_intersected_aoi.geojson'), 'name': 'Sentinel-1C', 'revisit_frequency': 12},
-        {'file': os.path.join(base_dir, 'S2A_intersected_aoi.geojson'), 'name': 'Sentinel-2A', 'revisit_frequency': 10},
-        {'file': os.path.join(base_dir, 'S2B_intersected_aoi.geojson'), 'name': 'Sentinel-2B', 'revisit_frequency': 10},
-        {'file': os.path.join(base_dir, 'S2C_intersected_aoi.geojson'), 'name': 'Sentinel-2C', 'revisit_frequency': 10},
-    ]
-
-    # AOI and Landsat files
-    aoi_file = os.path.join(base_dir, 'saudi_arabia_eez.geojson')
-    landsat8_file = os.path.join(base_dir, 'landsat8_august.geojson')
-    landsat9_file = os.path.join(base_dir, 'landsat9_august.geojson')
+# Debug panel: per-stage timings, vertex counts and memory high-water marks of this
+# rerun, shown in the sidebar and appended to profiling.PROFILE_LOG
+debug = st.sidebar.checkbox("Debug: profile this page")
+trace_memory = debug and st.sidebar.checkbox("Trace Python allocations (slower)")
+session_id = st.session_state.setdefault('session_id', uuid.uuid4().hex)
+profiler = profiling.activate(profiling.Profiler(trace_memory) if debug else None, owner=session_id)
 
+if page == "Map View":
     # Define fixed colors for Sentinel and Landsat satellites
     colors = {
         'Sentinel-1A': 'blue',
@@ -50,412 +52,239 @@ if page == "Map View":
         'lightblue', 'lightgreen', 'lightred', 'beige', 'darkpurple', 'cadetblue'
     ]
 
-    # Function to get a random color, ensuring no duplicates for new satellites
-    used_colors = set(colors.values())
-    def get_random_color():
-        available_colors = [c for c in random_colors if c not in used_colors]
-        if not available_colors:
-            return 'gray'  # Fallback if all colors are used
-        color = random.choice(available_colors)
-        used_colors.add(color)
-        return color
-
-    # Load daily GeoJSON files (e.g., august_01.geojson)
-    def load_daily_satellite_data(selected_date, base_dir):
-        date_str = selected_date.strftime('%d')
-        daily_file = os.path.join(base_dir, 'KSA_commercial_coverage', f'august_{date_str}.geojson')
-        if os.path.exists(daily_file):
-            try:
-                gdf = gpd.read_file(daily_file, engine='pyogrio')
-                # Ensure CRS is EPSG:4326
-                if gdf.crs is None or gdf.crs != 'EPSG:4326':
-                    gdf = gdf.set_crs('EPSG:4326', allow_override=True)
-                # Fix invalid geometries
-                gdf['geometry'] = gdf['geometry'].apply(lambda geom: shapely.make_valid(geom) if not geom.is_valid else geom)
-                # Extract date from 'Date' or 'Start' column
-                if 'Date' in gdf.columns:
-                    gdf['acquisition_date'] = pd.to_datetime(gdf['Date'], errors='coerce')
-                elif 'Start' in gdf.columns:
-                    gdf['acquisition_date'] = pd.to_datetime(gdf['Start'], errors='coerce')
-                else:
-                    st.warning(f"No date column found in {daily_file}. Assuming date matches selected date.")
-                    gdf['acquisition_date'] = pd.to_datetime(selected_date)
-                gdf['satellite'] = gdf['Satellite'].fillna('Unknown')
-                return gdf
-            except Exception as e:
-                st.warning(f"Error loading {daily_file}: {str(e)}")
-                return None
-        else:
-            st.warning(f"Daily file {daily_file} not found.")
+    # Color function of one map: fixed colors for Sentinel and Landsat, random
+    # (without duplicates) for daily satellites
+    def satellite_colors():
+        used_colors = set(colors.values())
+        daily_satellite_colors = {}
+
+        # Function to get a random color, ensuring no duplicates for new satellites
+        def get_random_color():
+            available_colors = [c for c in random_colors if c not in used_colors]
+            if not available_colors:
+                return 'gray'  # Fallback if all colors are used
+            color = random.choice(available_colors)
+            used_colors.add(color)
+            return color
+
+        def satellite_color(satellite):
+            if satellite in colors:
+                return colors[satellite]
+            if satellite not in daily_satellite_colors:
+                daily_satellite_colors[satellite] = get_random_color()
+            return daily_satellite_colors[satellite]
+        return satellite_color
+
+    # Load the commercial coverage of a date (footprint store partition or daily
+    # GeoJSON file, e.g. august_01.geojson). The source loaders add their messages to
+    # 'notices' as (level, message), so results computed in the background can show
+    # them when they are displayed.
+    def load_daily_satellite_data(selected_date, notices):
+        daily_file = commercial_file(selected_date)
+        try:
+            gdf = data_store.load_commercial_day(selected_date)
+        except Exception as e:
+            notices.append(('warning', f"Error loading {daily_file}: {str(e)}"))
+            return None
+        if gdf is None:
+            notices.append(('warning', f"Daily file {daily_file} not found."))
             return None
+        if 'Date' not in gdf.columns and 'Start' not in gdf.columns:
+            notices.append(('warning', f"No date column found in {daily_file}. Assuming date matches selected date."))
+        return gdf
 
     # Load satellite data (Sentinel-1A/1C, Sentinel-2A/2B/2C)
-    def load_satellite_data(configs):
-        all_gdfs = []
+    def load_satellite_data(configs, notices):
         for config in configs:
-            file = config['file']
-            satellite_name = config['name']
-            if os.path.exists(file):
-                try:
-                    gdf = gpd.read_file(file, engine='pyogrio')
-                    if gdf.crs is None or gdf.crs != 'EPSG:4326':
-                        gdf = gdf.set_crs('EPSG:4326', allow_override=True)
-                    gdf['geometry'] = gdf['geometry'].apply(lambda geom: shapely.make_valid(geom) if not geom.is_valid else geom)
-                    gdf['acquisition_date'] = pd.to_datetime(gdf['acquisition_date'], errors='coerce')
-                    gdf['satellite'] = satellite_name
-                    gdf['revisit_frequency'] = config['revisit_frequency']
-                    all_gdfs.append(gdf)
-                except Exception as e:
-                    st.warning(f"Error loading {file}: {str(e)}")
-            else:
-                st.warning(f"File {file} not found.")
-        if not all_gdfs:
-            st.error("No valid satellite GeoJSON files loaded.")
+            if not os.path.exists(config['file']) and data_store.stored_entry(config['file']) is None:
+                notices.append(('warning', f"File {config['file']} not found."))
+        try:
+            sentinel_gdf = data_store.load_sentinel(configs)
+        except Exception as e:
+            notices.append(('warning', f"Error loading satellite data: {str(e)}"))
             return None
-        return gpd.GeoDataFrame(pd.concat(all_gdfs, ignore_index=True))
+        if sentinel_gdf is None:
+            notices.append(('error', "No valid satellite GeoJSON files loaded."))
+        return sentinel_gdf
 
     # Load AOI data
     def load_aoi_data(aoi_file):
-        if os.path.exists(aoi_file):
-            try:
-                aoi_gdf = gpd.read_file(aoi_file, engine='pyogrio')
-                if aoi_gdf.crs is None or aoi_gdf.crs != 'EPSG:4326':
-                    aoi_gdf = aoi_gdf.set_crs('EPSG:4326', allow_override=True)
-                aoi_gdf['geometry'] = aoi_gdf['geometry'].apply(lambda geom: shapely.make_valid(geom) if not geom.is_valid else geom)
-                return aoi_gdf
-            except Exception as e:
-                st.error(f"Error loading AOI file {aoi_file}: {str(e)}")
-                return None
-        else:
+        if not os.path.exists(aoi_file):
             st.error(f"AOI file {aoi_file} not found.")
             return None
+        try:
+            return data_store.load_aoi(aoi_file)
+        except Exception as e:
+            st.error(f"Error loading AOI file {aoi_file}: {str(e)}")
+            return None
 
     # Load Landsat data
-    def load_landsat_data(landsat8_file, landsat9_file):
-        all_landsat_gdfs = []
-        for file, satellite_name in [(landsat8_file, 'LANDSAT-8'), (landsat9_file, 'LANDSAT-9')]:
-            if os.path.exists(file):
-                try:
-                    gdf = gpd.read_file(file, engine='pyogrio')
-                    if gdf.crs is None or gdf.crs != 'EPSG:4326':
-                        gdf = gdf.set_crs('EPSG:4326', allow_override=True)
-                    gdf['geometry'] = gdf['geometry'].apply(lambda geom: shapely.make_valid(geom) if not geom.is_valid else geom)
-                    possible_date_columns = ['acquisition_date', 'Name', 'Description', 'date']
-                    date_column = None
-                    for col in possible_date_columns:
-                        if col in gdf.columns:
-                            date_column = col
-                            break
-                    if date_column:
-                        gdf['acquisition_date'] = pd.to_datetime(gdf[date_column], errors='coerce')
-                        if gdf['acquisition_date'].dropna().empty:
-                            st.warning(f"No valid dates parsed in {file}. Assuming all polygons are valid for August.")
-                    else:
-                        st.warning(f"No date column found in {file}. Assuming all polygons are valid for August.")
-                        gdf['acquisition_date'] = pd.NaT
-                    gdf['satellite'] = satellite_name
-                    all_landsat_gdfs.append(gdf)
-                except Exception as e:
-                    st.error(f"Error loading {file}: {str(e)}")
-            else:
-                st.error(f"Landsat file {file} not found.")
-        if not all_landsat_gdfs:
-            st.error("No valid Landsat GeoJSON files loaded.")
+    def load_landsat_data(landsat8_file, landsat9_file, notices):
+        for file in (landsat8_file, landsat9_file):
+            if not os.path.exists(file) and data_store.stored_entry(file) is None:
+                notices.append(('error', f"Landsat file {file} not found."))
+        try:
+            landsat_gdf = data_store.load_landsat(landsat8_file, landsat9_file)
+        except Exception as e:
+            notices.append(('error', f"Error loading Landsat data: {str(e)}"))
             return None
-        return gpd.GeoDataFrame(pd.concat(all_landsat_gdfs, ignore_index=True))
+        if landsat_gdf is None:
+            notices.append(('error', "No valid Landsat GeoJSON files loaded."))
+        elif landsat_gdf['acquisition_date'].dropna().empty:
+            notices.append(('warning', "No valid dates parsed in Landsat files. Assuming all polygons are valid for August."))
+        return landsat_gdf
 
     # Load data
-    aoi_data = load_aoi_data(aoi_file)
+    with profiling.stage('load AOI'):
+        aoi_data = load_aoi_data(aoi_file)
     if aoi_data is None:
         st.stop()
 
-    # Calculate original AOI area (in square kilometers)
-    original_area = aoi_data.to_crs(epsg=32637).geometry.area.sum() / 1_000_000  # UTM for accuracy
-
-    # Date picker
+    # Date picker, over every date with commercial coverage (see footprint_store.py)
+    first_date, last_date = data_store.commercial_date_range()
     selected_date = st.date_input(
         "Select Date",
-        value=datetime(2025, 8, 1).date(),
-        min_value=datetime(2025, 8, 1).date(),
-        max_value=datetime(2025, 8, 31).date()
+        value=min(max(datetime(2025, 8, 1).date(), first_date), last_date),
+        min_value=first_date,
+        max_value=last_date
     )
 
-    # Load daily satellite data
-    daily_data = load_daily_satellite_data(selected_date, base_dir)
-
-    # Load Sentinel data
-    sentinel_data = load_satellite_data(satellite_configs)
-
-    # Load Landsat data
-    landsat_data = load_landsat_data(landsat8_file, landsat9_file)
-
-    # Create Folium map
-    m = folium.Map(location=[22.45276, 40.48313], zoom_start=6)
-
-    # Dictionary to store colors for daily satellites
-    daily_satellite_colors = {}
-
-    # Lists to store table data and frame counts
+    # Map rendering: one layer per satellite (simplified for the map zoom), one per
+    # frame, or PNG tiles from the local tile server (tile_server.py)
+    render_mode = st.sidebar.radio(
+        "Map rendering",
+        map_render.RENDER_MODES,
+        format_func=lambda mode: {
+            'layer': 'One layer per satellite',
+            'frame': 'One layer per frame',
+            'tiles': 'Tile overlay (local server)',
+        }[mode]
+    )
+    if render_mode == 'tiles' and not tile_server.ensure_server():
+        st.info(f"Tile port {tile_server.TILE_PORT} is in use; assuming a tile server (python tile_server.py) is running there.")
+
+    # Coverage and map of a date, for a key (date, render mode, satellites switched
+    # off, source fingerprint): a lookup in the precomputed index when it is current
+    # (see coverage_index.py), otherwise computed from the source files. The same
+    # function runs here and in the prefetcher's background thread (see prefetch.py),
+    # which stops at the next stage once 'cancelled' turns true.
+    def map_view_result(key, cancelled):
+        selected_date, render_mode, excluded_satellites, _ = key
+        notices = []
+
+        def load_sources():
+            with profiling.stage('load sources'):
+                return {
+                    # Load daily satellite data
+                    'daily_data': load_daily_satellite_data(selected_date, notices),
+                    # Load Sentinel data
+                    'sentinel_data': load_satellite_data(satellite_configs, notices),
+                    # Load Landsat data
+                    'landsat_data': load_landsat_data(landsat8_file, landsat9_file, notices),
+                }
+
+        def check_cancelled():
+            if cancelled():
+                raise prefetch.Cancelled()
+
+        day = None
+        sources = None
+        with profiling.stage('index lookup'):
+            if coverage_index.index_is_current(aoi_file=aoi_file):
+                day = coverage_index.lookup_day(selected_date)
+        if day is None:
+            sources = load_sources()
+            check_cancelled()
+            # Frames are looked up in the shared footprint catalog (date and satellite
+            # indexes) instead of scanning the loaded sources
+            with profiling.stage('footprint catalog'):
+                catalog = footprint_catalog.shared_catalog()
+            with profiling.stage('compute coverage'):
+                day = coverage.compute_day(aoi_data, selected_date=selected_date, catalog=catalog, **sources)
+
+        # Satellites switched off are recomputed with the memoizing backend, which
+        # reuses every satellite union it has already built
+        available_satellites = list(dict.fromkeys(day['satellites']['satellite']))
+        counted_satellites = [s for s in available_satellites if s not in excluded_satellites]
+        if len(counted_satellites) < len(available_satellites):
+            check_cancelled()
+            sources = sources or load_sources()
+            with profiling.stage('compute coverage (selected satellites)'):
+                day = coverage.compute_day(
+                    aoi_data,
+                    selected_date=selected_date,
+                    satellites=set(counted_satellites),
+                    catalog=footprint_catalog.shared_catalog(),
+                    **sources
+                )
+
+        # Create Folium map (see map_render.py for the rendering modes)
+        check_cancelled()
+        with profiling.stage('build map'):
+            tile_layers = tile_server.tile_layers(selected_date, excluded_satellites & set(available_satellites))
+            m = map_render.build_map(day, satellite_colors(), mode=render_mode, tile_layers=tile_layers)
+        return {'day': day, 'map': m, 'available_satellites': available_satellites, 'notices': notices}
+
+    # Satellites counted in coverage: the ones switched off stay off when the date
+    # changes, so the neighbouring dates can be prefetched with the same selection
+    excluded_satellites = st.session_state.get('excluded_satellites', frozenset())
+    prefetcher = prefetch.shared_prefetcher()
+    with profiling.stage('prefetched result'):
+        result = prefetcher.get((selected_date, render_mode, excluded_satellites, tile_server.source_key(selected_date)),
+                                map_view_result)
+    available_satellites = result['available_satellites']
+    counted_satellites = st.sidebar.multiselect(
+        "Satellites counted in coverage",
+        available_satellites,
+        default=[s for s in available_satellites if s not in excluded_satellites]
+    )
+    selected_excluded = frozenset(s for s in available_satellites if s not in counted_satellites)
+    if selected_excluded != excluded_satellites & set(available_satellites):
+        excluded_satellites = (excluded_satellites - set(available_satellites)) | selected_excluded
+        st.session_state['excluded_satellites'] = excluded_satellites
+        result = prefetcher.get((selected_date, render_mode, excluded_satellites, tile_server.source_key(selected_date)),
+                                map_view_result)
+    profiling.record('prefetch', dict(prefetcher.stats))
+    day, m = result['day'], result['map']
+    for level, message in result['notices']:
+        getattr(st, level)(message)
+    for message in day['warnings']:
+        st.warning(message)
+
+    # Modified AOI: the part of the AOI not covered by any frame
+    modified_aoi = aoi_data.copy()
+    modified_aoi['geometry'] = gpd.GeoSeries(day['residual'], index=modified_aoi.index, crs='EPSG:4326')
+
+    # List to store table data
     table_data = []
-    free_frames = []
-    commercial_frames = []
-
-    # Add Sentinel polygons
-    if sentinel_data is not None:
-        modified_aoi = aoi_data.copy()  # Initialize here to avoid reinitialization
-        for satellite in sentinel_data['satellite'].unique():
-            feature_group = folium.FeatureGroup(name=satellite, show=True)
-            sat_data = sentinel_data[sentinel_data['satellite'] == satellite]
-            revisit_frequency = sat_data['revisit_frequency'].iloc[0]
-            reference_date = sat_data['acquisition_date'].min().date()
-            selected_date_dt = pd.to_datetime(selected_date).date()
-            delta_days = (selected_date_dt - reference_date).days
-            cycle_offset = delta_days % revisit_frequency
-            target_date = reference_date + timedelta(days=int(cycle_offset))
-            filtered_data = sat_data[sat_data['acquisition_date'].dt.date == target_date]
-            if not filtered_data.empty:
-                try:
-                    sat_union = filtered_data.geometry.unary_union
-                    modified_aoi['geometry'] = modified_aoi['geometry'].difference(sat_union)
-                    modified_aoi['geometry'] = modified_aoi['geometry'].apply(lambda geom: shapely.make_valid(geom) if not geom.is_valid else geom)
-                    # Collect free frames
-                    free_frames.extend(filtered_data.geometry.tolist())
-                except Exception as e:
-                    st.warning(f"Error computing union for {satellite} on {target_date}: {str(e)}")
-            frame_count = len(filtered_data)
-            sensor = sat_data.get('Instrument', 'C-SAR' if 'Sentinel-1' in satellite else 'MSI').iloc[0] if 'Instrument' in sat_data.columns else ('C-SAR' if 'Sentinel-1' in satellite else 'MSI')
-            for _, row in filtered_data.iterrows():
-                if row['geometry'].is_valid and not row['geometry'].is_empty:
-                    # Calculate area covered by this frame
-                    intersection = aoi_data.geometry.intersection(row['geometry'])
-                    intersection = intersection.apply(lambda geom: shapely.make_valid(geom) if not geom.is_valid else geom)
-                    area_covered = intersection.to_crs(epsg=32637).geometry.area.sum() / 1_000_000  # km²
-                    percentage_covered = (area_covered / original_area) * 100 if original_area > 0 else 0.0
-                    timestamp = f"{row['begin']} to {row['end']}" if pd.notna(row.get('begin')) and pd.notna(row.get('end')) else 'Unknown'
-                    table_data.append({
-                        'Satellite': satellite,
-                        'Number of Frames': frame_count,
-                        'Timestamp': timestamp,
-                        'Sensor': sensor,
-                        'Area Covered (km²)': round(area_covered, 2),
-                        'Percentage Covered (%)': round(percentage_covered, 2)
-                    })
-                    folium.GeoJson(
-                        row['geometry'],
-                        style_function=lambda x, color=colors[satellite]: {
-                            'fillColor': color,
-                            'color': 'white',  # Border matches fill for Sentinel
-                            'weight': 2,
-                            'fillOpacity': 0.5
-                        },
-                        popup=folium.Popup(
-                            f"{satellite}<br>Date: {row['acquisition_date'].strftime('%Y-%m-%d')}<br>"
-                            f"Time: {timestamp}"
-                        )
-                    ).add_to(feature_group)
-            feature_group.add_to(m)
-
-    # Add Landsat polygons if in August
-    if landsat_data is not None and selected_date.month == 8:
-        landsat_feature_group = folium.FeatureGroup(name='Landsat', show=True)
-        filtered_landsat = landsat_data[landsat_data['acquisition_date'].dt.date == selected_date]
-        if filtered_landsat.empty and not landsat_data['acquisition_date'].isna().all():
-            st.warning(f"No Landsat coverage found for {selected_date}.")
-        else:
-            filtered_landsat = landsat_data if landsat_data['acquisition_date'].isna().all() else filtered_landsat
-            if not filtered_landsat.empty:
-                try:
-                    landsat_union = filtered_landsat.geometry.unary_union
-                    modified_aoi['geometry'] = modified_aoi['geometry'].difference(landsat_union)
-                    modified_aoi['geometry'] = modified_aoi['geometry'].apply(lambda geom: shapely.make_valid(geom) if not geom.is_valid else geom)
-                    # Collect free frames
-                    free_frames.extend(filtered_landsat.geometry.tolist())
-                except Exception as e:
-                    st.warning(f"Error computing union for Landsat on {selected_date}: {str(e)}")
-            frame_count = len(filtered_landsat)
-            for _, row in filtered_landsat.iterrows():
-                if row['geometry'].is_valid and not row['geometry'].is_empty:
-                    # Calculate area covered by this frame
-                    intersection = aoi_data.geometry.intersection(row['geometry'])
-                    intersection = intersection.apply(lambda geom: shapely.make_valid(geom) if not geom.is_valid else geom)
-                    area_covered = intersection.to_crs(epsg=32637).geometry.area.sum() / 1_000_000  # km²
-                    percentage_covered = (area_covered / original_area) * 100 if original_area > 0 else 0.0
-                    timestamp = row['acquisition_date'].strftime('%H:%M:%S') if pd.notna(row['acquisition_date']) else 'Unknown'
-                    sensor = row.get('Instrument', 'OLI/TIRS') if 'Instrument' in row else 'OLI/TIRS'
-                    table_data.append({
-                        'Satellite': row['satellite'],
-                        'Number of Frames': frame_count,
-                        'Timestamp': timestamp,
-                        'Sensor': sensor,
-                        'Area Covered (km²)': round(area_covered, 2),
-                        'Percentage Covered (%)': round(percentage_covered, 2)
-                    })
-                    folium.GeoJson(
-                        row['geometry'],
-                        style_function=lambda x, sat=row['satellite']: {
-                            'fillColor': colors[sat],
-                            'color': 'white',  # White border for Landsat
-                            'weight': 2,
-                            'fillOpacity': 0.5
-                        },
-                        popup=folium.Popup(
-                            f"{row['satellite']}<br>Date: {row['acquisition_date'].strftime('%Y-%m-%d') if pd.notna(row['acquisition_date']) else 'Unknown'}"
-                        )
-                    ).add_to(landsat_feature_group)
-            landsat_feature_group.add_to(m)
-
-    # Add daily satellite polygons (e.g., SAOCOM-1A, SAOCOM-1B)
-    if daily_data is not None:
-        for satellite in daily_data['satellite'].unique():
-            # Assign random color for non-Sentinel/Landsat satellites
-            if satellite not in colors:
-                daily_satellite_colors[satellite] = get_random_color()
-            feature_group = folium.FeatureGroup(name=satellite, show=True)
-            sat_data = daily_data[daily_data['satellite'] == satellite]
-            filtered_data = sat_data[sat_data['acquisition_date'].dt.date == selected_date]
-            if not filtered_data.empty:
-                try:
-                    sat_union = filtered_data.geometry.unary_union
-                    modified_aoi['geometry'] = modified_aoi['geometry'].difference(sat_union)
-                    modified_aoi['geometry'] = modified_aoi['geometry'].apply(lambda geom: shapely.make_valid(geom) if not geom.is_valid else geom)
-                    # Collect commercial frames
-                    commercial_frames.extend(filtered_data.geometry.tolist())
-                except Exception as e:
-                    st.warning(f"Error computing union for {satellite} on {selected_date}: {str(e)}")
-            frame_count = len(filtered_data)
-            sensor = sat_data.get('Sensor', 'Unknown').iloc[0] if 'Sensor' in sat_data.columns else 'Unknown'
-            for _, row in filtered_data.iterrows():
-                if row['geometry'].is_valid and not row['geometry'].is_empty:
-                    # Handle Start and End as Timestamp or string
-                    start_time = 'Unknown'
-                    end_time = 'Unknown'
-                    if 'Start' in row and pd.notna(row['Start']):
-                        if isinstance(row['Start'], str):
-                            try:
-                                start_time = row['Start'].split('T')[1].split('.')[0] if 'T' in row['Start'] else pd.to_datetime(row['Start']).strftime('%H:%M:%S')
-                            except:
-                                start_time = 'Invalid'
-                        else:
-                            start_time = pd.to_datetime(row['Start']).strftime('%H:%M:%S')
-                    if 'End' in row and pd.notna(row['End']):
-                        if isinstance(row['End'], str):
-                            try:
-                                end_time = row['End'].split('T')[1].split('.')[0] if 'T' in row['End'] else pd.to_datetime(row['End']).strftime('%H:%M:%S')
-                            except:
-                                end_time = 'Invalid'
-                        else:
-                            end_time = pd.to_datetime(row['End']).strftime('%H:%M:%S')
-                    timestamp = f"{start_time} to {end_time}"
-                    # Calculate area covered by this frame
-                    intersection = aoi_data.geometry.intersection(row['geometry'])
-                    intersection = intersection.apply(lambda geom: shapely.make_valid(geom) if not geom.is_valid else geom)
-                    area_covered = intersection.to_crs(epsg=32637).geometry.area.sum() / 1_000_000  # km²
-                    percentage_covered = (area_covered / original_area) * 100 if original_area > 0 else 0.0
-                    table_data.append({
-                        'Satellite': satellite,
-                        'Number of Frames': frame_count,
-                        'Timestamp': timestamp,
-                        'Sensor': sensor,
-                        'Area Covered (km²)': round(area_covered, 2),
-                        'Percentage Covered (%)': round(percentage_covered, 2)
-                    })
-                    folium.GeoJson(
-                        row['geometry'],
-                        style_function=lambda x, color=daily_satellite_colors.get(satellite, colors.get(satellite, 'gray')): {
-                            'fillColor': color,
-                            'color': 'white',  # White border for daily satellites
-                            'weight': 2,
-                            'fillOpacity': 0.5
-                        },
-                        popup=folium.Popup(
-                            f"{satellite}<br>Date: {row['acquisition_date'].strftime('%Y-%m-%d')}<br>"
-                            f"Time: {timestamp}"
-                        )
-                    ).add_to(feature_group)
-            feature_group.add_to(m)
-
-    # Add modified AOI to the map
-    aoi_feature_group = folium.FeatureGroup(name='AOI (Saudi Arabia EEZ)', show=True)
-    for _, row in modified_aoi.iterrows():
-        if not row['geometry'].is_empty and row['geometry'].is_valid:
-            folium.GeoJson(
-                row['geometry'],
-                style_function=lambda x: {
-                    'fillColor': 'yellow',
-                    'color': 'white',  # White border for AOI
-                    'weight': 2,
-                    'fillOpacity': 0.3
-                },
-                popup=folium.Popup("Saudi Arabia EEZ")
-            ).add_to(aoi_feature_group)
-    aoi_feature_group.add_to(m)
-
-    # Add layer control
-    folium.LayerControl(collapsed=False).add_to(m)
-
-    # Calculate modified AOI area (in square kilometers)
-    modified_area = modified_aoi.to_crs(epsg=32637).geometry.area.sum() / 1_000_000
-
-    # Calculate overall covered percentage
-    if original_area > 0:
-        covered_percentage = (1 - modified_area / original_area) * 100
-    else:
-        covered_percentage = 0.0
-        st.warning("Original AOI area is zero or invalid, cannot compute coverage percentage.")
-
-    # Calculate free and commercial frame stats
+    frames = day['frames']
+    with profiling.stage('detail table'):
+        for sat in day['satellites'].itertuples(index=False):
+            sat_frames = frames[(frames['satellite'] == sat.satellite) & (frames['source'] == sat.source)]
+            for row in sat_frames.itertuples(index=False):
+                if row.geometry is None or row.geometry.is_empty or not row.geometry.is_valid:
+                    continue
+                table_data.append({
+                    'Satellite': sat.satellite,
+                    'Number of Frames': sat.frame_count,
+                    'Timestamp': row.timestamp,
+                    'Sensor': sat.sensor,
+                    'Area Covered (km²)': round(row.area_km2, 2),
+                    'Percentage Covered (%)': round(row.percentage, 2)
+                })
+
+    # Overall covered percentage
+    covered_percentage = day['covered_percentage']
+
+    # Free (Sentinel + Landsat) and commercial (daily satellites) frame stats
     frame_summary = []
-    # Free frames (Sentinel + Landsat)
-    free_frame_count = len(free_frames)
-    if free_frame_count > 0:
-        try:
-            if len(free_frames) > 1:
-                free_union = unary_union(free_frames)
-            else:
-                free_union = free_frames[0]
-            free_intersection = aoi_data.geometry.intersection(free_union)
-            free_intersection = free_intersection.apply(lambda geom: shapely.make_valid(geom) if not geom.is_valid else geom)
-            free_area_covered = free_intersection.to_crs(epsg=32637).geometry.area.sum() / 1_000_000
-            free_percentage = (free_area_covered / original_area) * 100 if original_area > 0 else 0.0
-        except Exception as e:
-            st.warning(f"Error computing free frames union: {str(e)}")
-            free_area_covered = 0.0
-            free_percentage = 0.0
-    else:
-        free_area_covered = 0.0
-        free_percentage = 0.0
-    frame_summary.append({
-        'Frame Type': 'Free (Sentinel + Landsat)',
-        'Total Frames': free_frame_count,
-        'Total Area Covered (km²)': round(free_area_covered, 2),
-        'Percentage Covered (%)': round(free_percentage, 2)
-    })
-
-    # Commercial frames (Daily satellites)
-    commercial_frame_count = len(commercial_frames)
-    if commercial_frame_count > 0:
-        try:
-            if len(commercial_frames) > 1:
-                commercial_union = unary_union(commercial_frames)
-            else:
-                commercial_union = commercial_frames[0]
-            commercial_intersection = aoi_data.geometry.intersection(commercial_union)
-            commercial_intersection = commercial_intersection.apply(lambda geom: shapely.make_valid(geom) if not geom.is_valid else geom)
-            commercial_area_covered = commercial_intersection.to_crs(epsg=32637).geometry.area.sum() / 1_000_000
-            commercial_percentage = (commercial_area_covered / original_area) * 100 if original_area > 0 else 0.0
-        except Exception as e:
-            st.warning(f"Error computing commercial frames union: {str(e)}")
-            commercial_area_covered = 0.0
-            commercial_percentage = 0.0
-    else:
-        commercial_area_covered = 0.0
-        commercial_percentage = 0.0
-    frame_summary.append({
-        'Frame Type': 'Commercial (Daily Satellites)',
-        'Total Frames': commercial_frame_count,
-        'Total Area Covered (km²)': round(commercial_area_covered, 2),
-        'Percentage Covered (%)': round(commercial_percentage, 2)
-    })
+    for row in coverage_api.frame_summary(day):
+        frame_summary.append({
+            'Frame Type': row['label'],
+            'Total Frames': row['frames'],
+            'Total Area Covered (km²)': round(row['area_km2'], 2),
+            'Percentage Covered (%)': round(row['percentage'], 2)
+        })
 
     # Center the map in the browser
     # st.markdown(
@@ -483,11 +312,26 @@ if page == "Map View":
 
     # Wrap map in a centered div
     st.markdown('<div style="display: flex; justify-content: center; width: 100%; margin: 0 auto;">', unsafe_allow_html=True)
-    folium_static(m, width=1000, height=600)
+    with profiling.stage('folium_static'):
+        folium_static(m, width=1000, height=600)
     st.markdown('</div>', unsafe_allow_html=True)
 
+    # Compute the neighbouring dates in the background while this one is shown; this
+    # session's jobs for dates it no longer needs are cancelled
+    prefetcher.schedule(
+        [(neighbour, render_mode, excluded_satellites, tile_server.source_key(neighbour))
+         for neighbour in prefetch.neighbour_dates(selected_date, first_date=first_date, last_date=last_date)],
+        map_view_result,
+        owner=session_id
+    )
+
     # Display overall covered percentage
     st.metric("AOI Coverage", f"{covered_percentage:.2f}%")
+    error_bound = data_store.simplification_error_km2(
+        [aoi_file, landsat8_file, landsat9_file] + [sat_config['file'] for sat_config in satellite_configs])
+    if error_bound > 0:
+        st.caption(f"Computed on simplified geometries: areas are within {error_bound:.1f} km² of the "
+                   f"full-resolution result (see simplify.py).")
 
     # Display table of satellite details
     st.subheader("Satellite Coverage Details")
@@ -512,14 +356,64 @@ if page == "Map View":
             st.success(f"Modified AOI saved as {output_file}")
         except Exception as e:
             st.error(f"Error saving AOI: {str(e)}")
+
+    # Debug panel
+    if profiler is not None:
+        with st.sidebar.expander("Profile of this rerun", expanded=True):
+            st.dataframe(profiler.stage_table().round(3), use_container_width=True)
+            st.write(profiler.counts)
+            st.caption(f"Process memory high-water mark: {profiling.max_rss_mib():.0f} MiB")
+        try:
+            profiler.write_log(page=page, date=selected_date, render_mode=render_mode)
+        except OSError as e:
+            st.sidebar.warning(f"Could not write the profile log: {e}")
 elif page == "Summary Table":
     st.title("Satellite Frame Summary")
-    
-    if os.path.exists(summary_csv_path):
+
+    # Frame and coverage summary aggregated live from the footprint catalog for the
+    # chosen dates, satellites and AOI (see coverage_summary.py); days already
+    # aggregated by this process are not processed again
+    first_date, last_date = data_store.commercial_date_range()
+    date_range = st.date_input(
+        "Date range",
+        value=(first_date, last_date),
+        min_value=first_date,
+        max_value=last_date
+    )
+    aoi_choices = coverage_summary.aoi_choices()
+    aoi_label = st.selectbox("AOI", list(aoi_choices))
+    try:
+        with profiling.stage('footprint catalog'):
+            summary = coverage_summary.shared_summary()
+        summary_aoi = data_store.load_aoi(aoi_choices[aoi_label])
+    except Exception as e:
+        summary = None
+        st.error(f"Failed to load the footprint data: {e}")
+
+    if summary is not None:
+        satellite_sources = summary.catalog.satellite_sources()
+        satellites = st.multiselect("Satellites", list(satellite_sources), default=list(satellite_sources))
+        if len(date_range) == 2:
+            start_date, end_date = date_range
+            progress = st.progress(0.0, text="Aggregating...")
+            with profiling.stage('summary'):
+                df = summary.summary(
+                    summary_aoi, start_date, end_date, satellites,
+                    progress=lambda done, total: progress.progress(done / total, text=f"Aggregating day {done}/{total}")
+                )
+            progress.empty()
+            st.dataframe(df.round(2), use_container_width=True)
+            st.caption(f"Frames intersecting {aoi_label} from {start_date} to {end_date}. Areas are counted on a "
+                       f"{summary.resolution_m / 1000:g} km equal-area grid; the unique area of a satellite is the "
+                       f"part of the AOI no other selected satellite covered.")
+        else:
+            st.info("Select the last date of the range.")
+    # Summary the notebook last exported, when the footprint data cannot be loaded
+    elif os.path.exists(summary_csv_path):
         try:
             df = pd.read_csv(summary_csv_path)
             st.dataframe(df)
         except Exception as e:
             st.error(f"Failed to load summary CSV: {e}")
     else:
-        st.warning(f"Summary CSV file not found at: {summary_csv_path}")
\ No newline at end of file
+        st.warning(f"Summary CSV file not found at: {summary_csv_path}")
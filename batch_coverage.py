@@ -0,0 +1,269 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+import pandas as pd
+
+import clip_plans
+import config
+import coverage
+import coverage_index
+import data_store
+import raster_coverage
+
+# Batch coverage for a date range and AOI, outside the app. Days are spread across
+# a process pool (each worker loads the AOI, Sentinel and Landsat data once) and
+# every finished day is appended to a store in the output directory right away, so
+# an interrupted run resumes with the days still missing. Each stored day carries the
+# fingerprint of the source files it was computed from (see source_key); a day whose
+# sources changed since is computed again. The report CSVs (see
+# coverage_index.write_reports) are written from the store at the end.
+OUTPUT_DIR = os.path.join(config.base_dir, 'batch_reports')
+
+# Store formats: 'csv' appends to days.csv / satellites.csv, 'parquet' writes one
+# file per day to days/ and satellites/
+STORE_FORMATS = ['csv', 'parquet']
+
+# Bump when the stored columns or the coverage computation change
+BATCH_VERSION = 3
+
+DAY_COLUMNS = [
+    'date', 'original_area_km2', 'free_frames', 'commercial_frames', 'free_area_km2',
+    'commercial_area_km2', 'combined_area_km2', 'residual_area_km2', 'covered_percentage', 'warnings', 'sources',
+]
+SATELLITE_COLUMNS = [
+    'date', 'position', 'satellite', 'source', 'sensor', 'target_date', 'frame_count',
+    'begin', 'end', 'individual_area_km2', 'union_area_km2',
+]
+
+MAX_WORKERS = os.cpu_count()
+
+# Per-process inputs, set by _init_worker
+_inputs = {}
+
+
+# Sentinel configurations for an AOI: the clipped files in config.py for the default
+# AOI, otherwise the plans clipped to that AOI by clip_plans.py (rebuilt when stale)
+def sentinel_configs(aoi_file, log=print):
+    if os.path.abspath(aoi_file) == os.path.abspath(config.aoi_file):
+        return config.satellite_configs
+    report = clip_plans.clip_all([aoi_file], log=log)
+    outputs = dict(zip(report['satellite'], report['output']))
+    return [dict(sat_config, file=outputs[sat_config['name']]) for sat_config in config.satellite_configs]
+
+
+# Fingerprint of the source files of one date's coverage: the AOI, the Sentinel
+# files of 'configs', Landsat and the date's commercial coverage
+def source_key(selected_date, aoi_file, configs):
+    stamps = coverage_index.source_stamps([selected_date], aoi_file)
+    stamps.update(coverage_index.file_stamps(sat_config['file'] for sat_config in configs))
+    return hashlib.sha256(json.dumps(stamps, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def _init_worker(aoi_file, configs, area_tolerance_km2, backend='vector'):
+    config.area_tolerance_km2 = area_tolerance_km2
+    _inputs['backend'] = raster_coverage.get_backend(backend)
+    _inputs['aoi'] = data_store.load_aoi(aoi_file)
+    _inputs['sentinel'] = data_store.load_sentinel(configs)
+    _inputs['landsat'] = data_store.load_landsat(config.landsat8_file, config.landsat9_file)
+
+
+# Coverage of one date as store rows: (day row, satellite rows)
+def compute_rows(selected_date):
+    day = coverage.compute_day(_inputs['aoi'], _inputs['sentinel'], _inputs['landsat'],
+                               data_store.load_commercial_day(selected_date), selected_date,
+                               backend=_inputs['backend'])
+    key = selected_date.isoformat()
+    # Every column but date, warnings and sources
+    day_row = {column: day[column] for column in DAY_COLUMNS[1:-2]}
+    day_row.update(date=key, warnings=json.dumps(day['warnings']))
+    frames = day['frames']
+    satellite_rows = []
+    for i, row in enumerate(day['satellites'].itertuples(index=False)):
+        sat_frames = frames[frames['satellite'] == row.satellite]
+        first = sat_frames.iloc[0] if len(sat_frames) else None
+        satellite_rows.append({
+            'date': key,
+            'position': i,
+            'satellite': row.satellite,
+            'source': row.source,
+            'sensor': str(row.sensor),
+            'target_date': coverage_index._iso(row.target_date),
+            'frame_count': int(row.frame_count),
+            'begin': coverage_index._iso(first['begin']) if first is not None else None,
+            'end': coverage_index._iso(first['end']) if first is not None else None,
+            'individual_area_km2': row.individual_area_km2,
+            'union_area_km2': row.union_area_km2,
+        })
+    return day_row, satellite_rows
+
+
+# Per-day results on disk, appended as days finish
+class DayStore:
+    def __init__(self, output_dir, store_format='csv'):
+        if store_format not in STORE_FORMATS:
+            raise ValueError(f"Unknown store format {store_format!r}, expected one of {STORE_FORMATS}")
+        self.output_dir = output_dir
+        self.format = store_format
+        self.meta_file = os.path.join(output_dir, 'batch.json')
+
+    def _path(self, table, key=None):
+        if self.format == 'csv':
+            return os.path.join(self.output_dir, f'{table}.csv')
+        return os.path.join(self.output_dir, table, f'{key}.parquet')
+
+    # Check that the store was built for this AOI, coverage version, area tolerance
+    # (see simplify.py) and backend; an empty store (or force) starts over
+    def open(self, aoi_file, force=False, area_tolerance_km2=0, backend='vector'):
+        os.makedirs(self.output_dir, exist_ok=True)
+        meta = {'version': BATCH_VERSION, 'aoi': clip_plans.file_hash(aoi_file), 'format': self.format}
+        if area_tolerance_km2 > 0:
+            meta['area_tolerance_km2'] = area_tolerance_km2
+        if backend != 'vector':
+            meta['backend'] = backend
+        if os.path.exists(self.meta_file) and not force:
+            with open(self.meta_file) as f:
+                stored = json.load(f)
+            if stored != meta:
+                raise ValueError(f"{self.output_dir} holds results for another AOI, version, format, tolerance or backend; "
+                                 f"use another output directory or --force.")
+        else:
+            self.clear()
+        with open(self.meta_file, 'w') as f:
+            json.dump(meta, f, indent=2)
+        # Drop satellite rows of days whose day row never made it (interrupted run)
+        if self.format == 'csv' and os.path.exists(self._path('satellites')):
+            satellites = pd.read_csv(self._path('satellites'))
+            satellites[satellites['date'].isin(list(self.done()))].to_csv(self._path('satellites'), index=False)
+
+    def clear(self):
+        for table in ['days', 'satellites']:
+            if self.format == 'csv':
+                if os.path.exists(self._path(table)):
+                    os.remove(self._path(table))
+            else:
+                directory = os.path.join(self.output_dir, table)
+                for name in os.listdir(directory) if os.path.isdir(directory) else []:
+                    os.remove(os.path.join(directory, name))
+
+    # Dates (ISO strings) already in the store, with the source key of each
+    def done(self):
+        if self.format == 'csv':
+            path = self._path('days')
+            if not os.path.exists(path):
+                return {}
+            days = pd.read_csv(path, usecols=['date', 'sources'], dtype={'sources': str})
+            return dict(zip(days['date'], days['sources']))
+        directory = os.path.join(self.output_dir, 'days')
+        keys = [name[:-len('.parquet')] for name in os.listdir(directory)] if os.path.isdir(directory) else []
+        return {key: pd.read_parquet(self._path('days', key), columns=['sources'])['sources'].iloc[0] for key in keys}
+
+    # Remove some dates (ISO strings) from the store, day rows first
+    def drop(self, keys):
+        keys = set(keys)
+        if not keys:
+            return
+        for table in ['days', 'satellites']:
+            if self.format == 'csv':
+                if os.path.exists(self._path(table)):
+                    rows = pd.read_csv(self._path(table))
+                    rows[~rows['date'].isin(keys)].to_csv(self._path(table), index=False)
+            else:
+                for key in keys:
+                    if os.path.exists(self._path(table, key)):
+                        os.remove(self._path(table, key))
+
+    # Append one day; the day row goes last, so a day only counts as done when complete
+    def append(self, day_row, satellite_rows):
+        tables = [
+            ('satellites', pd.DataFrame(satellite_rows, columns=SATELLITE_COLUMNS)),
+            ('days', pd.DataFrame([day_row], columns=DAY_COLUMNS)),
+        ]
+        for table, df in tables:
+            path = self._path(table, day_row['date'])
+            if self.format == 'csv':
+                df.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                df.to_parquet(path + '.tmp', index=False)
+                os.replace(path + '.tmp', path)
+
+    # Every stored (days, satellites) row, limited to the given dates
+    def read(self, dates):
+        keys = {selected_date.isoformat() for selected_date in dates}
+        if self.format == 'csv':
+            days = pd.read_csv(self._path('days'))
+            satellites = pd.read_csv(self._path('satellites'))
+        else:
+            days = pd.concat([pd.read_parquet(self._path('days', key)) for key in sorted(keys)], ignore_index=True)
+            satellites = pd.concat([pd.read_parquet(self._path('satellites', key)) for key in sorted(keys)],
+                                   ignore_index=True)
+        return days[days['date'].isin(keys)], satellites[satellites['date'].isin(keys)]
+
+
+# Compute every missing date of [start_date, end_date] in a process pool, stream
+# each day into the store and write the reports. Returns the report paths.
+# area_tolerance_km2 selects the simplified AOI and footprint versions used (see
+# simplify.py; config.area_tolerance_km2 by default) and backend the coverage
+# backend (see raster_coverage.BACKENDS).
+def run_batch(start_date, end_date, aoi_file=config.aoi_file, output_dir=OUTPUT_DIR, store_format='csv',
+              workers=MAX_WORKERS, force=False, suffix=None, area_tolerance_km2=None, backend='vector', log=print):
+    if not os.path.exists(aoi_file):
+        raise FileNotFoundError(f"AOI file {aoi_file} not found.")
+    if area_tolerance_km2 is None:
+        area_tolerance_km2 = config.area_tolerance_km2
+    raster_coverage.get_backend(backend)
+    dates = coverage_index.date_range(start_date, end_date)
+    store = DayStore(output_dir, store_format)
+    store.open(aoi_file, force, area_tolerance_km2, backend)
+    configs = sentinel_configs(aoi_file, log)
+    sources = {selected_date.isoformat(): source_key(selected_date, aoi_file, configs) for selected_date in dates}
+    done = store.done()
+    changed = [key for key, stored in done.items() if key in sources and stored != sources[key]]
+    store.drop(changed)
+    pending = [selected_date for selected_date in dates
+               if done.get(selected_date.isoformat()) != sources[selected_date.isoformat()]]
+    log(f"{len(dates) - len(pending)} of {len(dates)} dates already computed, {len(pending)} to go"
+        + (f" ({len(changed)} with changed sources)" if changed else ''))
+
+    if pending:
+        start = time.perf_counter()
+        executor = ProcessPoolExecutor(min(workers or 1, len(pending)), initializer=_init_worker,
+                                       initargs=(aoi_file, configs, area_tolerance_km2, backend))
+        with executor:
+            futures = {executor.submit(compute_rows, selected_date): selected_date for selected_date in pending}
+            for future in as_completed(futures):
+                day_row, satellite_rows = future.result()
+                day_row['sources'] = sources[day_row['date']]
+                store.append(day_row, satellite_rows)
+                log(f"{day_row['date']}: {day_row['free_frames'] + day_row['commercial_frames']} frames, "
+                    f"{day_row['covered_percentage']:.2f}% covered")
+        log(f"Computed {len(pending)} dates in {time.perf_counter() - start:.1f}s")
+
+    days, satellites = store.read(dates)
+    return coverage_index.write_reports(days, satellites, output_dir, suffix)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compute coverage for a date range and write the CSV reports.")
+    parser.add_argument('--start', type=date.fromisoformat, default=date(2025, 8, 1), help="First date (YYYY-MM-DD)")
+    parser.add_argument('--end', type=date.fromisoformat, default=date(2025, 8, 31), help="Last date (YYYY-MM-DD)")
+    parser.add_argument('--aoi', default=config.aoi_file, help="AOI GeoJSON file")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Directory for the per-day store and the reports")
+    parser.add_argument('--format', choices=STORE_FORMATS, default='csv', help="Per-day store format")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--force', action='store_true', help="Recompute every date")
+    parser.add_argument('--suffix', help="Report file name suffix (default: month or date range)")
+    parser.add_argument('--area-tolerance', type=float, default=config.area_tolerance_km2,
+                        help="Largest area error (km²) of the simplified geometries used (0: full resolution)")
+    parser.add_argument('--backend', choices=raster_coverage.BACKENDS, default='vector',
+                        help="Coverage backend: exact polygons or the equal-area grid of raster_coverage.py")
+    args = parser.parse_args()
+
+    for path in run_batch(args.start, args.end, args.aoi, args.output_dir, args.format, args.workers,
+                          args.force, args.suffix, args.area_tolerance, args.backend):
+        print(f"Saved {path}")
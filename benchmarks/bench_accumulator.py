@@ -0,0 +1,73 @@
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import coverage
+import data_store
+
+METRICS = ['free_area_km2', 'commercial_area_km2', 'residual_area_km2']
+
+
+# Time compute_day over a date range with the plain and the memoizing vector
+# backends (cold, then warm), then switch each satellite off in turn on one day
+def run(start_date=date(2025, 8, 1), end_date=date(2025, 8, 31), toggle_date=date(2025, 8, 11)):
+    aoi_gdf = data_store.load_aoi(config.aoi_file)
+    sentinel_data = data_store.load_sentinel(config.satellite_configs)
+    landsat_data = data_store.load_landsat(config.landsat8_file, config.landsat9_file)
+    plain = coverage.VectorBackend()
+    memo = coverage.CoverageAccumulator()
+
+    dates = []
+    day = start_date
+    while day <= end_date:
+        dates.append((day, data_store.load_commercial_day(day)))
+        day += timedelta(days=1)
+
+    times = {'plain': 0.0, 'cold': 0.0, 'warm': 0.0}
+    worst = 0.0
+    for day, daily_data in dates:
+        start = time.perf_counter()
+        expected = coverage.compute_day(aoi_gdf, sentinel_data, landsat_data, daily_data, day, backend=plain)
+        times['plain'] += time.perf_counter() - start
+        start = time.perf_counter()
+        result = coverage.compute_day(aoi_gdf, sentinel_data, landsat_data, daily_data, day, backend=memo)
+        times['cold'] += time.perf_counter() - start
+        worst = max(worst, *(abs(result[metric] - expected[metric]) for metric in METRICS))
+    for day, daily_data in dates:
+        start = time.perf_counter()
+        coverage.compute_day(aoi_gdf, sentinel_data, landsat_data, daily_data, day, backend=memo)
+        times['warm'] += time.perf_counter() - start
+    print(f"{len(dates)} days: plain {times['plain']:.2f} s  memo cold {times['cold']:.2f} s  "
+          f"memo warm {times['warm']:.2f} s  max area difference {worst:.3f} km²  {memo.stats}")
+
+    # Satellite toggles: each satellite off, compared against the plain backend
+    daily_data = data_store.load_commercial_day(toggle_date)
+    full = coverage.compute_day(aoi_gdf, sentinel_data, landsat_data, daily_data, toggle_date, backend=memo)
+    satellites = list(dict.fromkeys(full['satellites']['satellite']))
+    for satellite in satellites:
+        counted = set(satellites) - {satellite}
+        start = time.perf_counter()
+        expected = coverage.compute_day(aoi_gdf, sentinel_data, landsat_data, daily_data, toggle_date,
+                                        backend=plain, satellites=counted)
+        plain_time = time.perf_counter() - start
+        start = time.perf_counter()
+        result = coverage.compute_day(aoi_gdf, sentinel_data, landsat_data, daily_data, toggle_date,
+                                      backend=memo, satellites=counted)
+        memo_time = time.perf_counter() - start
+        difference = max(abs(result[metric] - expected[metric]) for metric in METRICS)
+        print(f"{toggle_date} without {satellite:20s}: covered {result['covered_percentage']:6.2f}%  "
+              f"plain {plain_time:.2f} s  memo {memo_time:.2f} s  difference {difference:.3f} km²")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare the plain and memoizing vector coverage backends')
+    parser.add_argument('--start', type=date.fromisoformat, default=date(2025, 8, 1))
+    parser.add_argument('--end', type=date.fromisoformat, default=date(2025, 8, 31))
+    parser.add_argument('--toggle-date', type=date.fromisoformat, default=date(2025, 8, 11))
+    args = parser.parse_args()
+    run(args.start, args.end, args.toggle_date)
@@ -0,0 +1,80 @@
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import pandas as pd
+import shapely
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import coverage
+import coverage_index
+import data_store
+import footprint_catalog
+
+
+# Whether two selections (as returned by select_frames) hold the same frames
+def same_selections(scan, indexed):
+    if [s[:4] for s in scan] != [s[:4] for s in indexed]:
+        return False
+    for (*_, left), (*_, right) in zip(scan, indexed):
+        left, right = left.reset_index(drop=True), pd.DataFrame(right).reset_index(drop=True)
+        if len(left) != len(right) or list(left.columns) != list(right.columns):
+            return False
+        if not shapely.equals_exact(left.geometry.to_numpy(), right.geometry.to_numpy(), 0).all():
+            return False
+        if not left.drop(columns='geometry').astype(str).equals(right.drop(columns='geometry').astype(str)):
+            return False
+    return True
+
+
+# Frame selection by mask scans (coverage.select_frames) against catalog lookups
+# for every day of a date range, then AOI queries over the whole range
+def run(start_date=date(2025, 8, 1), end_date=date(2025, 8, 31), aoi_files=()):
+    sentinel_data = data_store.load_sentinel(config.satellite_configs)
+    landsat_data = data_store.load_landsat(config.landsat8_file, config.landsat9_file)
+    dates = coverage_index.date_range(start_date, end_date)
+    daily = {day: data_store.load_commercial_day(day) for day in dates}
+
+    start = time.perf_counter()
+    catalog = footprint_catalog.build_catalog(sentinel_data, landsat_data, daily)
+    print(f"Catalog of {len(catalog)} footprints built in {time.perf_counter() - start:.2f} s")
+
+    scan_time = catalog_time = 0.0
+    for day in dates:
+        start = time.perf_counter()
+        scan = coverage.select_frames(sentinel_data, landsat_data, daily[day], day)
+        scan_time += time.perf_counter() - start
+        start = time.perf_counter()
+        indexed = catalog.select_frames(day)
+        catalog_time += time.perf_counter() - start
+        if not same_selections(scan, indexed):
+            raise SystemExit(f"{day}: catalog selection differs from coverage.select_frames")
+    print(f"Frame selection over {len(dates)} days: scan {scan_time * 1000:.1f} ms  "
+          f"catalog {catalog_time * 1000:.1f} ms ({scan_time / catalog_time:.1f}x)")
+
+    for aoi_file in aoi_files:
+        aoi_gdf = data_store.read_geojson(aoi_file)
+        start = time.perf_counter()
+        frames = catalog.query(start_date, end_date, aoi=aoi_gdf)
+        elapsed = time.perf_counter() - start
+        # The same frames as every day's selections filtered by the AOI
+        aoi = shapely.union_all(aoi_gdf.geometry.to_numpy())
+        expected = sum(int(shapely.intersects(aoi, selection[-1]['geometry'].to_numpy()).sum())
+                       for day in dates for selection in catalog.select_frames(day))
+        if len(frames) != expected:
+            raise SystemExit(f"{os.path.basename(aoi_file)}: query returned {len(frames)} frames, expected {expected}")
+        print(f"{os.path.basename(aoi_file)}: {len(frames)} frames from {start_date} to {end_date} "
+              f"in {elapsed * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare mask-scan frame selection with the footprint catalog')
+    parser.add_argument('--start', type=date.fromisoformat, default=date(2025, 8, 1))
+    parser.add_argument('--end', type=date.fromisoformat, default=date(2025, 8, 31))
+    parser.add_argument('--aoi', action='append', default=[], help='AOI file to query (repeatable)')
+    args = parser.parse_args()
+    run(args.start, args.end, args.aoi)
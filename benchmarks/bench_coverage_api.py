@@ -0,0 +1,86 @@
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib.error import URLError
+from urllib.request import urlopen
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Seconds a fresh interpreter takes to import some modules
+def import_time(modules):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', f"import {', '.join(modules)}"], cwd=ROOT, check=True)
+    return time.perf_counter() - start
+
+
+def get_json(url, timeout=600):
+    with urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+# Nearest-rank percentile of a list of values
+def percentile(values, p):
+    values = sorted(values)
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+# Start coverage_api.py in a fresh process, time how long it takes to answer and to
+# warm up, then send every date of a range 'rounds' times from 'clients' threads
+# (the first round computes, the others hit the result cache)
+def run(start_date=date(2025, 8, 1), end_date=date(2025, 8, 14), clients=4, rounds=3, port=8767):
+    print(f"Fresh import: streamlit + folium + geopandas {import_time(['streamlit', 'folium', 'geopandas']):.2f} s, "
+          f"coverage_api {import_time(['coverage_api']):.2f} s")
+
+    base = f'http://127.0.0.1:{port}'
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, 'coverage_api.py', '--port', str(port)], cwd=ROOT,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                get_json(f'{base}/stats', timeout=1)
+                break
+            except (URLError, ConnectionError):
+                time.sleep(0.01)
+        ready = time.perf_counter() - start
+        while not get_json(f'{base}/stats')['startup']['warm']:
+            time.sleep(0.05)
+        print(f"Server answering after {ready:.2f} s, warm after {time.perf_counter() - start:.2f} s")
+
+        days = (end_date - start_date).days + 1
+        urls = [f'{base}/coverage?date={start_date + timedelta(days=k)}' for k in range(days)] * rounds
+        latencies = []
+
+        def fetch(url):
+            started = time.perf_counter()
+            get_json(url)
+            latencies.append(time.perf_counter() - started)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(clients) as executor:
+            list(executor.map(fetch, urls))
+        elapsed = time.perf_counter() - start
+        print(f"{len(urls)} requests from {clients} clients in {elapsed:.2f} s ({len(urls) / elapsed:.1f} req/s); "
+              + ', '.join(f"p{p} {percentile(latencies, p) * 1000:.1f} ms" for p in (50, 90, 99)))
+        print(json.dumps(get_json(f'{base}/stats'), indent=2))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cold start and request latency of the coverage API')
+    parser.add_argument('--start', type=date.fromisoformat, default=date(2025, 8, 1))
+    parser.add_argument('--end', type=date.fromisoformat, default=date(2025, 8, 14))
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--port', type=int, default=8767)
+    args = parser.parse_args()
+    run(args.start, args.end, args.clients, args.rounds, args.port)
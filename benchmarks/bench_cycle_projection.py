@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import coverage
+import coverage_index
+import cycle_projection
+import data_store
+from bench_catalog import same_selections
+
+
+# Sentinel selection by rescanning the reference plans for every date
+# (coverage.select_frames) against the cycle projector, over growing date ranges
+def run(start_date=date(2025, 9, 1), months=(1, 3, 12)):
+    sentinel_data = data_store.load_sentinel(config.satellite_configs)
+    start = time.perf_counter()
+    projector = cycle_projection.CycleProjector(sentinel_data)
+    print(f"Projector built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for count in months:
+        end_date = (pd.Timestamp(start_date) + pd.DateOffset(months=count) - pd.Timedelta(days=1)).date()
+        dates = coverage_index.date_range(start_date, end_date)
+        start = time.perf_counter()
+        scan = {day: coverage.select_frames(sentinel_data, None, None, day) for day in dates}
+        scan_time = time.perf_counter() - start
+        start = time.perf_counter()
+        projected = {}
+        for day, satellite, sensor, target_date, frames in projector.project(start_date, end_date):
+            projected.setdefault(day, []).append((satellite, 'sentinel', sensor, target_date, frames))
+        projector_time = time.perf_counter() - start
+        if not all(same_selections(scan[day], projected[day]) for day in dates):
+            raise SystemExit(f"Projected frames differ from coverage.select_frames between {start_date} and {end_date}")
+        print(f"{len(dates):4d} dates: scan {scan_time * 1000:8.1f} ms ({scan_time / len(dates) * 1000:.2f} ms/date)  "
+              f"projector {projector_time * 1000:8.1f} ms ({projector_time / len(dates) * 1000:.2f} ms/date)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare per-date Sentinel rescans with the cycle projector')
+    parser.add_argument('--start', type=date.fromisoformat, default=date(2025, 9, 1))
+    parser.add_argument('--months', type=int, nargs='*', default=[1, 3, 12])
+    args = parser.parse_args()
+    run(args.start, args.months)
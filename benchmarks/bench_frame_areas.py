@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import shapely
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import coverage
+import data_store
+
+# Per-frame areas from coverage.frame_areas_km2 must match the original
+# per-row loop to within this many km² (well below the 0.01 km² shown in the app)
+TOLERANCE_KM2 = 1e-6
+
+
+# The original app.py computation: one intersection, make_valid and to_crs per frame
+def legacy_frame_areas_km2(aoi_gdf, geoms):
+    areas = []
+    for geom in geoms:
+        if geom is None or geom.is_empty or not geom.is_valid:
+            areas.append(0.0)
+            continue
+        intersection = aoi_gdf.geometry.intersection(geom)
+        intersection = intersection.apply(lambda g: shapely.make_valid(g) if not g.is_valid else g)
+        areas.append(intersection.to_crs(epsg=32637).geometry.area.sum() / 1_000_000)
+    return np.array(areas)
+
+
+# Time both implementations on every frame shown for each day of a date range
+def run(start_date=date(2025, 8, 1), end_date=date(2025, 8, 31)):
+    aoi_gdf = data_store.load_aoi(config.aoi_file)
+    sentinel_data = data_store.load_sentinel(config.satellite_configs)
+    landsat_data = data_store.load_landsat(config.landsat8_file, config.landsat9_file)
+
+    legacy_total = batch_total = 0.0
+    frame_total = 0
+    max_diff = 0.0
+    day = start_date
+    while day <= end_date:
+        daily_data = data_store.load_commercial_day(day)
+        selections = coverage.select_frames(sentinel_data, landsat_data, daily_data, day)
+        geoms = [g for *_, frames in selections for g in frames['geometry']]
+
+        start = time.perf_counter()
+        legacy = legacy_frame_areas_km2(aoi_gdf, geoms)
+        legacy_time = time.perf_counter() - start
+        start = time.perf_counter()
+        batch = coverage.frame_areas_km2(aoi_gdf, geoms)
+        batch_time = time.perf_counter() - start
+
+        diff = float(np.abs(legacy - batch).max()) if len(geoms) else 0.0
+        print(f"{day}: {len(geoms):3d} frames  loop {legacy_time * 1000:8.1f} ms  "
+              f"batch {batch_time * 1000:7.1f} ms  max diff {diff:.2e} km²")
+        legacy_total += legacy_time
+        batch_total += batch_time
+        frame_total += len(geoms)
+        max_diff = max(max_diff, diff)
+        day += timedelta(days=1)
+
+    print(f"Threads: {coverage.MAX_WORKERS}")
+    print(f"Total: {frame_total} frames  loop {legacy_total:.2f} s  batch {batch_total:.2f} s  "
+          f"speedup {legacy_total / batch_total:.1f}x  max diff {max_diff:.2e} km²")
+    if max_diff > TOLERANCE_KM2:
+        raise SystemExit(f"Batch areas differ from the loop by {max_diff} km² (tolerance {TOLERANCE_KM2} km²)")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kml_ingest
+
+ns = {'kml': 'http://www.opengis.net/kml/2.2'}
+
+
+# The notebook approach: parse the whole tree, split coordinates in Python and
+# build one Polygon per placemark (outer ring only)
+def legacy_read_kml(kml_file):
+    root = ET.parse(kml_file).getroot()
+    polygons = []
+    for placemark in root.iter('{http://www.opengis.net/kml/2.2}Placemark'):
+        if placemark.find('.//kml:begin', ns) is None and placemark.find('.//kml:when', ns) is None:
+            continue
+        linear_ring = placemark.find('kml:LinearRing', ns)
+        if linear_ring is None:
+            linear_ring = placemark.find('kml:Polygon/kml:outerBoundaryIs/kml:LinearRing', ns)
+        if linear_ring is None:
+            continue
+        coords_list = []
+        for c in linear_ring.find('kml:coordinates', ns).text.strip().split():
+            lon, lat, *_ = c.split(',')
+            coords_list.append((float(lon), float(lat)))
+        polygons.append(Polygon(coords_list))
+    return polygons
+
+
+# Wall time of one call and tracemalloc peak (MiB) of a second, traced call
+# (tracing slows Python allocations down, so it is kept out of the timing)
+def measure(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+# Time and memory of the tree parser and the streaming parser for every KML in SatelliteData/
+def run():
+    print(f"{'File':55s} {'MiB':>6s} {'Rows':>5s} {'Tree s':>7s} {'Tree MiB':>9s} {'Stream s':>9s} {'Stream MiB':>11s}")
+    for kml_file in kml_ingest.kml_files():
+        legacy, legacy_time, legacy_peak = measure(legacy_read_kml, kml_file)
+        gdf, stream_time, stream_peak = measure(kml_ingest.read_kml, kml_file)
+        # Compare shells only: the legacy parser drops holes
+        shells = shapely.polygons(shapely.get_exterior_ring(gdf.geometry.to_numpy()))
+        if len(legacy) != len(gdf) or not np.all(shapely.equals_exact(np.array(legacy, dtype=object), shells)):
+            raise SystemExit(f"{kml_file}: streaming parser disagrees with the tree parser")
+        size = os.path.getsize(kml_file) / 2 ** 20
+        print(f"{os.path.basename(kml_file):55s} {size:6.1f} {len(gdf):5d} {legacy_time:7.2f} {legacy_peak:9.1f} "
+              f"{stream_time:9.2f} {stream_peak:11.1f}")
+
+
+if __name__ == '__main__':
+    run()
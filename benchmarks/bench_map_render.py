@@ -0,0 +1,50 @@
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import coverage
+import data_store
+import map_render
+import tile_server
+
+
+# Payload size and render time of the Map View HTML per day, in every render mode
+# (the 'tiles' page only references tiles, which the browser fetches separately)
+def run(start_date=date(2025, 8, 1), end_date=date(2025, 8, 31), zoom=map_render.MAP_ZOOM):
+    aoi_gdf = data_store.load_aoi(config.aoi_file)
+    sentinel_data = data_store.load_sentinel(config.satellite_configs)
+    landsat_data = data_store.load_landsat(config.landsat8_file, config.landsat9_file)
+
+    print(f"Zoom {zoom}: simplify tolerance {map_render.simplify_tolerance(zoom):.5f}°, "
+          f"{map_render.coordinate_precision(zoom)} decimal places")
+    totals = {mode: [0, 0.0] for mode in map_render.RENDER_MODES}
+    day = start_date
+    while day <= end_date:
+        result = coverage.compute_day(aoi_gdf, sentinel_data, landsat_data, data_store.load_commercial_day(day), day)
+        line = f"{day}: {len(result['frames']):3d} frames"
+        for mode in map_render.RENDER_MODES:
+            html, elapsed = map_render.render_html(result, lambda satellite: 'blue', mode, zoom, tile_server.tile_layers(day))
+            size = len(html.encode('utf-8'))
+            totals[mode][0] += size
+            totals[mode][1] += elapsed
+            line += f"  {mode} {size / 1024:8.0f} KiB {elapsed * 1000:7.1f} ms"
+        print(line)
+        day += timedelta(days=1)
+
+    (frame_size, frame_time), (layer_size, layer_time) = totals['frame'], totals['layer']
+    print(f"Total: frame {frame_size / 2 ** 20:.1f} MiB {frame_time:.2f} s  "
+          f"layer {layer_size / 2 ** 20:.1f} MiB {layer_time:.2f} s  "
+          f"({frame_size / layer_size:.1f}x smaller, {frame_time / layer_time:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare Map View payload size and render time per render mode')
+    parser.add_argument('--start', type=date.fromisoformat, default=date(2025, 8, 1))
+    parser.add_argument('--end', type=date.fromisoformat, default=date(2025, 8, 31))
+    parser.add_argument('--zoom', type=int, default=map_render.MAP_ZOOM)
+    args = parser.parse_args()
+    run(args.start, args.end, args.zoom)
@@ -0,0 +1,88 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import coverage
+import coverage_index
+import data_store
+import footprint_catalog
+import multi_aoi
+
+
+# GeoJSON file of an n x n grid of cells over the default AOI, each clipped to it
+def write_grid(n, path):
+    aoi = coverage.union_geometries(data_store.load_aoi(config.aoi_file).geometry.to_numpy())
+    xmin, ymin, xmax, ymax = aoi.bounds
+    xs, ys = np.linspace(xmin, xmax, n + 1), np.linspace(ymin, ymax, n + 1)
+    cells = [shapely.box(xs[i], ys[j], xs[i + 1], ys[j + 1]) for i in range(n) for j in range(n)]
+    cells = shapely.intersection(np.array(cells, dtype=object), aoi)
+    cells = cells[~shapely.is_empty(cells) & (shapely.area(cells) > 0)]
+    gpd.GeoDataFrame(geometry=cells, crs='EPSG:4326').to_file(path, driver='GeoJSON')
+    return len(cells)
+
+
+# One compute_day per (AOI, date) against the one-pass matrix of multi_aoi, on the
+# same AOIs and dates; satellite and combined areas must agree
+def run(aoi_files, start_date=date(2025, 8, 1), end_date=date(2025, 8, 7), by_feature=False, workers=1):
+    dates = coverage_index.date_range(start_date, end_date)
+    names, geoms = multi_aoi.load_aois(aoi_files, by_feature)
+    catalog = footprint_catalog.shared_catalog()
+
+    start = time.perf_counter()
+    expected = {}
+    for name, geom in zip(names, geoms):
+        aoi_gdf = gpd.GeoDataFrame(geometry=[geom], crs='EPSG:4326')
+        for selected_date in dates:
+            day = coverage.compute_day(aoi_gdf, None, None, None, selected_date, catalog=catalog,
+                                       backend=coverage.VectorBackend())
+            for row in day['satellites'].itertuples(index=False):
+                expected[(name, selected_date, row.satellite)] = row.union_area_km2
+            expected[(name, selected_date, 'ALL')] = day['combined_area_km2']
+    per_aoi_time = time.perf_counter() - start
+    print(f"compute_day per AOI: {len(names)} AOIs x {len(dates)} dates in {per_aoi_time:.1f} s")
+
+    start = time.perf_counter()
+    matrix = multi_aoi.coverage_matrix(aoi_files, start_date, end_date, by_feature, workers, log=lambda message: None)
+    matrix_time = time.perf_counter() - start
+    print(f"multi_aoi matrix:    {len(matrix)} rows in {matrix_time:.1f} s ({per_aoi_time / matrix_time:.1f}x)")
+
+    # Differences are union-order slivers (the matrix unions the satellite unions,
+    # compute_day every frame)
+    worst = 0.0
+    for row in matrix.itertuples(index=False):
+        worst = max(worst, abs(row.area_km2 - expected.get((row.aoi, row.date, row.satellite), 0.0)))
+    # Satellites the matrix leaves out must cover nothing
+    listed = set(zip(matrix['aoi'], matrix['date'], matrix['satellite']))
+    worst = max([worst] + [abs(area) for key, area in expected.items() if key not in listed])
+    print(f"Largest area difference: {worst:.6f} km² ({worst / matrix['aoi_area_km2'].min() * 100:.5f}% of the smallest AOI)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare per-AOI compute_day runs with the multi-AOI coverage matrix')
+    parser.add_argument('aoi', nargs='*', help='AOI files (default: config.aoi_file and the first AOI variants)')
+    parser.add_argument('--start', type=date.fromisoformat, default=date(2025, 8, 1))
+    parser.add_argument('--end', type=date.fromisoformat, default=date(2025, 8, 7))
+    parser.add_argument('--grid', type=int, help='Use an N x N grid of AOIs over the default AOI instead')
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.grid:
+        with tempfile.TemporaryDirectory() as tmp:
+            grid_file = os.path.join(tmp, 'grid.geojson')
+            print(f"{write_grid(args.grid, grid_file)} grid AOIs")
+            run([grid_file], args.start, args.end, by_feature=True, workers=args.workers)
+    else:
+        aoi_files = args.aoi or [config.aoi_file] + [
+            os.path.join(config.aoi_dir, f'aoi_2025-08-0{day}.geojson') for day in range(1, 5)
+        ]
+        run(aoi_files, args.start, args.end, workers=args.workers)
@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import date, datetime
+
+import numpy as np
+import geopandas as gpd
+import shapely
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import coverage
+import coverage_index
+import data_store
+import map_render
+import synthetic_load
+
+# Stage timings of the Map View pipeline, on the real data and on synthetic loads
+# (see synthetic_load.py). Each stage is timed on its own:
+#   load: cold read of every source file (cache cleared), without repair
+#   make_valid: repairing the loaded geometries
+#   select: cycle filtering of the frames shown on each date
+#   frame_areas: per-frame AOI areas
+#   unions: per-satellite and free/commercial unions and the residual AOI difference
+#   compute_day: the whole coverage computation as the app runs it
+#   map_build, html_render: folium map building and HTML rendering ('layer' mode)
+# Results are written as JSON; --compare prints the ratio of every stage to a
+# previous result file.
+STAGES = ['load', 'make_valid', 'select', 'frame_areas', 'unions', 'compute_day', 'map_build', 'html_render']
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+# Real inputs for a list of dates, timing the cold load and the repair separately
+def load_inputs(dates):
+    data_store.clear_cache()
+    timings = {'load': 0.0, 'make_valid': 0.0}
+    sources = [config.aoi_file, config.landsat8_file, config.landsat9_file]
+    sources += [sat_config['file'] for sat_config in config.satellite_configs]
+    sources += [config.commercial_file(day) for day in dates]
+    for path in sources:
+        if not os.path.exists(path):
+            continue
+        gdf, elapsed = _timed(gpd.read_file, path, engine='pyogrio')
+        timings['load'] += elapsed
+        timings['make_valid'] += _timed(data_store.make_valid_geometries, gdf)[1]
+    inputs = {
+        'aoi': data_store.load_aoi(config.aoi_file),
+        'sentinel': data_store.load_sentinel(config.satellite_configs),
+        'landsat': data_store.load_landsat(config.landsat8_file, config.landsat9_file),
+        'daily_data': {day: data_store.load_commercial_day(day) for day in dates},
+    }
+    return inputs, timings
+
+
+# Time every per-day stage on a set of inputs; returns per-stage lists of seconds
+def time_stages(inputs, dates):
+    timings = {stage: [] for stage in STAGES[2:]}
+    html_bytes = []
+    aoi_gdf = inputs['aoi']
+    for day in dates:
+        daily_data = inputs['daily_data'].get(day)
+        selections, elapsed = _timed(coverage.select_frames, inputs['sentinel'], inputs['landsat'], daily_data, day)
+        timings['select'].append(elapsed)
+        geoms = np.array([g for *_, frames in selections for g in frames['geometry']], dtype=object)
+        timings['frame_areas'].append(_timed(coverage.frame_areas_km2, aoi_gdf, geoms)[1])
+
+        # Unions per satellite, per free/commercial group and the residual difference
+        start = time.perf_counter()
+        unions = [coverage.union_geometries(frames['geometry']) for *_, frames in selections]
+        for source_group in [{'sentinel', 'landsat'}, {'commercial'}]:
+            coverage.union_geometries([u for u, (_, source, *_) in zip(unions, selections) if source in source_group])
+        combined_union = coverage.union_geometries(unions)
+        if combined_union is not None:
+            aoi_gdf.geometry.difference(combined_union).apply(lambda g: shapely.make_valid(g) if not g.is_valid else g)
+        timings['unions'].append(time.perf_counter() - start)
+
+        # The plain vector backend, so repeated runs do not hit the memoized unions
+        result, elapsed = _timed(coverage.compute_day, aoi_gdf, inputs['sentinel'], inputs['landsat'], daily_data, day,
+                                 backend=coverage.VectorBackend())
+        timings['compute_day'].append(elapsed)
+        m, elapsed = _timed(map_render.build_map, result, lambda satellite: 'blue')
+        timings['map_build'].append(elapsed)
+        html, elapsed = _timed(lambda: m.get_root().render())
+        timings['html_render'].append(elapsed)
+        html_bytes.append(len(html.encode('utf-8')))
+    return timings, html_bytes
+
+
+# Total, mean and max of every stage
+def summarize(timings):
+    summary = {}
+    for stage, values in timings.items():
+        values = np.atleast_1d(values)
+        summary[stage] = {'total_s': float(values.sum()), 'mean_s': float(values.mean()), 'max_s': float(values.max())}
+    return summary
+
+
+# Benchmark the real data and every synthetic scale; returns the JSON-ready result
+def run(start_date=date(2025, 8, 1), end_date=date(2025, 8, 31), scales=(), synthetic_days=3, seed=0, log=print):
+    dates = coverage_index.date_range(start_date, end_date)
+    inputs, load_timings = load_inputs(dates)
+    cases = [('august', 1, inputs, dates, load_timings)]
+    for scale in scales:
+        scaled = synthetic_load.synthetic_inputs(inputs, footprints=scale, commercial=scale, aoi=scale, seed=seed)
+        cases.append((f'synthetic x{scale}', scale, scaled, dates[:synthetic_days], {}))
+
+    results = []
+    for name, scale, case_inputs, case_dates, timings in cases:
+        stage_timings, html_bytes = time_stages(case_inputs, case_dates)
+        stage_timings.update(timings)
+        summary = summarize({stage: stage_timings[stage] for stage in STAGES if stage in stage_timings})
+        results.append({
+            'name': name,
+            'scale': scale,
+            'dates': [day.isoformat() for day in case_dates],
+            'inputs': synthetic_load.describe(case_inputs),
+            'stages': summary,
+            'html_bytes': {'total': int(sum(html_bytes)), 'max': int(max(html_bytes, default=0))},
+        })
+        log(f"{name} ({len(case_dates)} dates): " + "  ".join(
+            f"{stage} {values['total_s']:.2f}s" for stage, values in summary.items()))
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'versions': {'geopandas': gpd.__version__, 'shapely': shapely.__version__},
+        'cases': results,
+    }
+
+
+# Print each stage's mean time per date (total for the one-off load stages) against
+# a previous result (ratio > 1 is slower)
+def compare(previous, current, log=print):
+    previous_cases = {case['name']: case for case in previous['cases']}
+    for case in current['cases']:
+        before = previous_cases.get(case['name'])
+        if before is None:
+            continue
+        for stage, values in case['stages'].items():
+            measure = 'total_s' if stage in ('load', 'make_valid') else 'mean_s'
+            if stage in before['stages'] and before['stages'][stage][measure] > 0:
+                ratio = values[measure] / before['stages'][stage][measure]
+                log(f"{case['name']:16s} {stage:12s} {before['stages'][stage][measure]:8.3f}s -> "
+                    f"{values[measure]:8.3f}s  x{ratio:.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time each stage of the coverage pipeline on real and synthetic loads')
+    parser.add_argument('--start', type=date.fromisoformat, default=date(2025, 8, 1))
+    parser.add_argument('--end', type=date.fromisoformat, default=date(2025, 8, 31))
+    parser.add_argument('--scales', type=int, nargs='*', default=[10], help='Synthetic load factors (e.g. 10 100 1000)')
+    parser.add_argument('--synthetic-days', type=int, default=3, help='Dates timed for each synthetic load')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='Previous JSON result to compare against')
+    args = parser.parse_args()
+
+    result = run(args.start, args.end, args.scales, args.synthetic_days, args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Saved {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), result)
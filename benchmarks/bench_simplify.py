@@ -0,0 +1,70 @@
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import coverage
+import coverage_index
+import data_store
+import map_render
+
+
+# Inputs loaded with the versions chosen for an area tolerance (0: full resolution)
+def load_inputs(tolerance_km2, dates):
+    config.area_tolerance_km2 = tolerance_km2
+    data_store.clear_cache()
+    return {
+        'aoi': data_store.load_aoi(config.aoi_file),
+        'sentinel': data_store.load_sentinel(config.satellite_configs),
+        'landsat': data_store.load_landsat(config.landsat8_file, config.landsat9_file),
+        'daily_data': {day: data_store.load_commercial_day(day) for day in dates},
+    }
+
+
+# Coverage and map time per date for every tolerance, with the largest area
+# differences from the full-resolution result against the recorded error bound
+def run(start_date=date(2025, 8, 1), end_date=date(2025, 8, 10), tolerances=(0, 2, 5, 10, 25, 100)):
+    dates = coverage_index.date_range(start_date, end_date)
+    sources = [config.aoi_file, config.landsat8_file, config.landsat9_file]
+    sources += [sat_config['file'] for sat_config in config.satellite_configs]
+    configured = config.area_tolerance_km2
+    exact = None
+    try:
+        for tolerance in sorted(set(tolerances) | {0}):
+            inputs = load_inputs(tolerance, dates)
+            bound = data_store.simplification_error_km2(sources, tolerance)
+            results = {}
+            compute_time = map_time = 0.0
+            for day in dates:
+                start = time.perf_counter()
+                results[day] = coverage.compute_day(inputs['aoi'], inputs['sentinel'], inputs['landsat'],
+                                                    inputs['daily_data'][day], day, backend=coverage.VectorBackend())
+                compute_time += time.perf_counter() - start
+                start = time.perf_counter()
+                map_render.build_map(results[day], lambda satellite: 'blue').get_root().render()
+                map_time += time.perf_counter() - start
+            if exact is None:
+                exact = results
+            combined = max(abs(results[day]['combined_area_km2'] - exact[day]['combined_area_km2']) for day in dates)
+            aoi_area = abs(results[dates[0]]['original_area_km2'] - exact[dates[0]]['original_area_km2'])
+            percentage = max(abs(results[day]['covered_percentage'] - exact[day]['covered_percentage']) for day in dates)
+            print(f"tolerance {tolerance:6.1f} km²: compute {compute_time / len(dates) * 1000:7.1f} ms/day  "
+                  f"map {map_time / len(dates) * 1000:7.1f} ms/day  AOI area diff {aoi_area:6.2f} km²  "
+                  f"max covered area diff {combined:6.2f} km² (bound {bound:6.2f})  max coverage diff {percentage:.4f} pts")
+    finally:
+        config.area_tolerance_km2 = configured
+        data_store.clear_cache()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time and check coverage on the simplified AOI and footprint versions')
+    parser.add_argument('--start', type=date.fromisoformat, default=date(2025, 8, 1))
+    parser.add_argument('--end', type=date.fromisoformat, default=date(2025, 8, 10))
+    parser.add_argument('--tolerances', type=float, nargs='*', default=[0, 2, 5, 10, 25, 100],
+                        help='Area tolerances in km² (0 is the full-resolution baseline)')
+    args = parser.parse_args()
+    run(args.start, args.end, args.tolerances)
@@ -0,0 +1,94 @@
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import coverage
+import data_store
+import raster_coverage
+
+
+# Relative error in percent (0 when both values are zero)
+def relative_error(raster, vector):
+    if vector == 0:
+        return 0.0 if raster == 0 else float('inf')
+    return abs(raster - vector) / vector * 100
+
+
+# Compare the raster backend against the vector backend for every day of a date
+# range, then build a month stack and print the multi-day statistics
+def run(start_date=date(2025, 8, 1), end_date=date(2025, 8, 31), resolution_m=raster_coverage.DEFAULT_RESOLUTION_M):
+    aoi_gdf = data_store.load_aoi(config.aoi_file)
+    sentinel_data = data_store.load_sentinel(config.satellite_configs)
+    landsat_data = data_store.load_landsat(config.landsat8_file, config.landsat9_file)
+    raster_backend = raster_coverage.RasterBackend(resolution_m)
+
+    start = time.perf_counter()
+    grid = raster_backend.grid(aoi_gdf)
+    print(f"Grid: {grid.nx} x {grid.ny} cells of {grid.cell_area_km2:g} km², {len(grid.aoi_cells)} inside the AOI "
+          f"({time.perf_counter() - start:.2f} s)")
+    vector_aoi = coverage.VECTOR_BACKEND.aoi_area_km2(aoi_gdf)
+    print(f"AOI area: vector {vector_aoi:,.0f} km²  raster {grid.aoi_area_km2:,.0f} km²  "
+          f"error {relative_error(grid.aoi_area_km2, vector_aoi):.2f}%")
+
+    dates = []
+    vector_total = raster_total = 0.0
+    worst = {'covered': 0.0, 'free': 0.0, 'commercial': 0.0}
+    day = start_date
+    while day <= end_date:
+        daily_data = data_store.load_commercial_day(day)
+        start = time.perf_counter()
+        vector = coverage.compute_day(aoi_gdf, sentinel_data, landsat_data, daily_data, day)
+        vector_time = time.perf_counter() - start
+        start = time.perf_counter()
+        raster = coverage.compute_day(aoi_gdf, sentinel_data, landsat_data, daily_data, day, backend=raster_backend)
+        raster_time = time.perf_counter() - start
+
+        errors = {
+            'covered': abs(raster['covered_percentage'] - vector['covered_percentage']),
+            'free': relative_error(raster['free_area_km2'], vector['free_area_km2']),
+            'commercial': relative_error(raster['commercial_area_km2'], vector['commercial_area_km2']),
+        }
+        print(f"{day}: covered {vector['covered_percentage']:6.2f}% vs {raster['covered_percentage']:6.2f}%  "
+              f"free err {errors['free']:5.2f}%  commercial err {errors['commercial']:5.2f}%  "
+              f"vector {vector_time * 1000:7.1f} ms  raster {raster_time * 1000:7.1f} ms")
+        for name, value in errors.items():
+            worst[name] = max(worst[name], value)
+        vector_total += vector_time
+        raster_total += raster_time
+        dates.append(day)
+        day += timedelta(days=1)
+
+    print(f"Total: vector {vector_total:.2f} s  raster {raster_total:.2f} s")
+    print(f"Worst: covered {worst['covered']:.2f} points  free {worst['free']:.2f}%  commercial {worst['commercial']:.2f}%")
+
+    start = time.perf_counter()
+    stack = raster_coverage.build_stack(aoi_gdf, sentinel_data, landsat_data, data_store.load_commercial_day, dates, grid=grid)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    counts = stack.revisit_counts()
+    gaps = stack.max_gap_days()
+    month_area = stack.covered_area_km2()
+    overlap = stack.overlap_area_km2()
+    stats_time = time.perf_counter() - start
+    print(f"Stack: {len(stack.masks)} satellite-day masks, {stack.nbytes() / 1024:.0f} KiB, "
+          f"built in {build_time:.2f} s, statistics in {stats_time * 1000:.1f} ms")
+    print(f"Covered at least once: {month_area:,.0f} km² ({month_area / grid.aoi_area_km2 * 100:.2f}%)")
+    print(f"Looks per cell: mean {counts.mean():.1f}  median {np.median(counts):.0f}  max {counts.max()}")
+    print(f"Longest gap between looks: median {np.median(gaps):.0f} days  max {gaps.max()} days")
+    print(f"Free/commercial same-day overlap: {overlap:,.0f} km² over {len(dates)} days")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare raster and vector coverage')
+    parser.add_argument('--start', type=date.fromisoformat, default=date(2025, 8, 1))
+    parser.add_argument('--end', type=date.fromisoformat, default=date(2025, 8, 31))
+    parser.add_argument('--resolution', type=float, default=raster_coverage.DEFAULT_RESOLUTION_M, help='Cell size in meters')
+    args = parser.parse_args()
+    run(args.start, args.end, args.resolution)
@@ -0,0 +1,75 @@
+import numpy as np
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+# Synthetic load for the coverage pipeline, generated from the real inputs so the
+# frame shapes, dates and columns stay realistic. Every input scales independently:
+#   footprints: each Sentinel and Landsat frame is repeated 'factor' times, the
+#       copies shifted by a random offset (the first copy stays in place)
+#   commercial: each daily satellite is cloned 'factor' times as a new sensor
+#       (<name>-S<k>), its frames shifted the same way
+#   aoi: the AOI boundary is densified to about 'factor' times as many vertices
+# The generator is seeded, so the same factor always gives the same load.
+JITTER_DEG = 0.25
+
+
+# Shift every geometry by its own offset (vectorized over all coordinates)
+def _shift(geoms, offsets):
+    coords, index = shapely.get_coordinates(geoms, return_index=True)
+    return shapely.set_coordinates(shapely.from_wkb(shapely.to_wkb(geoms)), coords + offsets[index])
+
+
+# Repeat every row 'factor' times, the copies shifted by up to JITTER_DEG degrees
+def scale_frames(gdf, factor, rng, rename=None):
+    if gdf is None or factor <= 1:
+        return gdf
+    copies = []
+    for k in range(factor):
+        copy = gdf.copy()
+        if k:
+            offsets = rng.uniform(-JITTER_DEG, JITTER_DEG, size=(len(copy), 2))
+            copy['geometry'] = _shift(copy.geometry.to_numpy(), offsets)
+            if rename is not None:
+                copy[rename] = copy[rename].astype(str) + f'-S{k}'
+        copies.append(copy)
+    return gpd.GeoDataFrame(pd.concat(copies, ignore_index=True), geometry='geometry', crs=gdf.crs)
+
+
+# Densify the AOI boundary to about 'factor' times its vertex count
+def scale_aoi(aoi_gdf, factor):
+    if factor <= 1:
+        return aoi_gdf
+    geoms = aoi_gdf.geometry.to_numpy()
+    boundary_length = shapely.length(shapely.boundary(geoms)).sum()
+    segment = boundary_length / (factor * shapely.get_num_coordinates(geoms).sum())
+    aoi_gdf = aoi_gdf.copy()
+    aoi_gdf['geometry'] = shapely.segmentize(geoms, segment)
+    return aoi_gdf
+
+
+# Scaled copies of the pipeline inputs. 'daily_data' maps dates to commercial
+# GeoDataFrames (or None); the result holds the same keys as the input dict.
+def synthetic_inputs(inputs, footprints=1, commercial=1, aoi=1, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        'aoi': scale_aoi(inputs['aoi'], aoi),
+        'sentinel': scale_frames(inputs['sentinel'], footprints, rng),
+        'landsat': scale_frames(inputs['landsat'], footprints, rng),
+        'daily_data': {
+            day: scale_frames(daily_data, commercial, rng, rename='satellite')
+            for day, daily_data in inputs['daily_data'].items()
+        },
+    }
+
+
+# Size of a set of inputs: frame counts and AOI vertices
+def describe(inputs):
+    daily = [gdf for gdf in inputs['daily_data'].values() if gdf is not None]
+    return {
+        'sentinel_frames': len(inputs['sentinel']) if inputs['sentinel'] is not None else 0,
+        'landsat_frames': len(inputs['landsat']) if inputs['landsat'] is not None else 0,
+        'commercial_frames': int(sum(len(gdf) for gdf in daily)),
+        'commercial_sensors': int(sum(gdf['satellite'].nunique() for gdf in daily)),
+        'aoi_vertices': int(shapely.get_num_coordinates(inputs['aoi'].geometry.to_numpy()).sum()),
+    }
@@ -0,0 +1,180 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+import config
+import data_store
+
+# Clip global reference plans (S2B_10day_reference_coverage_plan.geojson, ...) to
+# one or more AOIs. Each plan is indexed once with an STRtree; all AOIs are queried
+# against it by bounding box and the exact intersection is computed only for the
+# candidate (AOI, footprint) pairs. Satellites run in parallel in a process pool.
+# A manifest records the content hashes each output was built from, so only the
+# outputs whose plan or AOI changed are rebuilt.
+MANIFEST_FILE = os.path.join(config.base_dir, 'clip_manifest.json')
+
+# Outputs for AOIs other than config.aoi_file go to <CLIP_DIR>/<aoi name>/
+CLIP_DIR = os.path.join(config.base_dir, 'clipped_plans')
+
+# Bump when the clipping logic changes so every output is rebuilt
+CLIP_VERSION = 1
+
+MAX_WORKERS = os.cpu_count()
+
+_POLYGONAL = [shapely.GeometryType.POLYGON, shapely.GeometryType.MULTIPOLYGON]
+
+
+# SHA-256 of a file's contents
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Output file of a satellite clipped to an AOI
+def output_file(sat_config, aoi_file):
+    if os.path.abspath(aoi_file) == os.path.abspath(config.aoi_file):
+        return sat_config['file']
+    aoi_name = os.path.splitext(os.path.basename(aoi_file))[0]
+    return os.path.join(CLIP_DIR, aoi_name, os.path.basename(sat_config['file']))
+
+
+# Keep only the polygonal parts of intersection results (as gpd.overlay does);
+# None for results without any area
+def _polygonal(geoms):
+    types = shapely.get_type_id(geoms)
+    result = np.where(np.isin(types, _POLYGONAL), geoms, None)
+    for k in np.flatnonzero(types == shapely.GeometryType.GEOMETRYCOLLECTION):
+        parts = shapely.get_parts(geoms[k])
+        parts = parts[np.isin(shapely.get_type_id(parts), _POLYGONAL)]
+        if len(parts):
+            result[k] = shapely.union_all(parts)
+    result[shapely.is_empty(result)] = None
+    return result
+
+
+# Intersect a plan with an AOI: STRtree bbox candidates, then exact intersection.
+# Returns the plan rows that overlap the AOI, with the AOI's attributes appended
+# (one row per overlapping AOI feature, like gpd.overlay(how='intersection')).
+def clip_plan(plan_gdf, aoi_gdf, tree=None):
+    if tree is None:
+        tree = shapely.STRtree(plan_gdf.geometry.to_numpy())
+    aoi_geoms = aoi_gdf.geometry.to_numpy()
+    plan_geoms = plan_gdf.geometry.to_numpy()
+    aoi_index, plan_index = tree.query(aoi_geoms)
+    # Drop bbox-only candidates with a cheap prepared predicate before the exact overlay
+    shapely.prepare(aoi_geoms)
+    hits = shapely.intersects(aoi_geoms[aoi_index], plan_geoms[plan_index])
+    aoi_index, plan_index = aoi_index[hits], plan_index[hits]
+    geoms = shapely.intersection(plan_geoms[plan_index], aoi_geoms[aoi_index])
+    invalid = ~shapely.is_valid(geoms)
+    geoms[invalid] = shapely.make_valid(geoms[invalid])
+    geoms = _polygonal(geoms)
+    keep = ~shapely.is_missing(geoms)
+    order = np.lexsort((aoi_index[keep], plan_index[keep]))
+    plan_rows = plan_index[keep][order]
+    aoi_rows = aoi_index[keep][order]
+    attributes = pd.concat([
+        plan_gdf.drop(columns='geometry').iloc[plan_rows].reset_index(drop=True),
+        aoi_gdf.drop(columns='geometry').iloc[aoi_rows].reset_index(drop=True),
+    ], axis=1)
+    return gpd.GeoDataFrame(attributes, geometry=geoms[keep][order], crs='EPSG:4326')
+
+
+# Clip one satellite's plan to several AOIs and write the outputs (runs in a worker process)
+def clip_satellite(sat_config, aoi_files):
+    start = time.perf_counter()
+    plan_gdf = data_store.read_geojson(sat_config['plan_file'])
+    tree = shapely.STRtree(plan_gdf.geometry.to_numpy())
+    results = []
+    for aoi_file in aoi_files:
+        clipped = clip_plan(plan_gdf, data_store.read_geojson(aoi_file), tree)
+        clipped['satellite'] = sat_config['name']
+        clipped['revisit_frequency'] = sat_config['revisit_frequency']
+        clipped['acquisition_date'] = pd.to_datetime(clipped['acquisition_date'], errors='coerce')
+        output = output_file(sat_config, aoi_file)
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        clipped.to_file(output, driver='GeoJSON', engine='pyogrio')
+        results.append({'output': output, 'aoi': aoi_file, 'features': len(clipped)})
+    return sat_config['name'], len(plan_gdf), results, time.perf_counter() - start
+
+
+def read_manifest(manifest_file=MANIFEST_FILE):
+    if not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file) as f:
+        return json.load(f)
+
+
+# Manifest key of an output (path relative to the repository when possible)
+def _key(path):
+    path = os.path.abspath(path)
+    return os.path.relpath(path, config.base_dir) if path.startswith(config.base_dir + os.sep) else path
+
+
+# Clip every configured satellite to every AOI, rebuilding only stale outputs.
+# Returns one row per (satellite, AOI) with its status.
+def clip_all(aoi_files=None, configs=None, manifest_file=MANIFEST_FILE, force=False, workers=MAX_WORKERS, log=print):
+    aoi_files = aoi_files or [config.aoi_file]
+    configs = configs or config.satellite_configs
+    for path in aoi_files:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"AOI file {path} not found.")
+    aoi_hashes = {path: file_hash(path) for path in aoi_files}
+    manifest = read_manifest(manifest_file)
+
+    rows = []
+    tasks = []
+    for sat_config in configs:
+        if not os.path.exists(sat_config['plan_file']):
+            raise FileNotFoundError(f"Sentinel file {sat_config['plan_file']} not found.")
+        plan_hash = file_hash(sat_config['plan_file'])
+        stale = []
+        for aoi_file in aoi_files:
+            output = output_file(sat_config, aoi_file)
+            expected = {'version': CLIP_VERSION, 'plan': plan_hash, 'aoi': aoi_hashes[aoi_file]}
+            if not force and os.path.exists(output) and manifest.get(_key(output)) == expected:
+                rows.append({'satellite': sat_config['name'], 'aoi': aoi_file, 'output': output, 'status': 'up to date'})
+            else:
+                stale.append(aoi_file)
+        if stale:
+            tasks.append((sat_config, stale, plan_hash))
+
+    if tasks:
+        executor = ProcessPoolExecutor(min(workers or 1, len(tasks)))
+        with executor:
+            futures = [(executor.submit(clip_satellite, sat_config, stale), plan_hash) for sat_config, stale, plan_hash in tasks]
+            for future, plan_hash in futures:
+                name, plan_features, results, elapsed = future.result()
+                log(f"{name}: clipped {plan_features} footprints to {len(results)} AOI(s) in {elapsed:.2f} s")
+                for result in results:
+                    manifest[_key(result['output'])] = {'version': CLIP_VERSION, 'plan': plan_hash, 'aoi': aoi_hashes[result['aoi']]}
+                    rows.append({'satellite': name, 'aoi': result['aoi'], 'output': result['output'],
+                                 'status': f"rebuilt ({result['features']} features)"})
+        with open(manifest_file, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    return pd.DataFrame(rows, columns=['satellite', 'aoi', 'output', 'status'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Clip global reference plans to AOIs')
+    parser.add_argument('--aoi', action='append', help='AOI file (repeatable, default: config.aoi_file)')
+    parser.add_argument('--aoi-dir', help=f"Also clip to every GeoJSON in this directory (e.g. {config.aoi_dir})")
+    parser.add_argument('--force', action='store_true', help='Rebuild every output')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    args = parser.parse_args()
+    aoi_files = list(args.aoi or [])
+    if args.aoi_dir:
+        aoi_files += sorted(os.path.join(args.aoi_dir, name) for name in os.listdir(args.aoi_dir) if name.endswith('.geojson'))
+    report = clip_all(aoi_files or None, force=args.force, workers=args.workers)
+    print(report.to_string(index=False))
@@ -0,0 +1,45 @@
+import os
+
+# Base directory for all data files (the repository root)
+base_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Define satellite configurations (clipped file, revisit frequency in days and the
+# global reference plan it is clipped from, see clip_plans.py). An entry may also set
+# 'drift_seconds_per_cycle', the orbit timing drift added to projected acquisition
+# times for every revisit cycle away from the reference plan (see cycle_projection.py).
+satellite_configs = [
+    {'file': os.path.join(base_dir, 'S1A_intersected_aoi.geojson'), 'name': 'Sentinel-1A', 'revisit_frequency': 12, 'plan_file': os.path.join(base_dir, 'S1A_12day_reference_coverage_plan.geojson')},
+    {'file': os.path.join(base_dir, 'S1C_intersected_aoi.geojson'), 'name': 'Sentinel-1C', 'revisit_frequency': 12, 'plan_file': os.path.join(base_dir, 'S1C_12day_reference_coverage_plan.geojson')},
+    {'file': os.path.join(base_dir, 'S2A_intersected_aoi.geojson'), 'name': 'Sentinel-2A', 'revisit_frequency': 10, 'plan_file': os.path.join(base_dir, 'S2A_10day_reference_coverage_plan.geojson')},
+    {'file': os.path.join(base_dir, 'S2B_intersected_aoi.geojson'), 'name': 'Sentinel-2B', 'revisit_frequency': 10, 'plan_file': os.path.join(base_dir, 'S2B_10day_reference_coverage_plan.geojson')},
+    {'file': os.path.join(base_dir, 'S2C_intersected_aoi.geojson'), 'name': 'Sentinel-2C', 'revisit_frequency': 10, 'plan_file': os.path.join(base_dir, 'S2C_10day_reference_coverage_plan.geojson')},
+]
+
+# AOI and Landsat files
+aoi_file = os.path.join(base_dir, 'saudi_arabia_eez.geojson')
+landsat8_file = os.path.join(base_dir, 'landsat8_august.geojson')
+landsat9_file = os.path.join(base_dir, 'landsat9_august.geojson')
+
+# Directory holding the daily AOI variants (aoi_2025-08-01.geojson, ...)
+aoi_dir = os.path.join(base_dir, 'KSA_AOIS')
+
+# Directory holding the daily commercial coverage files (august_01.geojson, ...)
+commercial_dir = os.path.join(base_dir, 'KSA_commercial_coverage')
+
+# Partitioned GeoParquet footprint store written by footprint_store.py
+store_dir = os.path.join(base_dir, 'footprint_store')
+
+# Multi-resolution AOI and footprint versions written by simplify.py, and the
+# largest area error (km²) the versions used instead of the full-resolution files
+# may introduce together (0 always uses the full-resolution files; commercial
+# footprints are never simplified)
+simplified_dir = os.path.join(base_dir, 'simplified')
+area_tolerance_km2 = 0.0
+
+# Define free satellites
+free_satellites = {'Sentinel-1A', 'Sentinel-1C', 'Sentinel-2A', 'Sentinel-2B', 'Sentinel-2C', 'LANDSAT-8', 'LANDSAT-9'}
+
+
+# Path of the commercial coverage file for a given date (<month>_<day>.geojson)
+def commercial_file(selected_date):
+    return os.path.join(commercial_dir, f"{selected_date.strftime('%B').lower()}_{selected_date.strftime('%d')}.geojson")
@@ -0,0 +1,575 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+import profiling
+
+# UTM zone 37N, used for all area calculations
+AREA_CRS = 'EPSG:32637'
+
+# Threads used for large intersection batches (shapely releases the GIL)
+MAX_WORKERS = os.cpu_count() or 1
+PARALLEL_MIN_PAIRS = 64
+
+# Columns of the per-frame table returned by compute_day
+FRAME_COLUMNS = [
+    'satellite', 'source', 'sensor', 'acquisition_date', 'begin', 'end',
+    'timestamp', 'area_km2', 'percentage', 'geometry',
+]
+
+
+# Area in km² of EPSG:4326 geometries
+def area_km2(geoms):
+    series = gpd.GeoSeries(geoms, crs='EPSG:4326')
+    if series.empty:
+        return 0.0
+    return float(series.to_crs(AREA_CRS).area.sum() / 1_000_000)
+
+
+# Pairwise intersection, split across threads for large batches
+def _intersection(left, right):
+    if MAX_WORKERS < 2 or len(left) < PARALLEL_MIN_PAIRS:
+        return shapely.intersection(left, right)
+    chunks = np.array_split(np.arange(len(left)), MAX_WORKERS)
+    with ThreadPoolExecutor(MAX_WORKERS) as executor:
+        parts = executor.map(lambda idx: shapely.intersection(left[idx], right[idx]), chunks)
+        return np.concatenate(list(parts))
+
+
+# Area in km² of the part of the AOI covered by each geometry.
+#
+# Batch replacement for intersecting and reprojecting frames one at a time: every
+# geometry is tested against every AOI polygon with a prepared intersects
+# predicate, the intersecting pairs are clipped in one shapely call, repaired,
+# reprojected to AREA_CRS once and summed back per geometry. Missing, empty or
+# invalid geometries get an area of 0.
+def frame_areas_km2(aoi_gdf, geoms):
+    geoms = np.asarray(geoms, dtype=object)
+    areas = np.zeros(len(geoms))
+    if len(geoms) == 0:
+        return areas
+    aoi_geoms = aoi_gdf.geometry.to_numpy()
+    shapely.prepare(aoi_geoms)
+    usable = ~shapely.is_missing(geoms)
+    usable[usable] = ~shapely.is_empty(geoms[usable]) & shapely.is_valid(geoms[usable])
+    hits = usable[:, None] & shapely.intersects(aoi_geoms[None, :], np.where(usable, geoms, None)[:, None])
+    rows, cols = np.nonzero(hits)
+    if rows.size == 0:
+        return areas
+    pieces = _intersection(geoms[rows], aoi_geoms[cols])
+    invalid = ~shapely.is_valid(pieces)
+    if invalid.any():
+        pieces[invalid] = shapely.make_valid(pieces[invalid])
+    projected = gpd.GeoSeries(pieces, crs='EPSG:4326').to_crs(AREA_CRS).to_numpy()
+    np.add.at(areas, rows, shapely.area(projected) / 1_000_000)
+    return areas
+
+
+# Union of a list of geometries (None when the list is empty)
+def union_geometries(geoms):
+    geoms = [g for g in geoms if g is not None and not g.is_empty]
+    if not geoms:
+        return None
+    if len(geoms) == 1:
+        return geoms[0]
+    return shapely.union_all(geoms)
+
+
+# Reference-plan date matching a selected date in a revisit cycle, and the number of
+# whole cycles from the reference date to the selected date (negative before it)
+def cycle_position(reference_date, revisit_frequency, selected_date):
+    cycles, offset = divmod((selected_date - reference_date).days, revisit_frequency)
+    return reference_date + timedelta(days=offset), cycles
+
+
+# Reference-plan date matching a selected date in a satellite's revisit cycle
+def sentinel_target_date(sat_data, selected_date):
+    revisit_frequency = int(sat_data['revisit_frequency'].iloc[0])
+    reference_date = sat_data['acquisition_date'].min().date()
+    return cycle_position(reference_date, revisit_frequency, selected_date)[0]
+
+
+# Orbit timing drift of a Sentinel satellite in seconds per revisit cycle (set by
+# data_store.load_sentinel from config.satellite_configs, 0 when not configured)
+def orbit_drift_seconds(sat_data):
+    if 'drift_seconds_per_cycle' not in sat_data.columns or sat_data.empty:
+        return 0.0
+    return float(sat_data['drift_seconds_per_cycle'].iloc[0])
+
+
+# Sentinel frame table rows moved from their reference-plan date to a projected
+# date: acquisition date, begin and end shifted by whole days plus the orbit drift
+# accumulated over 'cycles' revisit cycles. Geometries are shared, not copied.
+def project_frames(frames, days, cycles=0, drift_seconds=0.0):
+    shift = pd.Timedelta(days=days) + pd.Timedelta(seconds=drift_seconds * cycles)
+    if shift == pd.Timedelta(0):
+        return frames
+    begin, end = frames['begin'] + shift, frames['end'] + shift
+    return frames.assign(
+        acquisition_date=frames['acquisition_date'] + shift,
+        begin=begin,
+        end=end,
+        timestamp=_frame_timestamps(begin, end),
+    )
+
+
+# Format a Start/End value as HH:MM:SS
+def _time_of_day(value):
+    if value is None or pd.isna(value):
+        return 'Unknown'
+    if isinstance(value, str):
+        try:
+            return value.split('T')[1].split('.')[0] if 'T' in value else pd.to_datetime(value).strftime('%H:%M:%S')
+        except Exception:
+            return 'Invalid'
+    return pd.to_datetime(value).strftime('%H:%M:%S')
+
+
+# Parse a begin/end value to a naive UTC Timestamp (NaT when missing or invalid)
+def _to_timestamp(value):
+    try:
+        timestamp = pd.to_datetime(value)
+    except Exception:
+        return pd.NaT
+    if pd.notna(timestamp) and timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert(None)
+    return timestamp
+
+
+# Sensor of a Sentinel satellite
+def _sentinel_sensor(sat_data, satellite):
+    if 'Instrument' in sat_data.columns:
+        return sat_data['Instrument'].iloc[0]
+    return 'C-SAR' if 'Sentinel-1' in satellite else 'MSI'
+
+
+# str() of every value of a begin/end column, vectorized for datetime columns
+# (fractional seconds as microseconds when there are any, as pd.Timestamp prints)
+def _timestamp_text(values):
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype(str)
+    text = values.dt.strftime('%Y-%m-%d %H:%M:%S')
+    text = text.where(values.dt.microsecond == 0, text + values.dt.strftime('.%f'))
+    if values.dt.tz is not None:
+        offset = values.dt.strftime('%z')
+        text = text + offset.str[:3] + ':' + offset.str[3:]
+    return text
+
+
+# 'begin to end' frame timestamps ('Unknown' where either is missing)
+def _frame_timestamps(begin, end):
+    known = begin.notna() & end.notna()
+    return (_timestamp_text(begin) + ' to ' + _timestamp_text(end)).where(known, 'Unknown')
+
+
+# Frame table rows of Sentinel reference-plan footprints
+def _sentinel_frames(filtered, satellite, sensor):
+    return pd.DataFrame({
+        'satellite': satellite,
+        'source': 'sentinel',
+        'sensor': sensor,
+        'acquisition_date': filtered['acquisition_date'],
+        'begin': filtered['begin'].map(_to_timestamp) if 'begin' in filtered.columns else pd.NaT,
+        'end': filtered['end'].map(_to_timestamp) if 'end' in filtered.columns else pd.NaT,
+        'timestamp': (_frame_timestamps(filtered['begin'], filtered['end'])
+                      if 'begin' in filtered.columns and 'end' in filtered.columns else 'Unknown'),
+        'geometry': filtered.geometry,
+    })
+
+
+# Frames of each Sentinel satellite for the selected date's cycle day, projected to
+# the selected date (see cycle_projection.py for the indexed version)
+def _select_sentinel(sentinel_data, selected_date):
+    selections = []
+    for satellite in sentinel_data['satellite'].unique():
+        sat_data = sentinel_data[sentinel_data['satellite'] == satellite]
+        reference_date = sat_data['acquisition_date'].min().date()
+        target_date, cycles = cycle_position(reference_date, int(sat_data['revisit_frequency'].iloc[0]), selected_date)
+        filtered = sat_data[sat_data['acquisition_date'].dt.date == target_date]
+        sensor = _sentinel_sensor(sat_data, satellite)
+        frames = project_frames(_sentinel_frames(filtered, satellite, sensor), (selected_date - target_date).days,
+                                cycles, orbit_drift_seconds(sat_data))
+        selections.append((satellite, 'sentinel', sensor, target_date, frames))
+    return selections
+
+
+# Landsat frames acquired on the selected date
+def _select_landsat(landsat_data, selected_date, warnings):
+    if landsat_data['acquisition_date'].isna().all():
+        # Undated Landsat files are assumed to cover the whole of August
+        filtered = landsat_data if selected_date.month == 8 else landsat_data.iloc[0:0]
+    else:
+        filtered = landsat_data[landsat_data['acquisition_date'].dt.date == selected_date]
+        if filtered.empty:
+            warnings.append(f"No Landsat coverage found for {selected_date}.")
+    selections = []
+    for satellite in filtered['satellite'].unique():
+        sat_data = filtered[filtered['satellite'] == satellite]
+        sensor = sat_data['Instrument'].iloc[0] if 'Instrument' in sat_data.columns else 'OLI/TIRS'
+        selections.append((satellite, 'landsat', sensor, selected_date, _landsat_frames(sat_data, satellite, sensor)))
+    return selections
+
+
+# Frame table rows of Landsat scenes
+def _landsat_frames(sat_data, satellite, sensor):
+    return pd.DataFrame({
+        'satellite': satellite,
+        'source': 'landsat',
+        'sensor': sensor,
+        'acquisition_date': sat_data['acquisition_date'],
+        'begin': sat_data['acquisition_date'],
+        'end': sat_data['acquisition_date'],
+        'timestamp': [d.strftime('%H:%M:%S') if pd.notna(d) else 'Unknown' for d in sat_data['acquisition_date']],
+        'geometry': sat_data.geometry,
+    })
+
+
+# Commercial frames acquired on the selected date
+def _select_commercial(daily_data, selected_date):
+    selections = []
+    for satellite in daily_data['satellite'].unique():
+        sat_data = daily_data[daily_data['satellite'] == satellite]
+        filtered = sat_data[sat_data['acquisition_date'].dt.date == selected_date]
+        if filtered.empty:
+            continue
+        sensor = sat_data['Sensor'].iloc[0] if 'Sensor' in sat_data.columns else 'Unknown'
+        selections.append((satellite, 'commercial', sensor, selected_date, _commercial_frames(filtered, satellite, sensor)))
+    return selections
+
+
+# Frame table rows of commercial acquisitions
+def _commercial_frames(filtered, satellite, sensor):
+    starts = filtered['Start'] if 'Start' in filtered.columns else pd.Series(None, index=filtered.index)
+    ends = filtered['End'] if 'End' in filtered.columns else pd.Series(None, index=filtered.index)
+    return pd.DataFrame({
+        'satellite': satellite,
+        'source': 'commercial',
+        'sensor': sensor,
+        'acquisition_date': filtered['acquisition_date'],
+        'begin': starts.map(_to_timestamp),
+        'end': ends.map(_to_timestamp),
+        'timestamp': [f"{_time_of_day(s)} to {_time_of_day(e)}" for s, e in zip(starts, ends)],
+        'geometry': filtered.geometry,
+    })
+
+
+# Frames of every satellite for a date, as (satellite, source, sensor, target date, frames)
+def select_frames(sentinel_data, landsat_data, daily_data, selected_date, warnings=None):
+    if warnings is None:
+        warnings = []
+    selections = []
+    if sentinel_data is not None:
+        selections.extend(_select_sentinel(sentinel_data, selected_date))
+    if landsat_data is not None:
+        selections.extend(_select_landsat(landsat_data, selected_date, warnings))
+    if daily_data is not None:
+        selections.extend(_select_commercial(daily_data, selected_date))
+    return selections
+
+
+# Vector coverage backend: exact polygon intersections and unions, areas measured
+# in AREA_CRS. Backends share one interface so compute_day can run on either this
+# or the equal-area raster backend in raster_coverage.py:
+#   aoi_area_km2(aoi_gdf) -> float
+#   measure(aoi_gdf, geoms, groups, labels) -> dict with 'frame_areas_km2',
+#       'union_areas_km2' (one per group of geometry positions), 'residual' (one
+#       geometry per AOI row), 'residual_area_km2' and 'warnings'
+class VectorBackend:
+    name = 'vector'
+
+    def aoi_area_km2(self, aoi_gdf):
+        return area_km2(aoi_gdf.geometry)
+
+    def measure(self, aoi_gdf, geoms, groups, labels):
+        geoms = np.asarray(geoms, dtype=object)
+        warnings = []
+        unions = []
+        grouped = np.zeros(len(geoms), dtype=bool)
+        with profiling.stage('unions'):
+            for positions, label in zip(groups, labels):
+                try:
+                    unions.append(union_geometries(geoms[positions]))
+                    grouped[positions] = True
+                except Exception as e:
+                    warnings.append(f"Error computing union for {label}: {str(e)}")
+                    unions.append(None)
+        # Per-frame and per-union areas, each in one batch
+        with profiling.stage('frame areas'):
+            frame_areas = frame_areas_km2(aoi_gdf, geoms)
+        with profiling.stage('union areas'):
+            union_areas = frame_areas_km2(aoi_gdf, unions)
+
+        # Residual AOI: the part of the AOI not covered by any frame
+        with profiling.stage('residual'):
+            # When the groups cover every frame, their unions give the combined union cheaply
+            combined_union = union_geometries(unions if grouped.all() else geoms)
+            residual = aoi_gdf.geometry
+            if combined_union is not None:
+                residual = residual.difference(combined_union)
+                residual = residual.apply(lambda g: shapely.make_valid(g) if not g.is_valid else g)
+            residual_area = area_km2(residual)
+        return {
+            'frame_areas_km2': frame_areas,
+            'union_areas_km2': union_areas,
+            'residual': list(residual),
+            'residual_area_km2': residual_area,
+            'warnings': warnings,
+        }
+
+
+# Content key of a set of geometries (SHA-1 of their WKB, in order), for memoizing
+# work on the same frames or AOI
+def geometry_digest(geoms):
+    digest = hashlib.sha1()
+    for wkb in shapely.to_wkb(np.asarray(geoms, dtype=object)):
+        digest.update(wkb if wkb is not None else b'\0')
+    return digest.hexdigest()
+
+
+# Vector backend that memoizes its work, so repeated and related days are cheap.
+#
+# Each satellite group is keyed by the WKB of its frames: a Sentinel satellite
+# selects the same reference-plan frames on every date with the same cycle offset,
+# so its union, union area and frame areas are computed once and reused. Aggregate
+# groups (free, commercial) and the combined coverage are cascaded unions of the
+# memoized satellite unions, memoized per set of satellites and grown from the
+# largest cached subset, so switching one satellite on unions one geometry more and
+# switching it off only re-unions cached pieces. The residual AOI is one difference
+# of the AOI against the combined union, memoized per set of satellites.
+class CoverageAccumulator(VectorBackend):
+    name = 'vector-memo'
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._memo[key]
+            self.stats['misses'] += 1
+            return None
+
+    def _put(self, key, value):
+        with self._lock:
+            self._memo[key] = value
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+            self.stats = {'hits': 0, 'misses': 0}
+
+    def aoi_area_km2(self, aoi_gdf):
+        key = ('aoi area', geometry_digest(aoi_gdf.geometry.to_numpy()))
+        cached = self._get(key)
+        return cached if cached is not None else self._put(key, area_km2(aoi_gdf.geometry))
+
+    # Union, union area and frame areas of one satellite group
+    def _satellite(self, aoi_key, aoi_gdf, geoms, label, warnings):
+        key = ('satellite', aoi_key, geometry_digest(geoms))
+        cached = self._get(key)
+        if cached is not None:
+            return key, cached
+        try:
+            union = union_geometries(geoms)
+        except Exception as e:
+            warnings.append(f"Error computing union for {label}: {str(e)}")
+            return key, (None, 0.0, frame_areas_km2(aoi_gdf, geoms))
+        union_area, *frame_areas = frame_areas_km2(aoi_gdf, [union, *geoms])
+        return key, self._put(key, (union, union_area, np.array(frame_areas)))
+
+    # Cascaded union of several satellite unions, grown from the largest cached subset
+    def _union_of(self, keys, unions):
+        keys = frozenset(keys)
+        cached = self._get(('union', keys))
+        if cached is not None:
+            return cached[0]
+        with self._lock:
+            subsets = [(k[1], value[0]) for k, value in self._memo.items() if k[0] == 'union' and k[1] < keys]
+        base_keys, base_union = max(subsets, key=lambda item: len(item[0]), default=(frozenset(), None))
+        union = union_geometries([base_union, *(unions[k] for k in keys - base_keys)])
+        self._put(('union', keys), (union,))
+        return union
+
+    def measure(self, aoi_gdf, geoms, groups, labels):
+        geoms = np.asarray(geoms, dtype=object)
+        aoi_key = geometry_digest(aoi_gdf.geometry.to_numpy())
+        warnings = []
+
+        # Satellite groups are the groups that contain no other group; the rest
+        # (free, commercial) are built from the satellite groups inside them
+        group_sets = [frozenset(positions.tolist()) for positions in groups]
+        atomic = [k for k, positions in enumerate(group_sets)
+                  if positions and not any(other < positions for other in group_sets if other)]
+        with profiling.stage('satellite unions'):
+            frame_areas = np.zeros(len(geoms))
+            keys = {}
+            unions = {}
+            union_areas = np.zeros(len(groups))
+            for k in atomic:
+                key, (union, union_area, areas) = self._satellite(aoi_key, aoi_gdf, geoms[groups[k]], labels[k], warnings)
+                frame_areas[groups[k]] = areas
+                keys[k] = key
+                unions[key] = union
+                union_areas[k] = union_area
+            loose = np.setdiff1d(np.arange(len(geoms)), np.concatenate([groups[k] for k in atomic]) if atomic else [])
+            if len(loose):
+                frame_areas[loose] = frame_areas_km2(aoi_gdf, geoms[loose])
+
+        # Aggregate groups: one cascaded union each, the missing areas in one batch
+        with profiling.stage('aggregate unions'):
+            missing = {}
+            for k in range(len(groups)):
+                if k in keys:
+                    continue
+                inside = [j for j in atomic if group_sets[j] <= group_sets[k]]
+                covered = set().union(*(group_sets[j] for j in inside))
+                rest = [p for p in groups[k] if p not in covered]
+                area_key = ('area', aoi_key, frozenset(keys[j] for j in inside), geometry_digest(geoms[rest]))
+                cached = self._get(area_key)
+                if cached is not None:
+                    union_areas[k] = cached[0]
+                    continue
+                union = self._union_of([keys[j] for j in inside], unions) if inside else None
+                missing[k] = (area_key, union_geometries([union, *geoms[rest]]) if rest else union)
+            if missing:
+                areas = frame_areas_km2(aoi_gdf, [union for _, union in missing.values()])
+                for (k, (area_key, _)), area in zip(missing.items(), areas):
+                    union_areas[k] = self._put(area_key, (float(area),))[0]
+
+        # Residual AOI: one difference against the combined union
+        with profiling.stage('residual'):
+            all_keys = frozenset(keys.values())
+            residual_key = ('residual', aoi_key, all_keys, geometry_digest(geoms[loose]))
+            cached = self._get(residual_key)
+            if cached is None:
+                combined_union = self._union_of(all_keys, unions) if all_keys else None
+                if len(loose):
+                    combined_union = union_geometries([combined_union, *geoms[loose]])
+                residual = aoi_gdf.geometry
+                if combined_union is not None:
+                    residual = residual.difference(combined_union)
+                    residual = residual.apply(lambda g: shapely.make_valid(g) if not g.is_valid else g)
+                cached = self._put(residual_key, (list(residual), area_km2(residual)))
+        profiling.record('memo entries', len(self._memo))
+        return {
+            'frame_areas_km2': frame_areas,
+            'union_areas_km2': union_areas,
+            'residual': list(cached[0]),
+            'residual_area_km2': cached[1],
+            'warnings': warnings,
+        }
+
+
+VECTOR_BACKEND = CoverageAccumulator()
+
+
+# Compute coverage of the AOI for one date.
+#
+# Returns a dict with the per-frame table ('frames'), the per-satellite summary
+# ('satellites'), the free/commercial/combined union areas, the residual
+# (uncovered) AOI geometries and any warnings raised along the way. Areas are
+# measured by the given backend (VECTOR_BACKEND by default). When 'satellites' is
+# given, only the frames of those satellites count towards coverage. With a
+# footprint_catalog.FootprintCatalog, frames are looked up in the catalog and the
+# source data arguments are ignored.
+def compute_day(aoi_gdf, sentinel_data, landsat_data, daily_data, selected_date, backend=None, satellites=None,
+                catalog=None):
+    if backend is None:
+        backend = VECTOR_BACKEND
+    warnings = []
+    original_area = backend.aoi_area_km2(aoi_gdf)
+    with profiling.stage('select frames'):
+        if catalog is not None:
+            selections = catalog.select_frames(selected_date, warnings)
+        else:
+            selections = select_frames(sentinel_data, landsat_data, daily_data, selected_date, warnings)
+    if satellites is not None:
+        selections = [selection for selection in selections if selection[0] in satellites]
+
+    if selections:
+        frames = pd.concat([frames for *_, frames in selections], ignore_index=True)
+    else:
+        frames = pd.DataFrame(columns=FRAME_COLUMNS[:-3] + ['geometry'])
+    frames = gpd.GeoDataFrame(frames, geometry='geometry', crs='EPSG:4326')
+    geoms = frames.geometry.to_numpy()
+
+    # Unions per satellite and per group (free: Sentinel + Landsat, commercial: daily satellites)
+    groups = []
+    labels = []
+    offset = 0
+    for satellite, source, sensor, target_date, sat_frames in selections:
+        groups.append(np.arange(offset, offset + len(sat_frames)))
+        labels.append(f"{satellite} on {target_date}")
+        offset += len(sat_frames)
+    is_commercial = (frames['source'] == 'commercial').to_numpy(dtype=bool)
+    groups += [np.flatnonzero(~is_commercial), np.flatnonzero(is_commercial)]
+    labels += ['free frames', 'commercial frames']
+
+    with profiling.stage(f'measure ({backend.name})'):
+        measured = backend.measure(aoi_gdf, geoms, groups, labels)
+    if profiling.active():
+        profiling.record('frames', len(geoms))
+        profiling.record('frame vertices', profiling.vertex_count(geoms))
+        profiling.record('AOI vertices', profiling.vertex_count(aoi_gdf.geometry))
+        profiling.record('residual vertices', profiling.vertex_count(measured['residual']))
+    warnings.extend(measured['warnings'])
+    frames['area_km2'] = measured['frame_areas_km2']
+    frames['percentage'] = frames['area_km2'] / original_area * 100 if original_area > 0 else 0.0
+    frames = frames[FRAME_COLUMNS]
+
+    satellite_rows = []
+    for (satellite, source, sensor, target_date, sat_frames), positions, union_area in zip(
+            selections, groups, measured['union_areas_km2']):
+        satellite_rows.append({
+            'satellite': satellite,
+            'source': source,
+            'sensor': sensor,
+            'target_date': target_date,
+            'frame_count': len(sat_frames),
+            'timestamp': frames['timestamp'].iloc[positions[0]] if len(positions) else 'Unknown',
+            'individual_area_km2': float(frames['area_km2'].iloc[positions].sum()),
+            'union_area_km2': float(union_area),
+        })
+    residual = measured['residual']
+    residual_area = measured['residual_area_km2']
+    if original_area > 0:
+        covered_percentage = (1 - residual_area / original_area) * 100
+    else:
+        covered_percentage = 0.0
+        warnings.append("Original AOI area is zero or invalid, cannot compute coverage percentage.")
+
+    return {
+        'date': selected_date,
+        'original_area_km2': original_area,
+        'frames': frames,
+        'satellites': pd.DataFrame(satellite_rows, columns=[
+            'satellite', 'source', 'sensor', 'target_date', 'frame_count', 'timestamp',
+            'individual_area_km2', 'union_area_km2',
+        ]),
+        'free_frames': int((~is_commercial).sum()),
+        'commercial_frames': int(is_commercial.sum()),
+        'free_area_km2': float(measured['union_areas_km2'][-2]),
+        'commercial_area_km2': float(measured['union_areas_km2'][-1]),
+        'combined_area_km2': original_area - residual_area,
+        'residual': list(residual),
+        'residual_area_km2': residual_area,
+        'covered_percentage': covered_percentage,
+        'warnings': warnings,
+    }
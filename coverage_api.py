@@ -0,0 +1,289 @@
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import config
+
+# Headless coverage numbers (AOI coverage %, the free/commercial frame summary and
+# the per-satellite table of the Map View) for other systems, without the map, as
+# functions to import or as a local HTTP/JSON service:
+#   GET /coverage?date=YYYY-MM-DD[&aoi=<name>][&satellites=A,B]   coverage of a date
+#   GET /aois                                                     AOI names
+#   GET /stats                   start-up timings and request latency percentiles
+# AOI names are the file names of config.aoi_file and of the files in
+# config.aoi_dir (see coverage_summary.aoi_choices); the default AOI is the EEZ.
+# Unknown AOIs and satellites are answered with a 400 error.
+#
+# Only the standard library is imported with this module, so it starts fast and
+# can be imported by anything; geopandas, shapely and the coverage modules are
+# imported by the first call that needs them (warm() runs it ahead of the first
+# request, in the background while the server already accepts connections). The
+# server keeps the loaded sources, the footprint catalog, the memoized unions of
+# coverage.VECTOR_BACKEND and an LRU of results in memory, and answers requests in
+# threads (ThreadingHTTPServer; GEOS releases the GIL during the geometry work).
+# Results are keyed by the fingerprint of their source files, so a changed file is
+# picked up by the next request.
+API_HOST = '127.0.0.1'
+API_PORT = 8766
+
+# Results kept in memory
+MAX_RESULTS = 256
+
+# Latencies kept per endpoint for the percentiles of /stats
+LATENCY_WINDOW = 2048
+PERCENTILES = [50, 90, 99]
+
+_imported_at = time.perf_counter()
+_startup = {}
+_results = OrderedDict()
+_results_lock = threading.Lock()
+_warm_lock = threading.Lock()
+
+
+# Request latencies per endpoint over a sliding window
+class LatencyStats:
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._latencies = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds):
+        with self._lock:
+            self._latencies.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    # {endpoint: {'count', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms'}} (nearest-rank
+    # percentiles of the window)
+    def summary(self):
+        with self._lock:
+            latencies = {endpoint: sorted(values) for endpoint, values in self._latencies.items()}
+            counts = dict(self._counts)
+        summary = {}
+        for endpoint, values in latencies.items():
+            row = {'count': counts[endpoint]}
+            for p in PERCENTILES:
+                row[f'p{p}_ms'] = round(values[max(math.ceil(p / 100 * len(values)) - 1, 0)] * 1000, 2)
+            row['max_ms'] = round(values[-1] * 1000, 2)
+            summary[endpoint] = row
+        return summary
+
+
+latency = LatencyStats()
+
+
+# AOI names and files (see coverage_summary.aoi_choices)
+def aoi_files():
+    import coverage_summary
+    return coverage_summary.aoi_choices()
+
+
+def _aoi_file(aoi):
+    if aoi is None:
+        return config.aoi_file
+    files = aoi_files()
+    if aoi not in files:
+        raise ValueError(f"Unknown AOI {aoi!r}, expected one of {sorted(files)}")
+    return files[aoi]
+
+
+# AOI name of a request with the default AOI (config.aoi_file) as None, so naming it
+# explicitly reads the same index and cache entries as leaving it out
+def _aoi_name(aoi):
+    return None if _aoi_file(aoi) == config.aoi_file else aoi
+
+
+# Satellites of a request as a sorted tuple (None: all), checked against the
+# satellites of the footprint catalog
+def _satellites(satellites):
+    if satellites is None:
+        return None
+    import footprint_catalog
+    known = footprint_catalog.shared_catalog().satellite_sources()
+    unknown = sorted(set(satellites) - set(known))
+    if unknown:
+        raise ValueError(f"Unknown satellites {unknown}, expected some of {list(known)}")
+    return tuple(sorted(set(satellites)))
+
+
+# Free (Sentinel + Landsat) and commercial (daily satellites) frame counts and union
+# areas of a day, as in the Map View's frame summary
+def frame_summary(day):
+    original_area = day['original_area_km2']
+    rows = []
+    for frame_type, label, frames, area in [
+        ('free', 'Free (Sentinel + Landsat)', day['free_frames'], day['free_area_km2']),
+        ('commercial', 'Commercial (Daily Satellites)', day['commercial_frames'], day['commercial_area_km2']),
+    ]:
+        rows.append({
+            'frame_type': frame_type,
+            'label': label,
+            'frames': int(frames),
+            'area_km2': float(area),
+            'percentage': float(area / original_area * 100) if original_area > 0 else 0.0,
+        })
+    return rows
+
+
+# Coverage of a date (as returned by coverage.compute_day): a lookup in the coverage
+# index for the default AOI with every satellite when the index is current, else
+# computed from the shared footprint catalog
+def compute(selected_date, aoi=None, satellites=None):
+    import coverage
+    import coverage_index
+    import data_store
+    import footprint_catalog
+
+    aoi_file = _aoi_file(_aoi_name(aoi))
+    if satellites is None and aoi_file == config.aoi_file and coverage_index.index_is_current(aoi_file=aoi_file):
+        day = coverage_index.lookup_day(selected_date)
+        if day is not None:
+            return day
+    return coverage.compute_day(data_store.load_aoi(aoi_file), None, None, None, selected_date,
+                                satellites=set(satellites) if satellites is not None else None,
+                                catalog=footprint_catalog.shared_catalog())
+
+
+# JSON-ready result of a day
+def day_result(day, aoi=None):
+    satellites = []
+    for row in day['satellites'].itertuples(index=False):
+        satellites.append({
+            'satellite': row.satellite,
+            'source': row.source,
+            'sensor': str(row.sensor),
+            'target_date': str(row.target_date),
+            'frames': int(row.frame_count),
+            'timestamp': str(row.timestamp),
+            'individual_area_km2': float(row.individual_area_km2),
+            'union_area_km2': float(row.union_area_km2),
+        })
+    return {
+        'date': day['date'].isoformat(),
+        'aoi': aoi or os.path.basename(config.aoi_file),
+        'aoi_area_km2': float(day['original_area_km2']),
+        'covered_area_km2': float(day['combined_area_km2']),
+        'covered_percentage': float(day['covered_percentage']),
+        'frame_summary': frame_summary(day),
+        'satellites': satellites,
+        'warnings': list(day['warnings']),
+    }
+
+
+# Coverage result of a date for an AOI name and satellites (None: all), from the
+# in-memory LRU when its source files are unchanged. Unknown AOIs and satellites
+# raise ValueError.
+def coverage_result(selected_date, aoi=None, satellites=None):
+    import coverage_index
+
+    aoi = _aoi_name(aoi)
+    satellites = _satellites(satellites)
+    stamps = json.dumps(coverage_index.source_stamps([selected_date], _aoi_file(aoi)), sort_keys=True)
+    key = (selected_date, aoi, satellites, stamps)
+    with _results_lock:
+        if key in _results:
+            _results.move_to_end(key)
+            return _results[key]
+    result = day_result(compute(selected_date, aoi, satellites), aoi)
+    with _results_lock:
+        _results[key] = result
+        while len(_results) > MAX_RESULTS:
+            _results.popitem(last=False)
+    return result
+
+
+# Import the coverage modules and load the sources and the footprint catalog (once)
+def warm():
+    with _warm_lock:
+        if 'warm_s' in _startup:
+            return
+        start = time.perf_counter()
+        import data_store
+        import footprint_catalog
+        _startup['heavy_imports_s'] = round(time.perf_counter() - start, 3)
+        data_store.load_aoi(config.aoi_file)
+        footprint_catalog.shared_catalog()
+        _startup['warm_s'] = round(time.perf_counter() - start, 3)
+        _startup['import_to_warm_s'] = round(time.perf_counter() - _imported_at, 3)
+
+
+# Start-up timings and latency percentiles
+def stats():
+    return {'startup': dict(_startup, warm='warm_s' in _startup), 'latency': latency.summary(),
+            'cached_results': len(_results)}
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            if url.path == '/coverage':
+                if 'date' not in params:
+                    raise ValueError("Missing 'date' parameter (YYYY-MM-DD).")
+                satellites = params.get('satellites')
+                payload = coverage_result(
+                    date.fromisoformat(params['date']),
+                    params.get('aoi'),
+                    [s for s in satellites.split(',') if s] if satellites is not None else None,
+                )
+            elif url.path == '/aois':
+                payload = {'aois': sorted(aoi_files())}
+            elif url.path == '/stats':
+                payload = stats()
+            else:
+                self._send_json(404, {'error': f"Unknown path {url.path}"})
+                return
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+            return
+        elapsed = time.perf_counter() - start
+        if url.path == '/coverage':
+            payload = dict(payload, elapsed_ms=round(elapsed * 1000, 2))
+        latency.record(url.path, elapsed)
+        self._send_json(200, payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Serve the API; with warm_up, the coverage modules and sources are loaded in the
+# background once the server accepts connections
+def serve(host=API_HOST, port=API_PORT, warm_up=True):
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    _startup['import_to_ready_s'] = round(time.perf_counter() - _imported_at, 3)
+    if warm_up:
+        threading.Thread(target=warm, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve coverage numbers as JSON over HTTP')
+    parser.add_argument('--host', default=API_HOST)
+    parser.add_argument('--port', type=int, default=API_PORT)
+    parser.add_argument('--no-warm', action='store_true', help='Load the sources on the first request instead')
+    args = parser.parse_args()
+    server = serve(args.host, args.port, warm_up=not args.no_warm)
+    print(f"Serving coverage on http://{args.host}:{args.port}/coverage?date=YYYY-MM-DD "
+          f"(ready {_startup['import_to_ready_s']:.3f}s after import)")
+    server.serve_forever()
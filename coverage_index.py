@@ -0,0 +1,373 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+import config
+import coverage
+import data_store
+import raster_coverage
+
+# Precomputed per-day coverage, stored in a SQLite file indexed by date.
+# Building it runs compute_day once for every date in a range; the app and the
+# CSV exports then only look rows up. The source files' mtimes and sizes are
+# recorded at build time so a stale index is detected and ignored.
+INDEX_FILE = os.path.join(config.base_dir, 'coverage_index.sqlite')
+
+# Bump when the stored layout or the coverage computation changes
+INDEX_VERSION = 2
+
+# Sources listed per satellite in the individual/union coverage reports (the
+# notebook's reports cover the Sentinel reference plans only)
+REPORT_SOURCES = ['sentinel']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS days (
+    date TEXT PRIMARY KEY,
+    original_area_km2 REAL,
+    free_frames INTEGER,
+    commercial_frames INTEGER,
+    free_area_km2 REAL,
+    commercial_area_km2 REAL,
+    combined_area_km2 REAL,
+    residual_area_km2 REAL,
+    covered_percentage REAL,
+    residual_wkb BLOB,
+    warnings TEXT
+);
+CREATE TABLE IF NOT EXISTS satellites (
+    date TEXT,
+    position INTEGER,
+    satellite TEXT,
+    source TEXT,
+    sensor TEXT,
+    target_date TEXT,
+    frame_count INTEGER,
+    timestamp TEXT,
+    individual_area_km2 REAL,
+    union_area_km2 REAL,
+    PRIMARY KEY (date, position)
+);
+CREATE TABLE IF NOT EXISTS frames (
+    date TEXT,
+    position INTEGER,
+    satellite TEXT,
+    source TEXT,
+    sensor TEXT,
+    acquisition_date TEXT,
+    begin TEXT,
+    "end" TEXT,
+    timestamp TEXT,
+    area_km2 REAL,
+    percentage REAL,
+    wkb BLOB,
+    PRIMARY KEY (date, position)
+);
+CREATE INDEX IF NOT EXISTS frames_satellite ON frames (satellite, date);
+"""
+
+
+# Dates from start to end inclusive
+def date_range(start_date, end_date):
+    return [start_date + timedelta(days=x) for x in range((end_date - start_date).days + 1)]
+
+
+# Modification time and size of every source file feeding the index
+def source_stamps(dates, aoi_file=config.aoi_file):
+    files = [aoi_file, config.landsat8_file, config.landsat9_file]
+    files += [c['file'] for c in config.satellite_configs]
+    files += [config.commercial_file(day) for day in dates]
+    files.append(os.path.join(config.store_dir, data_store.STORE_MANIFEST))
+    return file_stamps(files)
+
+
+# {absolute path: [mtime_ns, size] or None when missing} of some files and of the
+# simplified versions read in their place (see simplify.py)
+def file_stamps(files):
+    files = list(files)
+    files += [data_store.simplified_file(file) for file in files]
+    stamps = {}
+    for file in sorted(set(files)):
+        if os.path.exists(file):
+            stat = os.stat(file)
+            stamps[os.path.abspath(file)] = [stat.st_mtime_ns, stat.st_size]
+        else:
+            stamps[os.path.abspath(file)] = None
+    return stamps
+
+
+def _iso(value):
+    if value is None or pd.isna(value):
+        return None
+    return pd.Timestamp(value).isoformat()
+
+
+def _connect(index_file):
+    conn = sqlite3.connect(index_file)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# Write one compute_day result into the index, replacing any previous rows for that date
+def _write_day(conn, day):
+    key = day['date'].isoformat()
+    conn.execute('DELETE FROM days WHERE date = ?', (key,))
+    conn.execute('DELETE FROM satellites WHERE date = ?', (key,))
+    conn.execute('DELETE FROM frames WHERE date = ?', (key,))
+    residual = shapely.to_wkb(shapely.geometrycollections(day['residual']))
+    conn.execute(
+        'INSERT INTO days VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        (key, day['original_area_km2'], day['free_frames'], day['commercial_frames'],
+         day['free_area_km2'], day['commercial_area_km2'], day['combined_area_km2'],
+         day['residual_area_km2'], day['covered_percentage'], residual, json.dumps(day['warnings'])),
+    )
+    conn.executemany(
+        'INSERT INTO satellites VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        [
+            (key, i, row.satellite, row.source, str(row.sensor), _iso(row.target_date), int(row.frame_count),
+             row.timestamp, row.individual_area_km2, row.union_area_km2)
+            for i, row in enumerate(day['satellites'].itertuples(index=False))
+        ],
+    )
+    frames = day['frames']
+    wkbs = shapely.to_wkb(frames.geometry.to_numpy()) if len(frames) else []
+    conn.executemany(
+        'INSERT INTO frames VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        [
+            (key, i, row.satellite, row.source, str(row.sensor), _iso(row.acquisition_date), _iso(row.begin),
+             _iso(row.end), row.timestamp, row.area_km2, row.percentage, wkb)
+            for i, (row, wkb) in enumerate(zip(frames.itertuples(index=False), wkbs))
+        ],
+    )
+
+
+# Compute coverage for every date in [start_date, end_date] with a backend (see
+# raster_coverage.BACKENDS) and store it in the index. A rebuild starts from an empty
+# index, so it only ever holds the dates its metadata describes.
+def build_index(start_date, end_date, index_file=INDEX_FILE, aoi_file=config.aoi_file, backend='vector', log=print):
+    measure = raster_coverage.get_backend(backend)
+    dates = date_range(start_date, end_date)
+    aoi_gdf = data_store.load_aoi(aoi_file)
+    sentinel_data = data_store.load_sentinel(config.satellite_configs)
+    landsat_data = data_store.load_landsat(config.landsat8_file, config.landsat9_file)
+
+    start = time.perf_counter()
+    conn = _connect(index_file)
+    try:
+        with conn:
+            for table in ['meta', 'days', 'satellites', 'frames']:
+                conn.execute(f'DELETE FROM {table}')
+        for selected_date in dates:
+            daily_data = data_store.load_commercial_day(selected_date)
+            day = coverage.compute_day(aoi_gdf, sentinel_data, landsat_data, daily_data, selected_date, backend=measure)
+            with conn:
+                _write_day(conn, day)
+            log(f"{selected_date}: {len(day['frames'])} frames, {day['covered_percentage']:.2f}% covered")
+        with conn:
+            meta = {
+                'version': str(INDEX_VERSION),
+                'aoi_file': os.path.abspath(aoi_file),
+                'backend': backend,
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat(),
+                'sources': json.dumps(source_stamps(dates, aoi_file)),
+                'built_at': datetime.now().isoformat(timespec='seconds'),
+            }
+            conn.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', meta.items())
+    finally:
+        conn.close()
+    log(f"Coverage index for {len(dates)} dates written to {index_file} in {time.perf_counter() - start:.1f}s")
+
+
+# Build metadata of an index (empty dict when the index does not exist)
+def read_meta(index_file=INDEX_FILE):
+    if not os.path.exists(index_file):
+        return {}
+    conn = _connect(index_file)
+    try:
+        return dict(conn.execute('SELECT key, value FROM meta').fetchall())
+    finally:
+        conn.close()
+
+
+# Whether the index was built for this AOI with this backend from the current
+# versions of its source files
+def index_is_current(index_file=INDEX_FILE, aoi_file=config.aoi_file, backend='vector'):
+    meta = read_meta(index_file)
+    if not meta or meta.get('version') != str(INDEX_VERSION):
+        return False
+    if meta.get('aoi_file') != os.path.abspath(aoi_file) or meta.get('backend', 'vector') != backend:
+        return False
+    dates = date_range(date.fromisoformat(meta['start_date']), date.fromisoformat(meta['end_date']))
+    return json.loads(meta['sources']) == source_stamps(dates, aoi_file)
+
+
+# Look up the coverage of one date, in the same shape compute_day returns (None if absent)
+def lookup_day(selected_date, index_file=INDEX_FILE):
+    if not os.path.exists(index_file):
+        return None
+    key = selected_date.isoformat()
+    conn = _connect(index_file)
+    try:
+        day_row = conn.execute('SELECT * FROM days WHERE date = ?', (key,)).fetchone()
+        if day_row is None:
+            return None
+        satellites = pd.read_sql_query(
+            'SELECT satellite, source, sensor, target_date, frame_count, timestamp, individual_area_km2, union_area_km2 '
+            'FROM satellites WHERE date = ? ORDER BY position', conn, params=(key,))
+        frames = pd.read_sql_query(
+            'SELECT satellite, source, sensor, acquisition_date, begin, "end", timestamp, area_km2, percentage, wkb '
+            'FROM frames WHERE date = ? ORDER BY position', conn, params=(key,))
+    finally:
+        conn.close()
+
+    satellites['target_date'] = pd.to_datetime(satellites['target_date'], format='ISO8601').dt.date
+    for column in ['acquisition_date', 'begin', 'end']:
+        frames[column] = pd.to_datetime(frames[column], format='ISO8601')
+    geometry = shapely.from_wkb(frames.pop('wkb').to_numpy()) if len(frames) else []
+    frames = gpd.GeoDataFrame(frames, geometry=gpd.GeoSeries(geometry, crs='EPSG:4326'))
+    residual = shapely.from_wkb(day_row[9])
+    return {
+        'date': selected_date,
+        'original_area_km2': day_row[1],
+        'frames': frames[coverage.FRAME_COLUMNS],
+        'satellites': satellites,
+        'free_frames': day_row[2],
+        'commercial_frames': day_row[3],
+        'free_area_km2': day_row[4],
+        'commercial_area_km2': day_row[5],
+        'combined_area_km2': day_row[6],
+        'residual': list(residual.geoms),
+        'residual_area_km2': day_row[7],
+        'covered_percentage': day_row[8],
+        'warnings': json.loads(day_row[10]),
+    }
+
+
+# Coverage of one date: the indexed result when the index is current, otherwise
+# computed from the (cached) source files
+def load_day(selected_date, index_file=INDEX_FILE, aoi_file=config.aoi_file):
+    day = None
+    if index_is_current(index_file, aoi_file):
+        day = lookup_day(selected_date, index_file)
+    if day is None:
+        day = coverage.compute_day(
+            data_store.load_aoi(aoi_file),
+            data_store.load_sentinel(config.satellite_configs),
+            data_store.load_landsat(config.landsat8_file, config.landsat9_file),
+            data_store.load_commercial_day(selected_date),
+            selected_date,
+        )
+    return day
+
+
+# Format the first frame's begin/end as the timestamp used in the CSV reports
+def _report_timestamp(begin, end):
+    if pd.isna(begin) or pd.isna(end):
+        return 'Unknown'
+    return f"{pd.Timestamp(begin).strftime('%Y-%m-%d %H:%M:%S')} to {pd.Timestamp(end).strftime('%Y-%m-%d %H:%M:%S')}"
+
+
+# Suffix of the report file names: the month ('august_2025') when the dates fall in
+# one month, otherwise the date range
+def report_suffix(first_date, last_date):
+    first, last = pd.Timestamp(first_date), pd.Timestamp(last_date)
+    if (first.year, first.month) == (last.year, last.month):
+        return first.strftime('%B_%Y').lower()
+    return f"{first.strftime('%Y-%m-%d')}_{last.strftime('%Y-%m-%d')}"
+
+
+# Write the notebook's coverage CSVs (per-satellite rows of REPORT_SOURCES only)
+# and the commercial frame summary.
+# 'days' holds one row per date (date, free/commercial/combined_area_km2) and
+# 'satellites' one row per date and satellite (date, satellite, source, frame_count,
+# individual/union_area_km2 and the begin/end of the satellite's first frame).
+def write_reports(days, satellites, output_dir=config.base_dir, suffix=None):
+    if days.empty:
+        raise ValueError("No dates to report.")
+    days = days.sort_values('date')
+    satellites = satellites.sort_values(['date', 'position'])
+    if suffix is None:
+        suffix = report_suffix(days['date'].iloc[0], days['date'].iloc[-1])
+
+    satellites = satellites.assign(
+        Timestamp=[_report_timestamp(b, e) for b, e in zip(satellites['begin'], satellites['end'])]
+    ).rename(columns={
+        'date': 'Date', 'satellite': 'Satellite',
+        'individual_area_km2': 'Individual_Area_km2', 'union_area_km2': 'Union_Area_km2',
+    }).round({'Individual_Area_km2': 2, 'Union_Area_km2': 2})
+
+    reported = satellites[satellites['source'].isin(REPORT_SOURCES)]
+    reports = {
+        f'free_satellite_individual_coverage_{suffix}.csv':
+            reported[['Date', 'Satellite', 'Timestamp', 'Individual_Area_km2']],
+        f'satellite_coverage_areas_{suffix}.csv':
+            reported[['Date', 'Satellite', 'Timestamp', 'Individual_Area_km2', 'Union_Area_km2']],
+    }
+    for prefix, column in [('free', 'free_area_km2'), ('commercial', 'commercial_area_km2'), ('all', 'combined_area_km2')]:
+        reports[f'{prefix}_satellite_combined_coverage_{suffix}.csv'] = pd.DataFrame({
+            'Date': days['date'],
+            'Combined_Area_km2': days[column].round(2),
+        })
+
+    # Commercial frames per satellite: total, days with at least one frame, average per
+    # such day, and an ALL row over every commercial satellite
+    commercial = satellites[(satellites['source'] == 'commercial') & (satellites['frame_count'] > 0)]
+    summary = commercial.groupby('Satellite', sort=False).agg(
+        **{'Total Frames': ('frame_count', 'sum'), 'Days Covered': ('Date', 'nunique')}
+    ).reset_index()
+    summary.loc[len(summary)] = ['ALL', commercial['frame_count'].sum(), commercial['Date'].nunique()]
+    summary['Average Frames per Day'] = summary['Total Frames'] / summary['Days Covered'].where(summary['Days Covered'] > 0)
+    reports['satellite_frame_summary.csv'] = summary
+
+    written = []
+    for name, df in reports.items():
+        path = os.path.join(output_dir, name)
+        df.to_csv(path, index=False)
+        written.append(path)
+    return written
+
+
+# Write the reports (see write_reports) from the index
+def export_csvs(output_dir=config.base_dir, index_file=INDEX_FILE, suffix=None):
+    conn = _connect(index_file)
+    try:
+        days = pd.read_sql_query('SELECT * FROM days ORDER BY date', conn)
+        satellites = pd.read_sql_query('SELECT * FROM satellites ORDER BY date, position', conn)
+        first_frames = pd.read_sql_query(
+            'SELECT date, satellite, begin, "end", MIN(position) AS position FROM frames GROUP BY date, satellite',
+            conn).drop(columns='position')
+    finally:
+        conn.close()
+    if days.empty:
+        raise ValueError(f"Coverage index {index_file} holds no dates.")
+    satellites = satellites.merge(first_frames, on=['date', 'satellite'], how='left')
+    return write_reports(days, satellites, output_dir, suffix)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the precomputed per-day coverage index.")
+    parser.add_argument('--start', type=date.fromisoformat, default=date(2025, 8, 1), help="First date (YYYY-MM-DD)")
+    parser.add_argument('--end', type=date.fromisoformat, default=date(2025, 8, 31), help="Last date (YYYY-MM-DD)")
+    parser.add_argument('--index', default=INDEX_FILE, help="Index file to write")
+    parser.add_argument('--aoi', default=config.aoi_file, help="AOI GeoJSON file")
+    parser.add_argument('--export-csv', metavar='DIR', help="Also write the coverage CSV reports to DIR")
+    parser.add_argument('--backend', choices=raster_coverage.BACKENDS, default='vector',
+                        help="Coverage backend: exact polygons or the equal-area grid of raster_coverage.py "
+                             "(the app only reads vector indexes)")
+    args = parser.parse_args()
+
+    build_index(args.start, args.end, index_file=args.index, aoi_file=args.aoi, backend=args.backend)
+    if args.export_csv:
+        for path in export_csvs(args.export_csv, index_file=args.index):
+            print(f"Saved {path}")
@@ -0,0 +1,276 @@
+import argparse
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import shapely
+
+import config
+import coverage
+import data_store
+import footprint_catalog
+import raster_coverage
+
+# Live frame summary (the Summary Table page) over a date range, a set of satellites
+# and an AOI, aggregated from the footprint catalog rather than read from the
+# satellite_frame_summary.csv the notebook last wrote. Per satellite:
+#   - frames intersecting the AOI, days with at least one, frames per such day
+#   - km² of the AOI covered over the range and the part of it that no other
+#     selected satellite covers (unique area)
+#   - revisit: mean and longest gap in days between consecutive covered days
+# plus an ALL row over the selected satellites.
+#
+# Areas are counted on the equal-area grid of raster_coverage.py: every satellite's
+# coverage over the range is one bitmask over the AOI cells, so unions are ORs and
+# the unique area is a count of the cells only one selected satellite saw, where
+# exact polygon overlays of a month of footprints take tens of seconds. Frames are
+# matched to the AOI with the exact geometries (FootprintCatalog.query).
+#
+# Work is kept at three levels, so a query only processes what it has not seen:
+#   - day records: each satellite's frame count in the AOI on a date and the key of
+#     its footprint mask, computed once per (AOI, date)
+#   - masks: the cells covered by a set of frames, packed and keyed by the frames'
+#     WKB. A Sentinel satellite repeats the frames of its reference plan every
+#     cycle, so a year of dates holds one cycle of Sentinel masks
+#   - range state: per AOI, the running totals and covered cells of every satellite
+#     over the last range aggregated. A range containing it only adds its new days
+#     at either end; any other range is rebuilt from the cached days and masks.
+# Day records, masks and finished tables (keyed by AOI, satellites, first and last
+# date) are kept in LRUs.
+MAX_ENTRIES = 64
+
+# Day records and masks kept (a mask of the EEZ at 2 km is about 70 KB)
+MAX_DAYS = 1024
+MAX_MASKS = 1024
+
+SUMMARY_COLUMNS = [
+    'Satellite', 'Source', 'Total Frames', 'Days Covered', 'Average Frames per Day',
+    'Area Covered (km²)', 'AOI Covered (%)', 'Unique Area (km²)',
+    'Mean Revisit (days)', 'Max Revisit Gap (days)',
+]
+
+# Process-wide summary (see shared_summary)
+_shared = {'summary': None}
+_shared_lock = threading.Lock()
+
+
+# Mean and longest gap in days between consecutive dates (NaN below two dates)
+def revisit_days(dates):
+    if len(dates) < 2:
+        return np.nan, np.nan
+    gaps = np.diff(sorted(d.toordinal() for d in dates))
+    return float(gaps.mean()), int(gaps.max())
+
+
+class CoverageSummary:
+    def __init__(self, catalog, resolution_m=raster_coverage.DEFAULT_RESOLUTION_M, max_entries=MAX_ENTRIES,
+                 max_days=MAX_DAYS, max_masks=MAX_MASKS):
+        self.catalog = catalog
+        self.resolution_m = resolution_m
+        self.max_entries = max_entries
+        self.max_days = max_days
+        self.max_masks = max_masks
+        # AOI key -> (prepared AOI geometry, raster_coverage.RasterGrid)
+        self._aois = {}
+        # (AOI key, date) -> {satellite: (source, frames in the AOI, mask key)}
+        self._days = OrderedDict()
+        # (AOI key, frames digest) -> packed AOI cells covered by the frames
+        self._masks = OrderedDict()
+        # AOI key -> running totals over a date range (see _extend)
+        self._ranges = {}
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'extended': 0, 'rebuilt': 0, 'days': 0, 'masks': 0}
+
+    def _aoi(self, aoi_gdf):
+        geoms = aoi_gdf.geometry.to_numpy()
+        key = coverage.geometry_digest(geoms)
+        if key not in self._aois:
+            geometry = coverage.union_geometries(geoms)
+            shapely.prepare(geometry)
+            self._aois[key] = (geometry, raster_coverage.RasterGrid(aoi_gdf, self.resolution_m))
+        return key
+
+    # Frame counts and masks of every satellite on a date (once per AOI and date, as
+    # long as the record and its masks stay in their LRUs)
+    def _day(self, aoi_key, selected_date):
+        key = (aoi_key, selected_date)
+        record = self._days.get(key)
+        if record is not None and all(mask_key in self._masks for _, _, mask_key in record.values()):
+            self._days.move_to_end(key)
+            for _, _, mask_key in record.values():
+                self._masks.move_to_end(mask_key)
+            return record
+        geometry, grid = self._aois[aoi_key]
+        record = {}
+        frames = self.catalog.query(selected_date, aoi=geometry)
+        for satellite, sat_frames in frames.groupby('satellite', sort=False):
+            source = sat_frames['source'].iloc[0]
+            inside = sat_frames['geometry'].to_numpy()
+            mask_key = (aoi_key, coverage.geometry_digest(inside))
+            if mask_key in self._masks:
+                self._masks.move_to_end(mask_key)
+            else:
+                self._masks[mask_key] = np.packbits(grid.rasterize_cells(inside).any(axis=0))
+                self.stats['masks'] += 1
+            record[satellite] = (source, len(inside), mask_key)
+        self._days[key] = record
+        self.stats['days'] += 1
+        _trim(self._days, self.max_days)
+        # The masks of this record are the most recent ones and stay
+        _trim(self._masks, max(self.max_masks, len(record)))
+        return record
+
+    # Per-satellite totals of an AOI over [start_date, end_date]: the last range's
+    # totals grown by the days outside it when it lies inside the new range, else
+    # totals rebuilt from scratch. progress(done, total) is called after each day.
+    # The totals are built on a copy and kept only once every day is added, so an
+    # interrupted aggregation leaves the last range as it was.
+    def _extend(self, aoi_key, start_date, end_date, progress=None):
+        n_cells = len(self._aois[aoi_key][1].aoi_cells)
+        last = self._ranges.get(aoi_key)
+        if last is not None and start_date <= last['start'] and last['end'] <= end_date:
+            days = (coverage_dates(start_date, last['start'] - timedelta(days=1))
+                    + coverage_dates(last['end'] + timedelta(days=1), end_date))
+            satellites = {
+                satellite: dict(totals, dates=set(totals['dates']), masks=set(totals['masks']),
+                                cells=totals['cells'].copy())
+                for satellite, totals in last['satellites'].items()
+            }
+            self.stats['extended'] += 1
+        else:
+            days = coverage_dates(start_date, end_date)
+            satellites = {}
+            self.stats['rebuilt'] += 1
+
+        for done, selected_date in enumerate(days, 1):
+            for satellite, (source, frame_count, mask_key) in self._day(aoi_key, selected_date).items():
+                totals = satellites.setdefault(satellite, {
+                    'source': source, 'frames': 0, 'dates': set(), 'masks': set(),
+                    'cells': np.zeros(n_cells, dtype=bool),
+                })
+                totals['frames'] += frame_count
+                totals['dates'].add(selected_date)
+                if mask_key not in totals['masks']:
+                    totals['masks'].add(mask_key)
+                    totals['cells'] |= np.unpackbits(self._masks[mask_key], count=n_cells).astype(bool)
+            if progress is not None:
+                progress(done, len(days))
+        state = {'start': start_date, 'end': end_date, 'satellites': satellites}
+        self._ranges[aoi_key] = state
+        return state
+
+    # Summary table of an AOI (GeoDataFrame) from start_date to end_date inclusive for
+    # some satellites (default: every satellite of the catalog), one row per satellite
+    # in catalog order and an ALL row
+    def summary(self, aoi_gdf, start_date, end_date, satellites=None, progress=None):
+        if end_date < start_date:
+            raise ValueError(f"End date {end_date} is before start date {start_date}.")
+        sources = self.catalog.satellite_sources()
+        satellites = list(sources) if satellites is None else [s for s in sources if s in set(satellites)]
+        with self._lock:
+            aoi_key = self._aoi(aoi_gdf)
+            table_key = (aoi_key, tuple(satellites), start_date, end_date)
+            if table_key in self._tables:
+                self._tables.move_to_end(table_key)
+                self.stats['hits'] += 1
+                return self._tables[table_key].copy()
+            state = self._extend(aoi_key, start_date, end_date, progress)
+            table = self._table(state, satellites, sources, self._aois[aoi_key][1])
+            self._tables[table_key] = table
+            _trim(self._tables, self.max_entries)
+        return table.copy()
+
+    def _table(self, state, satellites, sources, grid):
+        # Satellites without a frame in the AOI over the range get a row of zeros
+        empty = np.zeros(len(grid.aoi_cells), dtype=bool)
+        totals = [state['satellites'].get(s, {'source': sources[s], 'frames': 0, 'dates': set(), 'cells': empty})
+                  for s in satellites]
+        cells = np.array([t['cells'] for t in totals]).reshape(len(totals), len(empty))
+        looks = cells.sum(axis=0)
+        areas = list(cells.sum(axis=1) * grid.cell_area_km2) + [(looks > 0).sum() * grid.cell_area_km2]
+        unique_areas = list((cells & (looks == 1)).sum(axis=1) * grid.cell_area_km2) + [np.nan]
+        totals.append({
+            'source': None,
+            'frames': sum(t['frames'] for t in totals),
+            'dates': set().union(*(t['dates'] for t in totals)),
+        })
+
+        rows = []
+        for satellite, t, area, unique_area in zip(satellites + ['ALL'], totals, areas, unique_areas):
+            days_covered = len(t['dates'])
+            rows.append([
+                satellite,
+                t['source'],
+                t['frames'],
+                days_covered,
+                t['frames'] / days_covered if days_covered else np.nan,
+                float(area),
+                float(area) / grid.aoi_area_km2 * 100 if grid.aoi_area_km2 > 0 else 0.0,
+                float(unique_area),
+                *revisit_days(t['dates']),
+            ])
+        return pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+
+    def clear(self):
+        with self._lock:
+            self._days.clear()
+            self._masks.clear()
+            self._ranges.clear()
+            self._tables.clear()
+
+
+# Drop the least recently used entries of an LRU beyond 'limit'
+def _trim(lru, limit):
+    while len(lru) > limit:
+        lru.popitem(last=False)
+
+
+# Every date from start_date to end_date inclusive
+def coverage_dates(start_date, end_date):
+    return list(pd.date_range(start_date, end_date).date) if start_date <= end_date else []
+
+
+# AOI files the summary can be computed for: config.aoi_file and the daily AOI
+# variants in config.aoi_dir, as {label: path}
+def aoi_choices():
+    choices = {os.path.basename(config.aoi_file): config.aoi_file}
+    if os.path.isdir(config.aoi_dir):
+        for name in sorted(os.listdir(config.aoi_dir)):
+            if name.endswith('.geojson'):
+                choices[name] = os.path.join(config.aoi_dir, name)
+    return choices
+
+
+# The summary over the shared footprint catalog, shared by every session of the
+# process and started afresh when the catalog is rebuilt
+def shared_summary():
+    catalog = footprint_catalog.shared_catalog()
+    with _shared_lock:
+        if _shared['summary'] is None or _shared['summary'].catalog is not catalog:
+            _shared['summary'] = CoverageSummary(catalog)
+        return _shared['summary']
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Frame and coverage summary per satellite over a date range')
+    parser.add_argument('--start', type=date.fromisoformat, help="First date (YYYY-MM-DD, default: first commercial date)")
+    parser.add_argument('--end', type=date.fromisoformat, help="Last date (YYYY-MM-DD, default: last commercial date)")
+    parser.add_argument('--aoi', default=config.aoi_file, help='AOI file')
+    parser.add_argument('--satellite', action='append', help='Satellite to summarize (repeatable, default: all)')
+    args = parser.parse_args()
+
+    first_date, last_date = data_store.commercial_date_range()
+    start_date, end_date = args.start or first_date, args.end or last_date
+    aoi_gdf = data_store.load_aoi(args.aoi)
+    start = time.perf_counter()
+    summary = CoverageSummary(footprint_catalog.load_catalog())
+    print(f"Catalog loaded in {time.perf_counter() - start:.2f} s")
+    start = time.perf_counter()
+    table = summary.summary(aoi_gdf, start_date, end_date, args.satellite)
+    print(table.round(2).to_string(index=False))
+    print(f"\n{(end_date - start_date).days + 1} dates summarized in {time.perf_counter() - start:.2f} s")
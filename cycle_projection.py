@@ -0,0 +1,98 @@
+import argparse
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+import config
+import coverage
+import data_store
+
+
+# Revisit-cycle projection of the Sentinel reference plans. A reference plan holds
+# one revisit cycle of footprints starting on its earliest acquisition date; any
+# other date is covered by the footprints of the same cycle day, shifted to that
+# date (plus the configured orbit drift per cycle, see config.satellite_configs).
+#
+# The projector builds each satellite's frame table once and groups its rows by
+# cycle day, so projecting a date is a dictionary lookup and a timestamp shift per
+# satellite, whatever the number of dates asked for. Projected frames share the
+# geometries of the reference plan (the frame tables are shallow copies).
+class CycleProjector:
+    def __init__(self, sentinel_data):
+        # satellite -> (reference date, revisit frequency, drift seconds, sensor)
+        self.cycles = {}
+        # satellite -> frame table of the whole reference plan
+        self.frames = {}
+        # satellite -> {cycle day: frame table rows of that day}
+        self._cycle_days = {}
+        if sentinel_data is None:
+            return
+        for satellite in sentinel_data['satellite'].unique():
+            sat_data = sentinel_data[sentinel_data['satellite'] == satellite]
+            sensor = coverage._sentinel_sensor(sat_data, satellite)
+            reference_date = sat_data['acquisition_date'].min().date()
+            revisit_frequency = int(sat_data['revisit_frequency'].iloc[0])
+            frames = coverage._sentinel_frames(sat_data, satellite, sensor)
+            self.cycles[satellite] = (reference_date, revisit_frequency, coverage.orbit_drift_seconds(sat_data), sensor)
+            self.frames[satellite] = frames
+            days = np.array([d.toordinal() if pd.notna(d) else -1 for d in sat_data['acquisition_date'].dt.date])
+            offsets = days - reference_date.toordinal()
+            self._cycle_days[satellite] = {
+                offset: frames.iloc[np.flatnonzero(offsets == offset)]
+                for offset in range(revisit_frequency)
+            }
+
+    # Frames of one satellite on a date: (reference-plan date, projected frames)
+    def frames_on(self, satellite, selected_date):
+        reference_date, revisit_frequency, drift_seconds, _ = self.cycles[satellite]
+        target_date, cycles = coverage.cycle_position(reference_date, revisit_frequency, selected_date)
+        frames = self._cycle_days[satellite][(target_date - reference_date).days]
+        return target_date, coverage.project_frames(frames, (selected_date - target_date).days, cycles, drift_seconds)
+
+    # Per-satellite selections of a date, in the format of coverage.select_frames
+    def selections(self, selected_date, satellites=None):
+        selections = []
+        for satellite, (_, _, _, sensor) in self.cycles.items():
+            if satellites is not None and satellite not in satellites:
+                continue
+            target_date, frames = self.frames_on(satellite, selected_date)
+            selections.append((satellite, 'sentinel', sensor, target_date, frames))
+        return selections
+
+    # Generate (date, satellite, sensor, reference-plan date, frames) for every date
+    # from start_date to end_date inclusive, lazily, so a query over months or years
+    # holds one date's frames at a time
+    def project(self, start_date, end_date=None, satellites=None):
+        end_date = end_date or start_date
+        selected_date = start_date
+        while selected_date <= end_date:
+            for satellite, source, sensor, target_date, frames in self.selections(selected_date, satellites):
+                yield selected_date, satellite, sensor, target_date, frames
+            selected_date += timedelta(days=1)
+
+
+# Projector of the configured reference plans
+def load_projector(configs=None):
+    return CycleProjector(data_store.load_sentinel(configs or config.satellite_configs))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Project Sentinel reference plans over a date range')
+    parser.add_argument('--start', type=date.fromisoformat, required=True, help="First date (YYYY-MM-DD)")
+    parser.add_argument('--end', type=date.fromisoformat, required=True, help="Last date (YYYY-MM-DD)")
+    parser.add_argument('--satellite', action='append', help='Satellite to project (repeatable, default: all)')
+    args = parser.parse_args()
+
+    projector = load_projector()
+    start = time.perf_counter()
+    dates = set()
+    counts = {}
+    for selected_date, satellite, sensor, target_date, frames in projector.project(args.start, args.end, args.satellite):
+        dates.add(selected_date)
+        counts[satellite] = counts.get(satellite, 0) + len(frames)
+    elapsed = time.perf_counter() - start
+    for satellite, count in counts.items():
+        print(f"{satellite}: {count} projected footprints")
+    print(f"Projected {len(dates)} dates in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,398 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import geopandas as gpd
+import pandas as pd
+import pyarrow.parquet as pq
+import shapely
+
+import config
+
+# Process-wide cache of parsed GeoDataFrames. Streamlit imports this module once
+# per server process, so every session and every rerun shares the same entries.
+# Entries are keyed by (kind, absolute path) and stamped with the file's mtime and
+# size; a stamp mismatch means the file changed on disk and the entry is reloaded.
+# Cached frames are shared, so callers must copy before modifying them.
+MAX_CACHE_ENTRIES = 64
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0}
+
+
+# Modification time and size of a file, used to detect changes on disk
+def _file_stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+# Return the cached value for (kind, path), rebuilding it when the file changed
+def _cached(kind, path, builder):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File {path} not found.")
+    key = (kind, os.path.abspath(path))
+    stamp = _file_stamp(path)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == stamp:
+            _cache.move_to_end(key)
+            _stats['hits'] += 1
+            return entry[1]
+        if entry is not None:
+            del _cache[key]
+            _stats['invalidations'] += 1
+        _stats['misses'] += 1
+    # Parse outside the lock so other sessions are not blocked by a slow read
+    value = builder(path)
+    with _cache_lock:
+        _cache[key] = (stamp, value)
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHE_ENTRIES:
+            _cache.popitem(last=False)
+            _stats['evictions'] += 1
+    return value
+
+
+# Drop every cached entry
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+        for name in _stats:
+            _stats[name] = 0
+
+
+# Cache statistics (entries, hits, misses, invalidations, evictions)
+def cache_info():
+    with _cache_lock:
+        return dict(_stats, entries=len(_cache), max_entries=MAX_CACHE_ENTRIES)
+
+
+# Repair invalid geometries in one vectorized make_valid call
+def make_valid_geometries(gdf):
+    geometry = gdf.geometry
+    invalid = geometry.notna() & ~geometry.is_valid
+    if invalid.any():
+        gdf = gdf.copy()
+        gdf.loc[invalid, 'geometry'] = shapely.make_valid(geometry[invalid].to_numpy())
+    return gdf
+
+
+# Read a GeoJSON (or GeoParquet, by extension) file, normalize it to EPSG:4326
+# and fix invalid geometries
+def read_geojson(path):
+    if path.lower().endswith('.parquet'):
+        gdf = gpd.read_parquet(path)
+    else:
+        gdf = gpd.read_file(path, engine='pyogrio')
+    if gdf.crs is None:
+        gdf = gdf.set_crs('EPSG:4326')
+    elif gdf.crs != 'EPSG:4326':
+        gdf = gdf.to_crs('EPSG:4326')
+    return make_valid_geometries(gdf)
+
+
+# Footprint store (written by footprint_store.py): GeoParquet files partitioned by
+# date, with a manifest of the source files imported into it. Loaders read a source
+# file's footprints from the store when the store holds them and the file is
+# unchanged since the import (or gone), otherwise they parse the file itself.
+STORE_MANIFEST = '_manifest.json'
+
+
+# Manifest key of a source file (path relative to the repository when possible)
+def store_key(path):
+    path = os.path.abspath(path)
+    return os.path.relpath(path, config.base_dir) if path.startswith(config.base_dir + os.sep) else path
+
+
+# Imported source files of the store ({} when there is no store)
+def store_manifest(store_dir=config.store_dir):
+    manifest_file = os.path.join(store_dir, STORE_MANIFEST)
+    if not os.path.exists(manifest_file):
+        return {}
+    def build(path):
+        with open(path) as f:
+            return json.load(f)
+    return _cached('store manifest', manifest_file, build)
+
+
+# Manifest entry of a source file, if the store holds its current version
+def stored_entry(path, store_dir=config.store_dir):
+    entry = store_manifest(store_dir).get(store_key(path))
+    if entry is None:
+        return None
+    if os.path.exists(path) and list(_file_stamp(path)) != entry['stamp']:
+        return None
+    return entry
+
+
+# Read the partitions of a manifest entry (memory-mapped, only the given columns),
+# cached until the manifest changes. The partitions are read as one Arrow table and
+# their WKB decoded in one call: gpd.read_parquet would parse the CRS of every file.
+def read_stored(kind, entry, columns=None, store_dir=config.store_dir):
+    def build(path):
+        paths = [os.path.join(store_dir, part) for part in entry['parts']]
+        table = pq.read_table(paths, columns=columns and [*columns, 'geometry'], memory_map=True)
+        geometry = shapely.from_wkb(table['geometry'].to_numpy(zero_copy_only=False))
+        return gpd.GeoDataFrame(table.drop_columns(['geometry']).to_pandas(), geometry=geometry, crs='EPSG:4326')
+    key = (kind, tuple(entry['parts']), tuple(columns) if columns else None)
+    return _cached(key, os.path.join(store_dir, STORE_MANIFEST), build)
+
+
+# Dates the store holds commercial coverage for, with their manifest entries
+def stored_commercial_days(store_dir=config.store_dir):
+    days = {}
+    for entry in store_manifest(store_dir).values():
+        if entry['kind'] == 'commercial':
+            days.setdefault(pd.Timestamp(entry['date']).date(), []).append(entry)
+    return dict(sorted(days.items()))
+
+
+# Multi-resolution versions of the AOI and footprint files (written by simplify.py),
+# each with the area error it introduces. config.area_tolerance_km2 is one budget
+# shared by every file with versions: the versions are chosen together so their
+# summed error is within it (see simplified_choice), and loaders read the chosen
+# version of a file as long as the file is unchanged since its versions were
+# written. Commercial footprints have no versions and are always read in full.
+SIMPLIFIED_MANIFEST = '_manifest.json'
+
+
+# Source files with simplified versions ({} when there are none)
+def simplified_manifest(simplified_dir=None):
+    manifest_file = os.path.join(simplified_dir or config.simplified_dir, SIMPLIFIED_MANIFEST)
+    if not os.path.exists(manifest_file):
+        return {}
+    def build(path):
+        with open(path) as f:
+            return json.load(f)
+    return _cached('simplified manifest', manifest_file, build)
+
+
+# Version chosen for every file of the manifest within an area error budget, as
+# {file key: version}: starting from the full-resolution files, the file whose next
+# coarser version adds the least error is coarsened for as long as the summed error
+# of all the files stays within tolerance_km2, so the versions read for any set of
+# files are within it too. Files left at full resolution are not listed.
+def simplified_choice(tolerance_km2, simplified_dir=None):
+    levels = {key: sorted(entry['versions'], key=lambda version: version['tolerance_deg'])
+              for key, entry in simplified_manifest(simplified_dir).items()}
+    chosen = {}
+    total = 0.0
+    while True:
+        best = None
+        for key, versions in levels.items():
+            level = chosen.get(key, -1)
+            if level + 1 < len(versions):
+                step = versions[level + 1]['area_error_km2'] - (versions[level]['area_error_km2'] if level >= 0 else 0.0)
+                if total + step <= tolerance_km2 and (best is None or step < best[0]):
+                    best = (step, key)
+        if best is None:
+            return {key: levels[key][level] for key, level in chosen.items()}
+        total += best[0]
+        chosen[best[1]] = chosen.get(best[1], -1) + 1
+
+
+# Version of a file chosen within the area tolerance (the file itself if there is
+# none or the file changed), with its area error in km²
+def simplified_version(path, tolerance_km2=None, simplified_dir=None):
+    tolerance_km2 = config.area_tolerance_km2 if tolerance_km2 is None else tolerance_km2
+    simplified_dir = simplified_dir or config.simplified_dir
+    entry = simplified_manifest(simplified_dir).get(store_key(path))
+    if tolerance_km2 <= 0 or entry is None or not os.path.exists(path) or list(_file_stamp(path)) != entry['stamp']:
+        return path, 0.0
+    version = simplified_choice(tolerance_km2, simplified_dir).get(store_key(path))
+    if version is None:
+        return path, 0.0
+    version_file = os.path.join(simplified_dir, version['file'])
+    if not os.path.exists(version_file):
+        return path, 0.0
+    return version_file, version['area_error_km2']
+
+
+# File the loaders read for a source file (see simplified_version)
+def simplified_file(path, tolerance_km2=None):
+    return simplified_version(path, tolerance_km2)[0]
+
+
+# Bound on the area error (km²) introduced by the versions read for a set of files
+# (at most the tolerance; commercial footprints add none)
+def simplification_error_km2(paths, tolerance_km2=None):
+    return sum(simplified_version(path, tolerance_km2)[1] for path in paths)
+
+
+# Load AOI data
+def load_aoi(aoi_file):
+    return _cached('aoi', simplified_file(aoi_file), read_geojson)
+
+
+# Load the daily AOI variant of a date (KSA_AOIS/aoi_YYYY-MM-DD.geojson), from the
+# store when it holds it (None if there is none)
+def load_aoi_variant(selected_date):
+    aoi_file = os.path.join(config.aoi_dir, f"aoi_{selected_date.strftime('%Y-%m-%d')}.geojson")
+    entry = stored_entry(aoi_file)
+    if entry is not None:
+        return read_stored('aoi', entry) if entry['parts'] else None
+    return load_aoi(aoi_file) if os.path.exists(aoi_file) else None
+
+
+# Parse one Sentinel reference plan, with its satellite name and revisit frequency
+def build_sentinel(path, satellite_name, revisit_frequency):
+    gdf = read_geojson(path)
+    gdf['acquisition_date'] = pd.to_datetime(gdf['acquisition_date'], errors='coerce')
+    gdf['satellite'] = satellite_name
+    gdf['revisit_frequency'] = revisit_frequency
+    return gdf
+
+
+# Load one Sentinel reference plan with its satellite name and revisit frequency
+def load_sentinel_file(file, satellite_name, revisit_frequency):
+    version = simplified_file(file)
+    if version != file:
+        return _cached(('sentinel', satellite_name, revisit_frequency), version,
+                       lambda path: build_sentinel(path, satellite_name, revisit_frequency))
+    entry = stored_entry(file)
+    if entry is not None:
+        gdf = read_stored('sentinel', entry)
+        if (gdf['satellite'] == satellite_name).all() and (gdf['revisit_frequency'] == revisit_frequency).all():
+            return gdf
+    return _cached(('sentinel', satellite_name, revisit_frequency), file,
+                   lambda path: build_sentinel(path, satellite_name, revisit_frequency))
+
+
+# Load satellite data (Sentinel-1A/1C, Sentinel-2A/2B/2C), skipping missing files
+def load_sentinel(configs):
+    all_gdfs = []
+    for sat_config in configs:
+        if os.path.exists(sat_config['file']) or stored_entry(sat_config['file']) is not None:
+            gdf = load_sentinel_file(sat_config['file'], sat_config['name'], sat_config['revisit_frequency'])
+            if sat_config.get('drift_seconds_per_cycle'):
+                gdf = gdf.assign(drift_seconds_per_cycle=float(sat_config['drift_seconds_per_cycle']))
+            all_gdfs.append(gdf)
+    if not all_gdfs:
+        return None
+    return gpd.GeoDataFrame(pd.concat(all_gdfs, ignore_index=True), crs='EPSG:4326')
+
+
+# Parse one Landsat file, taking acquisition dates from the first known date column
+def build_landsat(path, satellite_name):
+    gdf = read_geojson(path)
+    possible_date_columns = ['acquisition_date', 'Name', 'Description', 'date']
+    date_column = next((col for col in possible_date_columns if col in gdf.columns), None)
+    if date_column:
+        gdf['acquisition_date'] = pd.to_datetime(gdf[date_column], errors='coerce')
+    else:
+        gdf['acquisition_date'] = pd.NaT
+    gdf['satellite'] = satellite_name
+    return gdf
+
+
+# Load one Landsat file, parsing acquisition dates from the first known date column
+def load_landsat_file(file, satellite_name):
+    version = simplified_file(file)
+    if version != file:
+        return _cached(('landsat', satellite_name), version, lambda path: build_landsat(path, satellite_name))
+    entry = stored_entry(file)
+    if entry is not None:
+        gdf = read_stored('landsat', entry)
+        if (gdf['satellite'] == satellite_name).all():
+            return gdf
+    return _cached(('landsat', satellite_name), file, lambda path: build_landsat(path, satellite_name))
+
+
+# Load Landsat data, skipping missing files
+def load_landsat(landsat8_file, landsat9_file):
+    all_gdfs = []
+    for file, satellite_name in [(landsat8_file, 'LANDSAT-8'), (landsat9_file, 'LANDSAT-9')]:
+        if os.path.exists(file) or stored_entry(file) is not None:
+            all_gdfs.append(load_landsat_file(file, satellite_name))
+    if not all_gdfs:
+        return None
+    return gpd.GeoDataFrame(pd.concat(all_gdfs, ignore_index=True), crs='EPSG:4326')
+
+
+# Parse a daily commercial coverage file
+def build_daily(path, selected_date):
+    gdf = read_geojson(path)
+    # Extract date from 'Date' or 'Start' column, else assume the selected date
+    if 'Date' in gdf.columns:
+        gdf['acquisition_date'] = pd.to_datetime(gdf['Date'], errors='coerce')
+    elif 'Start' in gdf.columns:
+        gdf['acquisition_date'] = pd.to_datetime(gdf['Start'], errors='coerce')
+    else:
+        gdf['acquisition_date'] = pd.to_datetime(selected_date)
+    # An empty file has no property columns at all
+    gdf['satellite'] = gdf['Satellite'].fillna('Unknown') if 'Satellite' in gdf.columns else 'Unknown'
+    return gdf
+
+
+# Load a daily commercial coverage file (e.g., august_01.geojson)
+def load_daily(daily_file, selected_date):
+    entry = stored_entry(daily_file)
+    if entry is not None:
+        return read_stored('commercial', entry)
+    return _cached(('daily', str(selected_date)), daily_file, lambda path: build_daily(path, selected_date))
+
+
+# Load the commercial coverage of a date: the store's partition for that date when
+# it has one, else config.commercial_file (None if there is neither)
+def load_commercial_day(selected_date):
+    entries = stored_commercial_days().get(selected_date)
+    if entries is not None:
+        # Empty files are imported without partitions
+        entries = [entry for entry in entries if entry['parts']]
+        if not entries:
+            return None
+        gdfs = [read_stored('commercial', entry) for entry in entries]
+        return gdfs[0] if len(gdfs) == 1 else gpd.GeoDataFrame(pd.concat(gdfs, ignore_index=True), crs='EPSG:4326')
+    daily_file = config.commercial_file(selected_date)
+    if not os.path.exists(daily_file):
+        return None
+    return load_daily(daily_file, selected_date)
+
+
+# First and last date with commercial coverage, from the store's manifest (or, while
+# nothing is imported, from the file names in config.commercial_dir)
+def commercial_date_range():
+    days = list(stored_commercial_days())
+    if not days and os.path.isdir(config.commercial_dir):
+        import footprint_store
+        days = [footprint_store.commercial_file_date(name) for name in os.listdir(config.commercial_dir)]
+        days = [day for day in days if day is not None]
+    if not days:
+        raise FileNotFoundError(f"No commercial coverage files found in {config.store_dir} or {config.commercial_dir}.")
+    return min(days), max(days)
+
+
+# Time a cold (empty cache) and a warm load of every source in config.py
+def timing_report(dates=None):
+    if dates is None:
+        dates = pd.date_range('2025-08-01', '2025-08-31').date
+    sources = [
+        ('AOI', lambda: load_aoi(config.aoi_file)),
+        ('Sentinel', lambda: load_sentinel(config.satellite_configs)),
+        ('Landsat', lambda: load_landsat(config.landsat8_file, config.landsat9_file)),
+        ('Commercial (all days)', lambda: [load_commercial_day(day) for day in dates]),
+    ]
+    clear_cache()
+    rows = []
+    for name, loader in sources:
+        start = time.perf_counter()
+        loader()
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        loader()
+        warm = time.perf_counter() - start
+        rows.append({
+            'Source': name,
+            'Cold Load (s)': round(cold, 4),
+            'Warm Load (s)': round(warm, 4),
+            'Speedup': round(cold / warm, 1) if warm > 0 else float('inf'),
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    print(timing_report().to_string(index=False))
+    print(cache_info())
@@ -0,0 +1,257 @@
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+import config
+import coverage
+import coverage_index
+import cycle_projection
+import data_store
+
+# In-memory catalog of every footprint (Sentinel reference plans, Landsat scenes and
+# the daily commercial files), built once and queried without scanning:
+#   - rows are sorted by acquisition day, so the rows of a date or date range are one
+#     slice found with np.searchsorted
+#   - a satellite index holds each satellite's rows (also sorted by day)
+#   - an STRtree over all footprints answers bbox/AOI queries over wide date ranges;
+#     narrow ranges filter their slice by the footprints' bounds first
+# Only footprints whose bounds overlap the query are tested against its geometry,
+# and the test uses a prepared geometry.
+#
+# Frames are stored in the frame table layout of coverage.select_frames, so
+# select_frames below returns exactly what coverage.select_frames returns for the
+# same sources, and compute_day can take a catalog instead of the source frames.
+# Sentinel selections come from a cycle_projection.CycleProjector, which projects
+# the reference plans to any date.
+SOURCES = ['sentinel', 'landsat', 'commercial']
+
+# Date ranges with fewer rows than this filter their slice by bounds; wider ranges
+# query the STRtree and filter its hits by day
+STRTREE_MIN_ROWS = 2048
+
+# Day number of rows without a date (undated Landsat files)
+UNDATED = -1
+
+# Process-wide catalog (see shared_catalog), with the source stamps it was built from
+_shared = {'catalog': None, 'stamps': None}
+_shared_lock = threading.Lock()
+
+
+# Day numbers (proleptic ordinals) of a datetime column, UNDATED for missing dates
+def day_numbers(values):
+    return np.array([d.toordinal() if pd.notna(d) else UNDATED for d in pd.to_datetime(values).dt.date], dtype=np.int64)
+
+
+class FootprintCatalog:
+    def __init__(self, frames, projector, landsat_undated=False):
+        # frames: frame table rows plus 'day' and 'rank' (selection order), any order
+        order = np.lexsort((frames['rank'].to_numpy(), frames['day'].to_numpy()))
+        self.frames = frames.iloc[order].reset_index(drop=True)
+        self.days = self.frames['day'].to_numpy()
+        self.geoms = self.frames.geometry.to_numpy()
+        self.bounds = shapely.bounds(self.geoms)
+        self.sources = self.frames['source'].to_numpy()
+        self.satellite_names = self.frames['satellite'].to_numpy()
+        self.group_sensors = self.frames['sensor_of_group'].to_numpy()
+        # Plain frame table rows handed out by queries
+        self._table = pd.DataFrame(self.frames.drop(columns=['day', 'rank', 'sensor_of_group']))
+        self.projector = projector
+        self.landsat_undated = landsat_undated
+        self.satellite_rows = {
+            satellite: np.flatnonzero(self.satellite_names == satellite)
+            for satellite in pd.unique(self.satellite_names)
+        }
+        self._tree = None
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            self._tree = shapely.STRtree(self.geoms)
+        return self._tree
+
+    # {satellite: source} of every satellite in the catalog: Sentinel satellites in
+    # configuration order, then the others in order of first acquisition
+    def satellite_sources(self):
+        sources = {satellite: 'sentinel' for satellite in self.projector.cycles}
+        for satellite, rows in self.satellite_rows.items():
+            sources.setdefault(satellite, self.sources[rows[0]])
+        return sources
+
+    # Positions of the rows acquired from start_date to end_date inclusive (a slice)
+    def date_rows(self, start_date, end_date=None, rows=None):
+        days = self.days if rows is None else self.days[rows]
+        end_date = end_date or start_date
+        lo, hi = np.searchsorted(days, [start_date.toordinal(), end_date.toordinal() + 1])
+        return np.arange(lo, hi) if rows is None else rows[lo:hi]
+
+    # Positions of the rows whose footprint intersects a geometry or a bbox, among 'rows'
+    def _spatial_filter(self, rows, geometry):
+        if len(rows) >= STRTREE_MIN_ROWS:
+            hits = self.tree.query(geometry)
+            hits = np.sort(hits[np.isin(hits, rows)])
+        else:
+            xmin, ymin, xmax, ymax = geometry.bounds
+            b = self.bounds[rows]
+            hits = rows[(b[:, 0] <= xmax) & (b[:, 2] >= xmin) & (b[:, 1] <= ymax) & (b[:, 3] >= ymin)]
+        shapely.prepare(geometry)
+        return hits[shapely.intersects(geometry, self.geoms[hits])]
+
+    # Frames from start_date to end_date (inclusive) that intersect an AOI
+    # (GeoDataFrame or geometry) or a (xmin, ymin, xmax, ymax) bbox, optionally
+    # restricted to some satellites and sources, date by date in the order of
+    # select_frames. Sentinel frames are the reference plans projected to each date
+    # (as select_frames projects them), tested once per reference-plan day.
+    def query(self, start_date, end_date=None, aoi=None, bbox=None, satellites=None, sources=None):
+        end_date = end_date or start_date
+        geometry = None
+        if aoi is not None:
+            geometry = shapely.union_all(aoi.geometry.to_numpy()) if isinstance(aoi, gpd.GeoDataFrame) else aoi
+        if bbox is not None:
+            box = shapely.box(*bbox)
+            geometry = box if geometry is None else shapely.intersection(geometry, box)
+        if geometry is not None:
+            shapely.prepare(geometry)
+
+        # Landsat and commercial rows of the range (and undated Landsat rows), filtered
+        # once; they stay sorted by day
+        rows = self.date_rows(start_date, end_date)
+        rows = rows[self.sources[rows] != 'sentinel']
+        if self.landsat_undated:
+            rows = np.concatenate([np.flatnonzero(self.days == UNDATED), rows])
+        if satellites is not None:
+            rows = rows[np.isin(self.satellite_names[rows], list(satellites))]
+        if sources is not None:
+            rows = rows[np.isin(self.sources[rows], list(sources))]
+        if geometry is not None:
+            rows = self._spatial_filter(rows, geometry)
+        undated = rows[self.days[rows] == UNDATED]
+
+        parts = []
+        matches = {}
+        selected_date = start_date
+        while selected_date <= end_date:
+            if sources is None or 'sentinel' in sources:
+                for satellite, _, _, target_date, frames in self.projector.selections(selected_date, satellites):
+                    if geometry is not None:
+                        if (satellite, target_date) not in matches:
+                            matches[(satellite, target_date)] = shapely.intersects(geometry, frames['geometry'].to_numpy())
+                        frames = frames[matches[(satellite, target_date)]]
+                    parts.append(frames)
+            if len(undated) and selected_date.month == 8:
+                # Undated Landsat files are assumed to cover the whole of August
+                parts.append(self._frames(undated))
+            parts.append(self._frames(self.date_rows(selected_date, rows=rows)))
+            selected_date += timedelta(days=1)
+        frames = pd.concat(parts, ignore_index=True) if parts else self._frames(np.array([], dtype=np.int64))
+        return gpd.GeoDataFrame(frames, geometry='geometry', crs='EPSG:4326')
+
+    # Per-satellite selections for a date, in the format of coverage.select_frames
+    def select_frames(self, selected_date, warnings=None):
+        if warnings is None:
+            warnings = []
+        selections = self.projector.selections(selected_date)
+
+        if self.landsat_undated:
+            # Undated Landsat files are assumed to cover the whole of August
+            rows = np.flatnonzero(self.sources == 'landsat') if selected_date.month == 8 else np.array([], dtype=np.int64)
+        else:
+            rows = self.date_rows(selected_date)
+            rows = rows[self.sources[rows] == 'landsat']
+            if len(rows) == 0:
+                warnings.append(f"No Landsat coverage found for {selected_date}.")
+        selections += self._group(rows, 'landsat', selected_date)
+
+        rows = self.date_rows(selected_date)
+        selections += self._group(rows[self.sources[rows] == 'commercial'], 'commercial', selected_date)
+        return selections
+
+    def _frames(self, rows):
+        return self._table.take(rows)
+
+    # Selections of one source, one per satellite in order of first appearance
+    def _group(self, rows, source, selected_date):
+        selections = []
+        for satellite in pd.unique(self.satellite_names[rows]):
+            sat_rows = rows[self.satellite_names[rows] == satellite]
+            sensor = self.group_sensors[sat_rows[0]]
+            selections.append((satellite, source, sensor, selected_date, self._frames(sat_rows)))
+        return selections
+
+
+# Build a catalog from loaded sources: Sentinel and Landsat data as returned by
+# data_store.load_sentinel/load_landsat and a {date: daily commercial data} dict
+def build_catalog(sentinel_data, landsat_data, daily_data_by_date):
+    parts = []
+    projector = cycle_projection.CycleProjector(sentinel_data)
+    for satellite, (*_, sensor) in projector.cycles.items():
+        parts.append((projector.frames[satellite], sensor))
+
+    landsat_undated = False
+    if landsat_data is not None:
+        landsat_undated = bool(landsat_data['acquisition_date'].isna().all())
+        for satellite in landsat_data['satellite'].unique():
+            sat_data = landsat_data[landsat_data['satellite'] == satellite]
+            # The sensor of a Landsat selection is taken from that day's scenes
+            for _, day_data in sat_data.groupby(sat_data['acquisition_date'].dt.date, sort=False, dropna=False):
+                sensor = day_data['Instrument'].iloc[0] if 'Instrument' in day_data.columns else 'OLI/TIRS'
+                parts.append((coverage._landsat_frames(day_data, satellite, sensor), sensor))
+
+    for selected_date, daily_data in daily_data_by_date.items():
+        if daily_data is None:
+            continue
+        for satellite in daily_data['satellite'].unique():
+            sat_data = daily_data[daily_data['satellite'] == satellite]
+            # A daily file only contributes the acquisitions dated on its own date
+            filtered = sat_data[sat_data['acquisition_date'].dt.date == selected_date]
+            sensor = sat_data['Sensor'].iloc[0] if 'Sensor' in sat_data.columns else 'Unknown'
+            parts.append((coverage._commercial_frames(filtered, satellite, sensor), sensor))
+
+    frames = [part.assign(sensor_of_group=[sensor] * len(part)) for part, sensor in parts if len(part)]
+    if frames:
+        frames = pd.concat(frames, ignore_index=True)
+    else:
+        frames = pd.DataFrame(columns=coverage.FRAME_COLUMNS[:-3] + ['geometry', 'sensor_of_group'])
+    frames = gpd.GeoDataFrame(frames, geometry='geometry', crs='EPSG:4326')
+    frames['day'] = day_numbers(frames['acquisition_date'])
+    frames['rank'] = np.arange(len(frames))
+    return FootprintCatalog(frames, projector, landsat_undated)
+
+
+# Catalog of the configured sources, with the commercial coverage of every date in
+# [start_date, end_date] (by default every date data_store has commercial coverage for)
+def load_catalog(start_date=None, end_date=None):
+    if start_date is None or end_date is None:
+        start_date, end_date = data_store.commercial_date_range()
+    dates = pd.date_range(start_date, end_date).date
+    return build_catalog(
+        data_store.load_sentinel(config.satellite_configs),
+        data_store.load_landsat(config.landsat8_file, config.landsat9_file),
+        {selected_date: data_store.load_commercial_day(selected_date) for selected_date in dates},
+    )
+
+
+# The catalog of the configured sources, shared by every session of the process and
+# rebuilt when one of its source files changes on disk
+def shared_catalog():
+    start_date, end_date = data_store.commercial_date_range()
+    stamps = coverage_index.source_stamps(coverage_index.date_range(start_date, end_date))
+    with _shared_lock:
+        if _shared['catalog'] is None or _shared['stamps'] != stamps:
+            _shared['catalog'] = load_catalog(start_date, end_date)
+            _shared['stamps'] = stamps
+        return _shared['catalog']
+
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    catalog = load_catalog()
+    print(f"Catalog of {len(catalog)} footprints built in {time.perf_counter() - start:.2f} s")
+    print(catalog.frames.groupby('source').size().to_string())
@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import re
+import time
+from datetime import date, datetime
+
+import pandas as pd
+
+import config
+import data_store
+
+# Importer for the footprint store read by data_store. Every source file is parsed
+# once with the app's own loaders and written as GeoParquet (WKB geometry, typed
+# timestamp columns, zstd), keeping only the columns the coverage code reads, to
+#   <store>/<kind>/date=YYYY-MM-DD/<file stem>.parquet   (date=undated without a date)
+# Sentinel and Landsat frames are partitioned by acquisition date; commercial files
+# and AOI variants by the date in their file name (a commercial file can hold
+# acquisitions dated on the day before its own date). The manifest maps every
+# imported source file to its stamp (mtime, size) and partitions, so a re-import
+# only rewrites the files that changed and the loaders can tell a stale import.
+# Commercial and AOI files of any month are imported, which is what lets the app
+# offer dates outside August 2025.
+KINDS = ['sentinel', 'landsat', 'commercial', 'aoi']
+
+# Columns kept per kind (when present in the source), besides the geometry
+STORE_COLUMNS = {
+    'sentinel': ['acquisition_date', 'begin', 'end', 'satellite', 'revisit_frequency', 'Instrument'],
+    'landsat': ['acquisition_date', 'Name', 'satellite', 'Instrument'],
+    'commercial': ['acquisition_date', 'Date', 'Start', 'End', 'Satellite', 'satellite', 'Sensor'],
+    'aoi': ['GEONAME', 'MRGID', 'AREA_KM2'],
+}
+
+UNDATED = 'undated'
+
+# Commercial files are named <month>_<day>.geojson (august_01.geojson)
+COMMERCIAL_NAME = re.compile(r'^([a-z]+)_(\d{2})\.geojson$')
+MONTHS = {datetime(2000, month, 1).strftime('%B').lower(): month for month in range(1, 13)}
+
+# AOI variants are named aoi_YYYY-MM-DD.geojson
+AOI_NAME = re.compile(r'^aoi_(\d{4}-\d{2}-\d{2})\.geojson$')
+
+
+# Date of a commercial file from its name, the year taken from its acquisitions
+# (or 'year' when none of them is dated); None for other file names
+def commercial_file_date(path, gdf=None, year=2025):
+    match = COMMERCIAL_NAME.match(os.path.basename(path))
+    if match is None or match.group(1) not in MONTHS:
+        return None
+    if gdf is not None and gdf['acquisition_date'].notna().any():
+        year = int(gdf['acquisition_date'].dropna().dt.year.mode().iloc[0])
+    return date(year, MONTHS[match.group(1)], int(match.group(2)))
+
+
+# Source files to import: (kind, path, loader returning the parsed GeoDataFrame)
+def source_files(year=2025):
+    sources = []
+    for sat_config in config.satellite_configs:
+        sources.append(('sentinel', sat_config['file'], lambda path, c=sat_config: data_store.build_sentinel(
+            path, c['name'], c['revisit_frequency'])))
+    for path, satellite_name in [(config.landsat8_file, 'LANDSAT-8'), (config.landsat9_file, 'LANDSAT-9')]:
+        sources.append(('landsat', path, lambda path, s=satellite_name: data_store.build_landsat(path, s)))
+    if os.path.isdir(config.commercial_dir):
+        for name in sorted(os.listdir(config.commercial_dir)):
+            path = os.path.join(config.commercial_dir, name)
+            if commercial_file_date(path) is not None:
+                sources.append(('commercial', path, lambda path: data_store.build_daily(
+                    path, commercial_file_date(path, year=year))))
+    if os.path.isdir(config.aoi_dir):
+        for name in sorted(os.listdir(config.aoi_dir)):
+            if AOI_NAME.match(name):
+                sources.append(('aoi', os.path.join(config.aoi_dir, name), data_store.read_geojson))
+    return [(kind, path, loader) for kind, path, loader in sources if os.path.exists(path)]
+
+
+# Date in the name of a commercial or AOI file (ISO string)
+def file_partition_date(kind, path, gdf, year=2025):
+    if kind == 'commercial':
+        return commercial_file_date(path, gdf, year).isoformat()
+    return AOI_NAME.match(os.path.basename(path)).group(1)
+
+
+# Partition date of every row of a parsed source file
+def partition_dates(kind, path, gdf, year=2025):
+    if kind in ('commercial', 'aoi'):
+        return pd.Series([file_partition_date(kind, path, gdf, year)] * len(gdf), index=gdf.index, dtype=object)
+    days = gdf['acquisition_date'].dt.strftime('%Y-%m-%d')
+    return days.fillna(UNDATED)
+
+
+# Write one source file's partitions; returns the manifest entry (an empty commercial
+# or AOI file is recorded under the date in its name, without partitions)
+def import_file(kind, path, loader, store_dir=config.store_dir, year=2025):
+    gdf = loader(path)
+    columns = [col for col in STORE_COLUMNS[kind] if col in gdf.columns]
+    gdf = gdf[columns + ['geometry']]
+    dates = partition_dates(kind, path, gdf, year)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    parts = []
+    for day in sorted(dates.unique()):
+        part = os.path.join(kind, f'date={day}', f'{stem}.parquet')
+        target = os.path.join(store_dir, part)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        gdf[dates == day].reset_index(drop=True).to_parquet(target + '.tmp', compression='zstd', index=False)
+        os.replace(target + '.tmp', target)
+        parts.append(part)
+    entry = {'kind': kind, 'stamp': list(data_store._file_stamp(path)), 'rows': len(gdf), 'parts': parts}
+    if kind in ('commercial', 'aoi'):
+        entry['date'] = file_partition_date(kind, path, gdf, year)
+    return entry
+
+
+def _write_manifest(manifest, store_dir):
+    manifest_file = os.path.join(store_dir, data_store.STORE_MANIFEST)
+    with open(manifest_file + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(manifest_file + '.tmp', manifest_file)
+
+
+# Import every source file that changed since its last import (all of them with
+# force); returns a report DataFrame
+def import_sources(store_dir=config.store_dir, force=False, year=2025, log=print):
+    os.makedirs(store_dir, exist_ok=True)
+    manifest_file = os.path.join(store_dir, data_store.STORE_MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_file):
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+
+    rows = []
+    for kind, path, loader in source_files(year):
+        key = data_store.store_key(path)
+        previous = manifest.get(key)
+        if not force and previous is not None and previous['stamp'] == list(data_store._file_stamp(path)):
+            rows.append({'kind': kind, 'file': key, 'status': 'unchanged', 'rows': previous['rows'],
+                         'partitions': len(previous['parts']), 'seconds': 0.0})
+            continue
+        start = time.perf_counter()
+        entry = import_file(kind, path, loader, store_dir, year)
+        # Partitions of the previous import that the new one no longer writes
+        for part in set(previous['parts'] if previous else []) - set(entry['parts']):
+            if os.path.exists(os.path.join(store_dir, part)):
+                os.remove(os.path.join(store_dir, part))
+        manifest[key] = entry
+        # Saved after every file, so an interrupted import keeps what it finished
+        _write_manifest(manifest, store_dir)
+        rows.append({'kind': kind, 'file': key, 'status': 'imported', 'rows': entry['rows'],
+                     'partitions': len(entry['parts']), 'seconds': round(time.perf_counter() - start, 3)})
+        log(f"{key}: {entry['rows']} rows in {len(entry['parts'])} partition(s)")
+    return pd.DataFrame(rows, columns=['kind', 'file', 'status', 'rows', 'partitions', 'seconds'])
+
+
+# Total size in bytes of the store's partitions and of the source files they came from
+def store_sizes(store_dir=config.store_dir):
+    manifest = data_store.store_manifest(store_dir)
+    store_bytes = sum(os.path.getsize(os.path.join(store_dir, part))
+                      for entry in manifest.values() for part in entry['parts'])
+    source_bytes = sum(entry['stamp'][1] for entry in manifest.values())
+    return store_bytes, source_bytes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import the GeoJSON sources into the GeoParquet footprint store')
+    parser.add_argument('--store-dir', default=config.store_dir)
+    parser.add_argument('--force', action='store_true', help='Re-import files whose stamp is unchanged')
+    parser.add_argument('--year', type=int, default=2025, help='Year of commercial files without dated acquisitions')
+    args = parser.parse_args()
+
+    report = import_sources(args.store_dir, args.force, args.year)
+    print(report.groupby(['kind', 'status']).agg(files=('file', 'size'), rows=('rows', 'sum'),
+                                                  seconds=('seconds', 'sum')).to_string())
+    store_bytes, source_bytes = store_sizes(args.store_dir)
+    print(f"Store: {store_bytes / 2 ** 20:.1f} MiB for {source_bytes / 2 ** 20:.1f} MiB of GeoJSON "
+          f"({source_bytes / max(store_bytes, 1):.1f}x smaller)")
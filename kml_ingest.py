@@ -0,0 +1,186 @@
+import argparse
+import os
+import re
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+from config import base_dir
+
+# Streaming ingestion of ESA acquisition plans (and other KML footprint exports).
+# Files are read with iterparse and each Placemark is cleared once its fields are
+# taken, so memory stays bounded by the output rather than by the XML tree. All
+# coordinate strings are parsed in one NumPy call and all polygons are built in one
+# vectorized shapely call. Two layouts are recognised:
+#   - Sentinel-1 (S1*_MP_USER_*.kml): Document/Folder(date)/Folder(satellite)/Placemark
+#     with a bare LinearRing; the acquisition date is the date folder's name.
+#   - Sentinel-2 (S2*_MP_ACQ__KML_*.kml) and Taitus exports (Landsat): nested
+#     folders, Placemark/Polygon/outerBoundaryIs; the date comes from TimeSpan/begin
+#     (or TimeStamp/when).
+# Placemarks without a time or without a ring (e.g. an embedded AOI) are skipped.
+# The output holds every acquisition of a plan; the app itself reads the reference
+# plans of config.satellite_configs (one revisit cycle cut from these plans), so the
+# Parquet files are inputs for new reference plans (geopandas.read_parquet).
+KML_DIR = os.path.join(base_dir, 'SatelliteData')
+
+_DATE_FOLDER = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+PLAN_COLUMNS = ['acquisition_date', 'name', 'begin', 'end', 'satellite', 'folder']
+
+
+# Tag name without the KML namespace
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+# Text of the first descendant with a given local name (None if absent)
+def _find_text(elem, name):
+    for child in elem.iter():
+        if _local(child.tag) == name:
+            return child.text.strip() if child.text else None
+    return None
+
+
+# Pull name, times, ExtendedData values and coordinate rings out of one Placemark
+def _read_placemark(placemark):
+    record = {'name': None, 'begin': None, 'end': None}
+    data = {}
+    outer = None
+    inner = []
+    for elem in placemark.iter():
+        tag = _local(elem.tag)
+        if tag == 'name' and record['name'] is None:
+            record['name'] = elem.text.strip() if elem.text else None
+        elif tag in ('begin', 'when'):
+            record['begin'] = elem.text.strip() if elem.text else None
+        elif tag == 'end':
+            record['end'] = elem.text.strip() if elem.text else None
+        elif tag == 'Data':
+            data[elem.get('name')] = _find_text(elem, 'value')
+        elif tag == 'outerBoundaryIs':
+            outer = _find_text(elem, 'coordinates')
+        elif tag == 'innerBoundaryIs':
+            inner.append(_find_text(elem, 'coordinates'))
+        elif tag == 'LinearRing' and outer is None and not inner:
+            # Sentinel-1 layout: a bare LinearRing directly under the Placemark
+            outer = _find_text(elem, 'coordinates')
+    if outer is None:
+        return None, data, []
+    return record, data, [outer] + [ring for ring in inner if ring]
+
+
+# Parse every coordinate string at once. Each ring is "lon,lat[,alt] lon,lat[,alt] ...";
+# returns an (n, 2) lon/lat array and the ring index of every vertex.
+def parse_rings(rings):
+    counts = np.array([len(ring.split()) for ring in rings], dtype=np.int64)
+    if counts.sum() == 0:
+        return np.empty((0, 2)), np.empty(0, dtype=np.int64)
+    commas = np.array([ring.count(',') for ring in rings], dtype=np.int64)
+    dims = np.divide(commas, counts, out=np.zeros(len(rings)), where=counts > 0) + 1
+    if np.all((dims == dims[0]) | (counts == 0)) and dims[counts > 0][0] in (2, 3):
+        width = int(dims[counts > 0][0])
+        values = np.array(' '.join(rings).replace(',', ' ').split(), dtype=np.float64)
+        coords = values.reshape(-1, width)[:, :2]
+    else:
+        # Mixed 2D/3D rings: parse ring by ring
+        coords = np.concatenate([
+            np.array([c.split(',')[:2] for c in ring.split()], dtype=np.float64).reshape(-1, 2)
+            for ring in rings
+        ])
+    return coords, np.repeat(np.arange(len(rings)), counts)
+
+
+# Build polygons from rings in one vectorized call. 'ring_polygon' maps each ring
+# to its polygon; the first ring of a polygon is its shell, the others are holes.
+def build_polygons(coords, ring_index, ring_polygon, n_polygons):
+    rings = shapely.linearrings(coords, indices=ring_index)
+    polygons = np.empty(n_polygons, dtype=object)
+    polygons[:] = shapely.polygons(rings, indices=ring_polygon)
+    return polygons
+
+
+# Stream a KML acquisition plan into a GeoDataFrame with one row per footprint
+def read_kml(kml_file):
+    if not os.path.exists(kml_file):
+        raise FileNotFoundError(f"File {kml_file} not found.")
+    records = []
+    extended = []
+    rings = []
+    ring_polygon = []
+    folders = []
+    skipped = 0
+    root = None
+    for event, elem in ET.iterparse(kml_file, events=('start', 'end')):
+        tag = _local(elem.tag)
+        if event == 'start':
+            if root is None:
+                root = elem
+            if tag == 'Folder':
+                folders.append(None)
+            continue
+        if tag == 'name' and folders and folders[-1] is None:
+            # First name child of an open folder is the folder's name
+            folders[-1] = elem.text.strip() if elem.text else ''
+        elif tag == 'Placemark':
+            record, data, placemark_rings = _read_placemark(elem)
+            if record is None or record['begin'] is None:
+                skipped += 1
+            else:
+                date_folder = next((name for name in folders if name and _DATE_FOLDER.match(name)), None)
+                record['acquisition_date'] = date_folder or record['begin'][:10]
+                record['satellite'] = data.get('SatelliteId') or next(
+                    (name for name in folders if name and not _DATE_FOLDER.match(name)), None)
+                record['folder'] = '/'.join(name or '' for name in folders)
+                ring_polygon.extend([len(records)] * len(placemark_rings))
+                rings.extend(placemark_rings)
+                records.append(record)
+                extended.append(data)
+            elem.clear()
+        elif tag == 'Folder':
+            folders.pop()
+            elem.clear()
+        elif tag in ('Style', 'StyleMap') and root is not None:
+            elem.clear()
+
+    coords, ring_index = parse_rings(rings)
+    geometry = build_polygons(coords, ring_index, np.array(ring_polygon, dtype=np.int64), len(records))
+    gdf = gpd.GeoDataFrame(
+        pd.concat([pd.DataFrame(records, columns=PLAN_COLUMNS), pd.DataFrame(extended, index=range(len(records)))], axis=1),
+        geometry=geometry,
+        crs='EPSG:4326',
+    )
+    gdf.attrs['skipped_placemarks'] = skipped
+    return gdf
+
+
+# Output path for a KML file: same name with a .parquet extension
+def parquet_path(kml_file, output_dir=None):
+    stem = os.path.splitext(os.path.basename(kml_file))[0]
+    return os.path.join(output_dir or os.path.dirname(os.path.abspath(kml_file)), f"{stem}.parquet")
+
+
+# Parse a KML file and write it as GeoParquet (requires pyarrow)
+def ingest(kml_file, output_dir=None):
+    gdf = read_kml(kml_file)
+    output_file = parquet_path(kml_file, output_dir)
+    gdf.to_parquet(output_file, index=False)
+    return output_file, gdf
+
+
+# Every KML file in the SatelliteData folder
+def kml_files(kml_dir=KML_DIR):
+    return sorted(os.path.join(kml_dir, name) for name in os.listdir(kml_dir) if name.lower().endswith('.kml'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert KML acquisition plans to GeoParquet')
+    parser.add_argument('files', nargs='*', help='KML files (default: every KML in SatelliteData/)')
+    parser.add_argument('--output-dir', help='Output directory (default: next to each KML)')
+    args = parser.parse_args()
+    for kml_file in args.files or kml_files():
+        output_file, gdf = ingest(kml_file, args.output_dir)
+        print(f"{os.path.basename(kml_file)}: {len(gdf)} footprints, "
+              f"{gdf.attrs['skipped_placemarks']} placemarks skipped -> {output_file}")
@@ -0,0 +1,133 @@
+import time
+
+import numpy as np
+import folium
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+# Folium map building for the Map View. The default 'layer' mode sends one
+# FeatureCollection per satellite: geometries are simplified to the tolerance of the
+# rendered zoom level and rounded to the coordinate precision that zoom can show, and
+# the fill color and popup text travel as feature properties, so each satellite
+# needs a single style function and popup template. The 'frame' mode is the
+# original rendering (one folium.GeoJson per frame) kept for comparison. The
+# 'tiles' mode only adds tile layers served by tile_server.py.
+RENDER_MODES = ['layer', 'frame', 'tiles']
+
+# Map center and initial zoom (the Map View is rendered statically at this zoom)
+MAP_CENTER = [22.45276, 40.48313]
+MAP_ZOOM = 6
+
+FRAME_STYLE = {'color': 'white', 'weight': 2, 'fillOpacity': 0.5}
+AOI_STYLE = {'fillColor': 'yellow', 'color': 'white', 'weight': 2, 'fillOpacity': 0.3}
+AOI_LAYER_NAME = 'AOI (Saudi Arabia EEZ)'
+
+
+# Size of one screen pixel in degrees at a Web Mercator zoom level (at the equator)
+def pixel_size_deg(zoom):
+    return 360 / (256 * 2 ** zoom)
+
+
+# Simplification tolerance for a zoom level: half a pixel
+def simplify_tolerance(zoom):
+    return pixel_size_deg(zoom) / 2
+
+
+# Decimal places needed to place vertices to within a tenth of a pixel
+def coordinate_precision(zoom):
+    return max(int(np.ceil(-np.log10(pixel_size_deg(zoom) / 10))), 0)
+
+
+# Simplify and round geometries for display at a zoom level (None for empty results)
+def display_geometries(geoms, zoom):
+    geoms = shapely.simplify(np.asarray(geoms, dtype=object), simplify_tolerance(zoom), preserve_topology=True)
+    precision = coordinate_precision(zoom)
+    geoms = shapely.transform(geoms, lambda coords: np.round(coords, precision))
+    geoms[shapely.is_missing(geoms) | shapely.is_empty(geoms)] = None
+    return geoms
+
+
+# Popup text of a frame (satellite, date and, except for Landsat, acquisition time)
+def frame_popup(satellite, source, row):
+    popup = f"{satellite}<br>Date: {row.acquisition_date.strftime('%Y-%m-%d') if pd.notna(row.acquisition_date) else 'Unknown'}"
+    if source != 'landsat':
+        popup += f"<br>Time: {row.timestamp}"
+    return popup
+
+
+# One GeoJson layer for a set of polygons, styled and labelled from feature properties
+def polygon_layer(geoms, colors, popups, zoom, style=FRAME_STYLE):
+    gdf = gpd.GeoDataFrame(geometry=display_geometries(geoms, zoom), crs='EPSG:4326')
+    gdf['color'] = colors
+    gdf['popup'] = popups
+    gdf = gdf[gdf.geometry.notna()]
+    return folium.GeoJson(
+        gdf.to_geo_dict(),
+        style_function=lambda feature: dict(style, fillColor=feature['properties']['color']),
+        popup=folium.GeoJsonPopup(fields=['popup'], labels=False),
+    )
+
+
+# Build the Map View map for a day (as returned by coverage.compute_day or
+# coverage_index.lookup_day). 'satellite_color' maps a satellite name to a color;
+# in 'tiles' mode 'tile_layers' maps layer names to tile URL templates.
+def build_map(day, satellite_color, mode='layer', zoom=MAP_ZOOM, tile_layers=None):
+    if mode not in RENDER_MODES:
+        raise ValueError(f"Unknown render mode {mode!r}, expected one of {RENDER_MODES}")
+    m = folium.Map(location=MAP_CENTER, zoom_start=MAP_ZOOM)
+    if mode == 'tiles':
+        for name, url in (tile_layers or {}).items():
+            folium.TileLayer(tiles=url, attr='Local coverage tiles', name=name, overlay=True, show=True).add_to(m)
+        folium.LayerControl(collapsed=False).add_to(m)
+        return m
+
+    # One feature group per Sentinel and daily satellite (e.g., SAOCOM-1A, SAOCOM-1B),
+    # Landsat 8 and 9 share a single group
+    frames = day['frames']
+    feature_groups = {}
+    for sat in day['satellites'].itertuples(index=False):
+        group_name = 'Landsat' if sat.source == 'landsat' else sat.satellite
+        if group_name not in feature_groups:
+            feature_groups[group_name] = folium.FeatureGroup(name=group_name, show=True)
+        color = satellite_color(sat.satellite)
+        sat_frames = frames[(frames['satellite'] == sat.satellite) & (frames['source'] == sat.source)]
+        sat_frames = sat_frames[sat_frames.geometry.notna() & ~sat_frames.geometry.is_empty & sat_frames.geometry.is_valid]
+        if sat_frames.empty:
+            continue
+        popups = [frame_popup(sat.satellite, sat.source, row) for row in sat_frames.itertuples(index=False)]
+        if mode == 'layer':
+            polygon_layer(sat_frames.geometry.to_numpy(), color, popups, zoom).add_to(feature_groups[group_name])
+            continue
+        for row, popup in zip(sat_frames.itertuples(index=False), popups):
+            folium.GeoJson(
+                row.geometry,
+                style_function=lambda x, color=color: dict(FRAME_STYLE, fillColor=color),
+                popup=folium.Popup(popup)
+            ).add_to(feature_groups[group_name])
+    for feature_group in feature_groups.values():
+        feature_group.add_to(m)
+
+    # Modified AOI: the part of the AOI not covered by any frame
+    residual = np.array([geom for geom in day['residual'] if geom is not None and not geom.is_empty and geom.is_valid], dtype=object)
+    aoi_feature_group = folium.FeatureGroup(name=AOI_LAYER_NAME, show=True)
+    if mode == 'layer' and len(residual):
+        polygon_layer(residual, AOI_STYLE['fillColor'], 'Saudi Arabia EEZ', zoom, AOI_STYLE).add_to(aoi_feature_group)
+    elif mode == 'frame':
+        for geom in residual:
+            folium.GeoJson(
+                geom,
+                style_function=lambda x: AOI_STYLE,
+                popup=folium.Popup("Saudi Arabia EEZ")
+            ).add_to(aoi_feature_group)
+    aoi_feature_group.add_to(m)
+
+    folium.LayerControl(collapsed=False).add_to(m)
+    return m
+
+
+# Build and render a day's map to HTML; returns (html, seconds)
+def render_html(day, satellite_color, mode='layer', zoom=MAP_ZOOM, tile_layers=None):
+    start = time.perf_counter()
+    html = build_map(day, satellite_color, mode, zoom, tile_layers).get_root().render()
+    return html, time.perf_counter() - start
@@ -0,0 +1,249 @@
+import argparse
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+import config
+import coverage
+import coverage_index
+import data_store
+import footprint_catalog
+
+# Coverage of many AOIs at once: for a set of AOIs and a date range, the area of
+# each AOI covered by each satellite on each date, as one long matrix with a row per
+# (AOI, date, satellite) and an ALL row per (AOI, date) for the union of every
+# satellite. Satellites that miss an AOI on a date get no row. Areas are measured
+# as compute_day measures them: a satellite's area is its union clipped to the AOI,
+# the ALL area is the AOI's area less the area it leaves uncovered.
+#
+# The footprints are loaded, validated and indexed once (a footprint catalog per
+# worker) and each date's work is shared by every AOI:
+#   - each satellite's frames are matched to the AOIs with one STRtree query over
+#     the (prepared) AOI geometries, so a satellite only meets the AOIs it touches
+#   - each satellite's union is built once per date and clipped against the AOIs it
+#     touches in one vectorized intersection; the clipped pieces are reprojected to
+#     AREA_CRS in one batch
+#   - unions and areas are memoized by the frames' WKB (in an LRU), so a Sentinel
+#     satellite's reference-plan days are measured once per revisit cycle
+# Dates are spread over a process pool, each worker holding the AOIs and catalog.
+MATRIX_COLUMNS = [
+    'aoi', 'date', 'satellite', 'source', 'frame_count', 'area_km2', 'aoi_area_km2', 'percentage',
+]
+
+MAX_WORKERS = os.cpu_count()
+
+# Frame sets whose union and areas are kept per AoiSet (a revisit cycle of Sentinel
+# days is about 60; commercial days are rarely seen twice)
+MAX_MEMO_ENTRIES = 256
+
+# Tolerance (degrees) of the test that an AOI lies inside config.aoi_file
+INSIDE_TOLERANCE = 1e-6
+
+# Per-process inputs, set by _init_worker
+_inputs = {}
+
+
+# Names and geometries of the AOIs in some files: one AOI per file (the union of its
+# features, named after the file) or, with by_feature, one per feature (<file>:<n>)
+def load_aois(aoi_files, by_feature=False):
+    names = []
+    geoms = []
+    for path in aoi_files:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"AOI file {path} not found.")
+        stem = os.path.splitext(os.path.basename(path))[0]
+        features = data_store.load_aoi(path).geometry.to_numpy()
+        if by_feature:
+            for i, geom in enumerate(features):
+                if geom is not None and not geom.is_empty:
+                    names.append(f'{stem}:{i}')
+                    geoms.append(geom)
+        else:
+            names.append(stem)
+            geoms.append(coverage.union_geometries(features))
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"AOI names are not unique: {', '.join(duplicates)}")
+    return names, np.array(geoms, dtype=object)
+
+
+# Sentinel configurations for a set of AOIs: the plans clipped to config.aoi_file
+# when every AOI lies inside it, otherwise the global reference plans
+def sentinel_configs(geoms):
+    outer = coverage.union_geometries(data_store.load_aoi(config.aoi_file).geometry.to_numpy()).buffer(INSIDE_TOLERANCE)
+    if shapely.covers(outer, geoms).all():
+        return config.satellite_configs
+    return [dict(sat_config, file=sat_config['plan_file']) for sat_config in config.satellite_configs]
+
+
+# A set of AOIs indexed for coverage queries
+class AoiSet:
+    def __init__(self, names, geoms, max_memo=MAX_MEMO_ENTRIES):
+        self.names = list(names)
+        self.geoms = np.asarray(geoms, dtype=object)
+        shapely.prepare(self.geoms)
+        self.tree = shapely.STRtree(self.geoms)
+        self.areas_km2 = self._areas_km2(self.geoms)
+        self.max_memo = max_memo
+        # frames digest -> (union, AOI positions, frame counts, covered areas)
+        self._memo = OrderedDict()
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _areas_km2(geoms):
+        if len(geoms) == 0:
+            return np.zeros(0)
+        return gpd.GeoSeries(geoms, crs='EPSG:4326').to_crs(coverage.AREA_CRS).area.to_numpy() / 1_000_000
+
+    # Area in km² of the part of each AOI in 'positions' covered by a geometry
+    def covered_km2(self, geom, positions):
+        if geom is None or len(positions) == 0:
+            return np.zeros(len(positions))
+        pieces = shapely.intersection(geom, self.geoms[positions])
+        invalid = ~shapely.is_valid(pieces)
+        if invalid.any():
+            pieces[invalid] = shapely.make_valid(pieces[invalid])
+        return self._areas_km2(pieces)
+
+    # Covered area in km² of each AOI in 'positions' measured as in compute_day's
+    # combined coverage: the AOI's area less the area of the part left uncovered
+    def combined_km2(self, geom, positions):
+        if geom is None or len(positions) == 0:
+            return np.zeros(len(positions))
+        residual = shapely.difference(self.geoms[positions], geom)
+        invalid = ~shapely.is_valid(residual)
+        if invalid.any():
+            residual[invalid] = shapely.make_valid(residual[invalid])
+        return self.areas_km2[positions] - self._areas_km2(residual)
+
+    # Union of a set of frames and the AOIs it covers: (union, AOI positions, frames
+    # intersecting each of those AOIs, covered area of each in km²)
+    def measure(self, geoms):
+        key = coverage.geometry_digest(geoms)
+        if key in self._memo:
+            self._memo.move_to_end(key)
+            return self._memo[key]
+        frame_positions, aoi_positions = self.tree.query(geoms, predicate='intersects')
+        counts = np.bincount(aoi_positions, minlength=len(self))
+        positions = np.flatnonzero(counts)
+        union = coverage.union_geometries(geoms)
+        self._memo[key] = (union, positions, counts[positions], self.covered_km2(union, positions))
+        while len(self._memo) > self.max_memo:
+            self._memo.popitem(last=False)
+        return self._memo[key]
+
+
+# Matrix row of one AOI (as a tuple in MATRIX_COLUMNS order)
+def _row(aois, position, selected_date, satellite, source, frame_count, area):
+    aoi_area = aois.areas_km2[position]
+    percentage = area / aoi_area * 100 if aoi_area > 0 else 0.0
+    return aois.names[position], selected_date, satellite, source, int(frame_count), float(area), aoi_area, percentage
+
+
+# Matrix rows of one date for every AOI
+def date_rows(aois, catalog, selected_date):
+    rows = []
+    unions = []
+    counts = np.zeros(len(aois), dtype=np.int64)
+    for satellite, source, sensor, target_date, frames in catalog.select_frames(selected_date):
+        geoms = frames['geometry'].to_numpy()
+        if len(geoms) == 0:
+            continue
+        union, positions, frame_counts, areas = aois.measure(geoms)
+        unions.append(union)
+        counts[positions] += frame_counts
+        for position, frame_count, area in zip(positions, frame_counts, areas):
+            rows.append(_row(aois, position, selected_date, satellite, source, frame_count, area))
+
+    # ALL: the union of the satellite unions, against the AOIs any of them touches
+    positions = np.flatnonzero(counts)
+    all_areas = np.zeros(len(aois))
+    all_areas[positions] = aois.combined_km2(coverage.union_geometries(unions), positions)
+    for position in range(len(aois)):
+        rows.append(_row(aois, position, selected_date, 'ALL', None, counts[position], all_areas[position]))
+    return rows
+
+
+def _init_worker(aoi_files, by_feature, start_date, end_date):
+    names, geoms = load_aois(aoi_files, by_feature)
+    dates = coverage_index.date_range(start_date, end_date)
+    _inputs['aois'] = AoiSet(names, geoms)
+    _inputs['catalog'] = footprint_catalog.build_catalog(
+        data_store.load_sentinel(sentinel_configs(geoms)),
+        data_store.load_landsat(config.landsat8_file, config.landsat9_file),
+        {selected_date: data_store.load_commercial_day(selected_date) for selected_date in dates},
+    )
+
+
+def compute_date(selected_date):
+    return date_rows(_inputs['aois'], _inputs['catalog'], selected_date)
+
+
+# Coverage matrix of a set of AOI files from start_date to end_date inclusive,
+# sorted by AOI, date and satellite (ALL last). With one worker the dates are
+# computed in this process.
+def coverage_matrix(aoi_files, start_date, end_date, by_feature=False, workers=MAX_WORKERS, log=print):
+    dates = coverage_index.date_range(start_date, end_date)
+    start = time.perf_counter()
+    rows = []
+    workers = min(workers or 1, len(dates))
+    if workers <= 1:
+        _init_worker(aoi_files, by_feature, start_date, end_date)
+        log(f"{len(_inputs['aois'])} AOIs and {len(_inputs['catalog'])} footprints loaded in "
+            f"{time.perf_counter() - start:.1f}s")
+        for selected_date in dates:
+            rows += compute_date(selected_date)
+    else:
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                       initargs=(aoi_files, by_feature, start_date, end_date))
+        with executor:
+            futures = [executor.submit(compute_date, selected_date) for selected_date in dates]
+            for future in as_completed(futures):
+                rows += future.result()
+    log(f"Computed {len(dates)} dates in {time.perf_counter() - start:.1f}s")
+
+    # Rows of a date come satellite by satellite; a stable sort keeps that order per AOI
+    names, _ = load_aois(aoi_files, by_feature)
+    matrix = pd.DataFrame(rows, columns=MATRIX_COLUMNS)
+    matrix['aoi_order'] = matrix['aoi'].map({name: i for i, name in enumerate(names)})
+    matrix['is_all'] = matrix['satellite'] == 'ALL'
+    matrix = matrix.sort_values(['aoi_order', 'date', 'is_all'], kind='stable')
+    return matrix.drop(columns=['aoi_order', 'is_all']).reset_index(drop=True)
+
+
+# One column per satellite of a coverage matrix, indexed by (AOI, date)
+def pivot(matrix, value='percentage'):
+    return matrix.pivot_table(index=['aoi', 'date'], columns='satellite', values=value, sort=False).fillna(0.0)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Coverage of several AOIs per date and satellite, in one pass')
+    parser.add_argument('aoi', nargs='*', help='AOI files (default: config.aoi_file and every file in config.aoi_dir)')
+    parser.add_argument('--start', type=date.fromisoformat, default=date(2025, 8, 1), help="First date (YYYY-MM-DD)")
+    parser.add_argument('--end', type=date.fromisoformat, default=date(2025, 8, 31), help="Last date (YYYY-MM-DD)")
+    parser.add_argument('--by-feature', action='store_true', help='Treat every feature of a file as its own AOI')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--output', default=os.path.join(config.base_dir, 'aoi_coverage_matrix.csv'),
+                        help='Matrix file (.csv or .parquet)')
+    args = parser.parse_args()
+
+    aoi_files = args.aoi or [config.aoi_file] + [
+        os.path.join(config.aoi_dir, name) for name in sorted(os.listdir(config.aoi_dir)) if name.endswith('.geojson')
+    ]
+    matrix = coverage_matrix(aoi_files, args.start, args.end, args.by_feature, args.workers)
+    if args.output.endswith('.parquet'):
+        matrix.to_parquet(args.output, index=False)
+    else:
+        matrix.round(2).to_csv(args.output, index=False)
+    print(f"Saved {len(matrix)} rows to {args.output}")
+    combined = matrix[matrix['satellite'] == 'ALL'].groupby('aoi', sort=False)['percentage']
+    print(combined.agg(['mean', 'min', 'max']).round(2).to_string())
@@ -0,0 +1,159 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+# Background precomputation of Map View results. After a date is rendered, the app
+# schedules the dates around it; a worker thread computes them (coverage and map)
+# while the user looks at the current one, and keeps the results in a bounded LRU
+# keyed by (date, render mode, satellites switched off). Stepping to a neighbouring
+# date then finds its result ready, or waits for the job already computing it.
+#
+# Each session owns the jobs it scheduled (a job scheduled by several sessions has
+# several owners): scheduling new dates drops the session from its jobs for dates it
+# no longer needs, and a job no session owns any more is cancelled. Queued jobs are
+# dropped; a running job sees its
+# cancellation flag at the next stage boundary (the compute function checks it and
+# raises Cancelled). Jobs run in threads rather than processes so they share the
+# loaded sources, the footprint catalog and the memoized unions; GEOS releases the
+# GIL during the geometry work.
+MAX_ENTRIES = 16
+
+# Dates computed ahead on each side of the selected one
+NEIGHBOURS = 2
+
+MAX_WORKERS = 1
+
+# Process-wide prefetcher (see shared_prefetcher)
+_shared = {'prefetcher': None}
+_shared_lock = threading.Lock()
+
+
+class Cancelled(Exception):
+    pass
+
+
+# Dates around selected_date, nearest first (next day before previous day), within
+# [first_date, last_date]
+def neighbour_dates(selected_date, count=NEIGHBOURS, first_date=None, last_date=None):
+    dates = []
+    for offset in range(1, count + 1):
+        for day in (selected_date + timedelta(days=offset), selected_date - timedelta(days=offset)):
+            if (first_date is None or day >= first_date) and (last_date is None or day <= last_date):
+                dates.append(day)
+    return dates
+
+
+class Prefetcher:
+    def __init__(self, max_entries=MAX_ENTRIES, workers=MAX_WORKERS):
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        # key -> (future, cancellation event, set of owners)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='prefetch')
+        self.stats = {'hits': 0, 'waits': 0, 'misses': 0, 'scheduled': 0, 'cancelled': 0, 'failed': 0}
+
+    def _store(self, key, value):
+        self._results[key] = value
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    # Result for a key: from the LRU, from the job computing it, or computed here with
+    # compute(key, cancelled). A job that has not started yet is dropped instead of
+    # waited for, and a job that failed or was cancelled is computed again here.
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._results[key]
+            job = self._jobs.get(key)
+            if job is not None and job[0].cancel():
+                job[1].set()
+                del self._jobs[key]
+                job = None
+        if job is not None:
+            try:
+                value = job[0].result()
+                with self._lock:
+                    self.stats['waits'] += 1
+                return value
+            except Exception:
+                pass
+        value = compute(key, lambda: False)
+        with self._lock:
+            self.stats['misses'] += 1
+            self._store(key, value)
+        return value
+
+    # Compute keys in the background (in order) and drop the owner from its jobs for
+    # any other key, cancelling the jobs left without an owner
+    def schedule(self, keys, compute, owner=None):
+        keys = list(keys)
+        with self._lock:
+            for key, (future, event, owners) in list(self._jobs.items()):
+                if owner in owners and key not in keys:
+                    owners.discard(owner)
+                    if not owners:
+                        event.set()
+                        future.cancel()
+                        del self._jobs[key]
+                        self.stats['cancelled'] += 1
+            for key in keys:
+                if key in self._jobs:
+                    self._jobs[key][2].add(owner)
+                    continue
+                if key in self._results:
+                    continue
+                event = threading.Event()
+                future = self._executor.submit(self._run, key, compute, event)
+                self._jobs[key] = (future, event, {owner})
+                self.stats['scheduled'] += 1
+
+    def _run(self, key, compute, event):
+        try:
+            if event.is_set():
+                raise Cancelled()
+            value = compute(key, event.is_set)
+            with self._lock:
+                self._store(key, value)
+            return value
+        except Cancelled:
+            raise
+        except Exception:
+            with self._lock:
+                self.stats['failed'] += 1
+            raise
+        finally:
+            with self._lock:
+                job = self._jobs.get(key)
+                if job is not None and job[1] is event:
+                    del self._jobs[key]
+
+    # Keys with a result ready and keys being computed
+    def status(self):
+        with self._lock:
+            return {'ready': list(self._results), 'pending': list(self._jobs)}
+
+    # Drop every result (jobs still running store theirs when they finish)
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+    def shutdown(self):
+        with self._lock:
+            for future, event, _ in self._jobs.values():
+                event.set()
+                future.cancel()
+            self._jobs.clear()
+        self._executor.shutdown(wait=True)
+
+
+# The prefetcher shared by every session of the process
+def shared_prefetcher():
+    with _shared_lock:
+        if _shared['prefetcher'] is None:
+            _shared['prefetcher'] = Prefetcher()
+        return _shared['prefetcher']
@@ -0,0 +1,169 @@
+import contextvars
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import shapely
+
+import config
+
+# Lightweight profiling of one app rerun. A Profiler is activated at the top of a
+# rerun (see activate) and the hot paths call profiling.stage(name)
+# and profiling.record(name, value) wherever they run, without a profiler being
+# passed around. With no active profiler both are a context-variable lookup, so
+# the instrumentation can stay in place when profiling is off.
+#
+# Each stage records its wall time and the process's resident-set high-water mark
+# when it ends; with trace_memory, it also records the peak of Python allocations
+# traced by tracemalloc during the stage (tracing slows allocations down, so it is
+# opt-in, and tracemalloc is process-wide, so concurrent sessions share it: it runs
+# while any session traces, see activate).
+# Stages nest: a stage's name is prefixed with its parents' names.
+PROFILE_LOG = os.path.join(config.base_dir, 'profile_log.jsonl')
+
+_active = contextvars.ContextVar('profiler', default=None)
+_NULL_STAGE = nullcontext()
+
+# Seconds after its last rerun a session tracing memory stops counting as tracing
+# (a session whose tab closed never reruns with tracing off)
+TRACING_OWNER_TTL_S = 600
+
+# Sessions tracing Python allocations and the time of their last rerun
+# (time.monotonic); tracemalloc is stopped when the last one stops or expires
+_tracing_owners = {}
+_tracing_lock = threading.Lock()
+_started_tracing = False
+
+
+# Resident-set high-water mark of the process in MiB (ru_maxrss is in KiB on
+# Linux and in bytes on macOS)
+def max_rss_mib():
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / 2 ** 20 if sys.platform == 'darwin' else maxrss / 2 ** 10
+
+
+# Total vertex count of a set of geometries (missing geometries count 0)
+def vertex_count(geoms):
+    geoms = np.asarray(list(geoms), dtype=object)
+    return int(shapely.get_num_coordinates(geoms).sum()) if len(geoms) else 0
+
+
+class Profiler:
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = []
+        self.counts = {}
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._path = []
+        self._peaks = []
+
+    @contextmanager
+    def stage(self, name):
+        self._path.append(name)
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            # Nested stages reset the peak too, so each stage also keeps the highest
+            # peak its children reported
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            self._peaks.append(0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            row = {
+                'stage': ' / '.join(self._path),
+                'depth': len(self._path) - 1,
+                'start_s': start - self._start,
+                'seconds': time.perf_counter() - start,
+                'max_rss_mib': max_rss_mib(),
+            }
+            if tracing:
+                peak = max(tracemalloc.get_traced_memory()[1], self._peaks.pop())
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                row['traced_peak_mib'] = (peak - base) / 2 ** 20
+            self.stages.append(row)
+            self._path.pop()
+
+    def record(self, name, value):
+        self.counts[name] = value
+
+    # Stages in the order they started, nested stages indented
+    def stage_table(self):
+        df = pd.DataFrame(self.stages, columns=['stage', 'depth', 'start_s', 'seconds', 'max_rss_mib', 'traced_peak_mib'])
+        df = df.sort_values(['start_s', 'depth']).dropna(axis=1, how='all')
+        df['stage'] = ['  ' * depth + name.split(' / ')[-1] for depth, name in zip(df['depth'], df['stage'])]
+        return df.drop(columns='depth').reset_index(drop=True)
+
+    # One JSON object describing the rerun
+    def to_record(self, **context):
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'total_seconds': time.perf_counter() - self._start,
+            'max_rss_mib': max_rss_mib(),
+            **context,
+            'stages': self.stages,
+            'counts': self.counts,
+        }
+
+    # Append the rerun to a JSON Lines log
+    def write_log(self, log_file=PROFILE_LOG, **context):
+        with open(log_file, 'a') as f:
+            f.write(json.dumps(self.to_record(**context), default=str) + '\n')
+
+
+# Make a profiler the active one in the current context (None turns profiling off).
+# The app calls this at the top of every rerun, so a rerun that stops early leaves
+# nothing active for the next one. 'owner' identifies the session: tracemalloc is
+# started by the first owner tracing memory and only stopped once no owner traces,
+# so one session turning tracing off does not wipe another's peaks. Owners that have
+# not rerun for TRACING_OWNER_TTL_S are dropped.
+def activate(profiler, owner=None):
+    global _started_tracing
+    _active.set(profiler)
+    trace_memory = profiler is not None and profiler.trace_memory
+    now = time.monotonic()
+    with _tracing_lock:
+        for stale in [o for o, seen in _tracing_owners.items() if now - seen > TRACING_OWNER_TTL_S]:
+            del _tracing_owners[stale]
+        if trace_memory:
+            _tracing_owners[owner] = now
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+        else:
+            _tracing_owners.pop(owner, None)
+            if _started_tracing and not _tracing_owners:
+                tracemalloc.stop()
+                _started_tracing = False
+    return profiler
+
+
+# Time a block under the active profiler (a shared no-op context when none is active)
+def stage(name):
+    profiler = _active.get()
+    if profiler is None:
+        return _NULL_STAGE
+    return profiler.stage(name)
+
+
+# Record a value (vertex count, frame count, ...) on the active profiler
+def record(name, value):
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.record(name, value)
+
+
+# Whether a profiler is active (for counts that are themselves costly to compute)
+def active():
+    return _active.get() is not None
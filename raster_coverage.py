@@ -0,0 +1,249 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import geopandas as gpd
+import shapely
+
+import coverage
+
+# Equal-area raster coverage. The AOI and every footprint are rasterized onto a
+# fixed grid in EASE-Grid 2.0 (an equal-area projection), so each cell has the
+# same true area and coverage questions become array reductions: covered area is
+# a count of set cells, unions are ORs, revisit counts are sums over days.
+# Only cells inside the AOI are stored, as packed bitmasks.
+EQUAL_AREA_CRS = 'EPSG:6933'
+
+# Default cell size in meters (2 km cells, 4 km² each)
+DEFAULT_RESOLUTION_M = 2000
+
+# AOI grids kept by a RasterBackend (least recently used dropped first)
+MAX_GRIDS = 8
+
+# Names of the compute_day backends (see get_backend)
+BACKENDS = ['vector', 'raster']
+
+
+# Fixed equal-area grid over an AOI. Cells are included when their center lies
+# inside a geometry; 'aoi_cells' lists the flat indices of the cells in the AOI and
+# all per-cell vectors returned by rasterize_cells are aligned to that list.
+class RasterGrid:
+    def __init__(self, aoi_gdf, resolution_m=DEFAULT_RESOLUTION_M):
+        self.resolution_m = float(resolution_m)
+        self.cell_area_km2 = self.resolution_m ** 2 / 1_000_000
+        aoi_geoms = aoi_gdf.geometry.to_crs(EQUAL_AREA_CRS).to_numpy()
+        minx, miny, maxx, maxy = shapely.total_bounds(aoi_geoms)
+        res = self.resolution_m
+        self.x0 = np.floor(minx / res) * res
+        self.y0 = np.ceil(maxy / res) * res
+        self.nx = int(np.ceil((maxx - self.x0) / res))
+        self.ny = int(np.ceil((self.y0 - miny) / res))
+
+        # One mask per AOI row, then the cells inside any of them
+        row_masks = [self._rasterize(geom) for geom in aoi_geoms]
+        aoi_mask = np.logical_or.reduce(row_masks) if row_masks else np.zeros((self.ny, self.nx), dtype=bool)
+        self.aoi_cells = np.flatnonzero(aoi_mask)
+        self.row_cells = [mask.ravel()[self.aoi_cells] for mask in row_masks]
+        self.aoi_area_km2 = len(self.aoi_cells) * self.cell_area_km2
+
+    # Boolean (ny, nx) mask of the cells whose centers fall inside a projected geometry
+    def _rasterize(self, geom):
+        mask = np.zeros((self.ny, self.nx), dtype=bool)
+        if geom is None or geom.is_empty:
+            return mask
+        res = self.resolution_m
+        minx, miny, maxx, maxy = geom.bounds
+        i0 = max(int(np.ceil((minx - self.x0) / res - 0.5)), 0)
+        i1 = min(int(np.floor((maxx - self.x0) / res - 0.5)), self.nx - 1)
+        j0 = max(int(np.ceil((self.y0 - maxy) / res - 0.5)), 0)
+        j1 = min(int(np.floor((self.y0 - miny) / res - 0.5)), self.ny - 1)
+        if i0 > i1 or j0 > j1:
+            return mask
+        xs = self.x0 + (np.arange(i0, i1 + 1) + 0.5) * res
+        ys = self.y0 - (np.arange(j0, j1 + 1) + 0.5) * res
+        shapely.prepare(geom)
+        mask[j0:j1 + 1, i0:i1 + 1] = shapely.contains_xy(geom, xs[None, :], ys[:, None])
+        return mask
+
+    # (len(geoms), n_aoi_cells) boolean array: which AOI cells each EPSG:4326 geometry covers
+    def rasterize_cells(self, geoms):
+        geoms = np.asarray(geoms, dtype=object)
+        cells = np.zeros((len(geoms), len(self.aoi_cells)), dtype=bool)
+        present = ~shapely.is_missing(geoms)
+        if not present.any():
+            return cells
+        projected = gpd.GeoSeries(geoms[present], crs='EPSG:4326').to_crs(EQUAL_AREA_CRS).to_numpy()
+        for k, geom in zip(np.flatnonzero(present), projected):
+            cells[k] = self._rasterize(geom).ravel()[self.aoi_cells]
+        return cells
+
+    # Scatter a per-AOI-cell vector back onto the (ny, nx) grid
+    def to_map(self, values, fill=0):
+        values = np.asarray(values)
+        grid = np.full(self.ny * self.nx, fill, dtype=np.result_type(values.dtype, np.min_scalar_type(fill)))
+        grid[self.aoi_cells] = values
+        return grid.reshape(self.ny, self.nx)
+
+    # EPSG:4326 polygon covering the selected AOI cells (one box per run of cells in a grid row)
+    def cells_to_geometry(self, selected):
+        mask = self.to_map(np.asarray(selected, dtype=bool), fill=False)
+        padded = np.pad(mask, ((0, 0), (1, 1))).astype(np.int8)
+        edges = np.diff(padded, axis=1)
+        rows, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)
+        if rows.size == 0:
+            return shapely.Polygon()
+        res = self.resolution_m
+        boxes = shapely.box(self.x0 + starts * res, self.y0 - (rows + 1) * res,
+                            self.x0 + ends * res, self.y0 - rows * res)
+        merged = shapely.union_all(boxes)
+        return gpd.GeoSeries([merged], crs=EQUAL_AREA_CRS).to_crs('EPSG:4326').iloc[0]
+
+
+# Raster coverage backend for coverage.compute_day (same interface as
+# coverage.VectorBackend). Grids are built once per AOI and resolution and the
+# last MAX_GRIDS are kept.
+class RasterBackend:
+    name = 'raster'
+
+    def __init__(self, resolution_m=DEFAULT_RESOLUTION_M, max_grids=MAX_GRIDS):
+        self.resolution_m = resolution_m
+        self.max_grids = max_grids
+        self._grids = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Grid for an AOI, keyed by the AOI geometries' WKB
+    def grid(self, aoi_gdf):
+        key = b''.join(shapely.to_wkb(aoi_gdf.geometry.to_numpy()))
+        with self._lock:
+            if key in self._grids:
+                self._grids.move_to_end(key)
+                return self._grids[key]
+        grid = RasterGrid(aoi_gdf, self.resolution_m)
+        with self._lock:
+            self._grids[key] = grid
+            while len(self._grids) > self.max_grids:
+                self._grids.popitem(last=False)
+        return grid
+
+    def aoi_area_km2(self, aoi_gdf):
+        return self.grid(aoi_gdf).aoi_area_km2
+
+    def measure(self, aoi_gdf, geoms, groups, labels):
+        grid = self.grid(aoi_gdf)
+        cells = grid.rasterize_cells(geoms)
+        covered = cells.any(axis=0)
+        residual = [grid.cells_to_geometry(row & ~covered) for row in grid.row_cells]
+        return {
+            'frame_areas_km2': cells.sum(axis=1) * grid.cell_area_km2,
+            'union_areas_km2': np.array([cells[positions].any(axis=0).sum() for positions in groups]) * grid.cell_area_km2,
+            'residual': residual,
+            'residual_area_km2': float((~covered).sum() * grid.cell_area_km2),
+            'warnings': [],
+        }
+
+
+# compute_day backend of a name in BACKENDS: the shared vector backend or a raster
+# backend at a resolution
+def get_backend(name, resolution_m=DEFAULT_RESOLUTION_M):
+    if name == 'vector':
+        return coverage.VECTOR_BACKEND
+    if name == 'raster':
+        return RasterBackend(resolution_m)
+    raise ValueError(f"Unknown coverage backend {name!r}, expected one of {BACKENDS}")
+
+
+# Per-satellite daily coverage of one AOI over many days, as packed bitmasks.
+# Answers multi-day questions with array reductions: covered area, how many times
+# each cell was seen (revisit counts), the longest run of days without a look and
+# the overlap between free and commercial coverage.
+class CoverageStack:
+    def __init__(self, grid):
+        self.grid = grid
+        self.n_cells = len(grid.aoi_cells)
+        self.masks = {}
+        self.sources = {}
+
+    # Add the footprints a satellite acquired on a day (ORed with anything already stored)
+    def add(self, satellite, source, day, geoms):
+        bits = self.grid.rasterize_cells(geoms).any(axis=0)
+        key = (satellite, day)
+        if key in self.masks:
+            bits |= self._unpack(self.masks[key])
+        self.masks[key] = np.packbits(bits)
+        self.sources[satellite] = source
+
+    def _unpack(self, packed):
+        return np.unpackbits(packed, count=self.n_cells).astype(bool)
+
+    def dates(self):
+        return sorted({day for _, day in self.masks})
+
+    def satellites(self):
+        return sorted(self.sources)
+
+    # Keys matching optional date, satellite and source ('free' or 'commercial') filters
+    def _keys(self, dates=None, satellites=None, group=None):
+        keys = []
+        for satellite, day in self.masks:
+            if dates is not None and day not in dates:
+                continue
+            if satellites is not None and satellite not in satellites:
+                continue
+            if group is not None and (self.sources[satellite] == 'commercial') != (group == 'commercial'):
+                continue
+            keys.append((satellite, day))
+        return keys
+
+    # Union of the selected masks as one per-cell boolean vector
+    def covered_cells(self, dates=None, satellites=None, group=None):
+        covered = np.zeros(self.n_cells, dtype=bool)
+        for key in self._keys(dates, satellites, group):
+            covered |= self._unpack(self.masks[key])
+        return covered
+
+    def covered_area_km2(self, dates=None, satellites=None, group=None):
+        return float(self.covered_cells(dates, satellites, group).sum() * self.grid.cell_area_km2)
+
+    # Number of looks (satellite-days) per AOI cell, as a per-cell uint16 vector
+    def revisit_counts(self, dates=None, satellites=None, group=None):
+        counts = np.zeros(self.n_cells, dtype=np.uint16)
+        for key in self._keys(dates, satellites, group):
+            counts += self._unpack(self.masks[key])
+        return counts
+
+    # Longest run of consecutive days without any look, per AOI cell
+    def max_gap_days(self, dates=None, satellites=None, group=None):
+        days = sorted(dates) if dates is not None else self.dates()
+        gap = np.zeros(self.n_cells, dtype=np.int32)
+        longest = np.zeros(self.n_cells, dtype=np.int32)
+        for day in days:
+            seen = self.covered_cells([day], satellites, group)
+            gap = np.where(seen, 0, gap + 1)
+            np.maximum(longest, gap, out=longest)
+        return longest
+
+    # Area seen by both free and commercial satellites on the same day, summed over days
+    def overlap_area_km2(self, dates=None):
+        days = sorted(dates) if dates is not None else self.dates()
+        total = 0
+        for day in days:
+            free = self.covered_cells([day], group='free')
+            commercial = self.covered_cells([day], group='commercial')
+            total += int((free & commercial).sum())
+        return total * self.grid.cell_area_km2
+
+    # Storage used by the packed masks, in bytes
+    def nbytes(self):
+        return sum(mask.nbytes for mask in self.masks.values())
+
+
+# Build a coverage stack for a list of dates from the same frame selection the app uses
+def build_stack(aoi_gdf, sentinel_data, landsat_data, load_daily, dates, resolution_m=DEFAULT_RESOLUTION_M, grid=None):
+    if grid is None:
+        grid = RasterGrid(aoi_gdf, resolution_m)
+    stack = CoverageStack(grid)
+    for day in dates:
+        for satellite, source, _, _, frames in coverage.select_frames(sentinel_data, landsat_data, load_daily(day), day):
+            stack.add(satellite, source, day, frames.geometry.to_numpy())
+    return stack
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import time
+
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+import config
+import coverage
+import data_store
+import footprint_store
+
+# Multi-resolution versions of the AOI and the Sentinel and Landsat footprint files.
+# Every version is a topology-preserving simplification at one tolerance, snapped
+# with shapely.set_precision to a grid a hundredth of that tolerance, and written as
+# GeoParquet to <SIMPLIFIED_DIR>/<file stem>/. Versions that remove no vertices
+# compared to the previous level are not written.
+#
+# Each version records its area error: the summed area of the symmetric difference
+# between every simplified feature and its original, in km². This bounds the error
+# of any area measured with the version, whether of a single frame, of a union of
+# frames or of the part of the AOI they cover. data_store chooses the versions of
+# all the files together so their summed error is within config.area_tolerance_km2
+# (see data_store.simplified_choice), so a day's coverage is within the tolerance
+# (see data_store.simplification_error_km2). The daily commercial files are not
+# simplified: they are small and read in full.
+SIMPLIFIED_DIR = config.simplified_dir
+
+# Simplification tolerances in degrees, finest first (1e-4 degrees is about 11 m)
+TOLERANCES = [5e-5, 1e-4, 2e-4, 5e-4, 1e-3, 2e-3, 5e-3]
+
+# Snapping grid as a fraction of the simplification tolerance
+GRID_FRACTION = 0.01
+
+# Source columns kept per kind (the loaders derive everything else from them)
+KEEP_COLUMNS = {
+    'aoi': footprint_store.STORE_COLUMNS['aoi'],
+    'sentinel': ['acquisition_date', 'begin', 'end', 'Instrument'],
+    'landsat': ['acquisition_date', 'Name', 'Description', 'date', 'Instrument'],
+}
+
+
+# Area in km² of the symmetric difference between each pair of geometries
+def area_errors_km2(original, simplified):
+    difference = shapely.symmetric_difference(original, simplified)
+    invalid = ~shapely.is_valid(difference)
+    if invalid.any():
+        difference[invalid] = shapely.make_valid(difference[invalid])
+    return gpd.GeoSeries(difference, crs='EPSG:4326').to_crs(coverage.AREA_CRS).area.to_numpy() / 1_000_000
+
+
+# One version of a set of geometries (invalid or empty results keep the original)
+def simplify_geometries(geoms, tolerance):
+    simplified = shapely.set_precision(shapely.simplify(geoms, tolerance, preserve_topology=True),
+                                       tolerance * GRID_FRACTION)
+    broken = shapely.is_missing(simplified) | shapely.is_empty(simplified) | ~shapely.is_valid(simplified)
+    simplified[broken] = geoms[broken]
+    return simplified
+
+
+# Source files to simplify: (kind, path)
+def source_files(aoi_files=None):
+    sources = [('aoi', path) for path in (aoi_files or [config.aoi_file])]
+    sources += [('sentinel', sat_config['file']) for sat_config in config.satellite_configs]
+    sources += [('landsat', config.landsat8_file), ('landsat', config.landsat9_file)]
+    return [(kind, path) for kind, path in sources if os.path.exists(path)]
+
+
+# Write every version of one file; returns its manifest entry
+def simplify_file(kind, path, simplified_dir=SIMPLIFIED_DIR, tolerances=TOLERANCES):
+    gdf = data_store.read_geojson(path)
+    gdf = gdf[[col for col in KEEP_COLUMNS[kind] if col in gdf.columns] + ['geometry']]
+    original = gdf.geometry.to_numpy()
+    vertices = int(shapely.get_num_coordinates(original).sum())
+    stem = os.path.splitext(os.path.basename(path))[0]
+    os.makedirs(os.path.join(simplified_dir, stem), exist_ok=True)
+    versions = []
+    previous_vertices = vertices
+    for tolerance in tolerances:
+        simplified = simplify_geometries(original, tolerance)
+        version_vertices = int(shapely.get_num_coordinates(simplified).sum())
+        if version_vertices >= previous_vertices:
+            continue
+        errors = area_errors_km2(original, simplified)
+        part = os.path.join(stem, f'tol_{tolerance:g}.parquet')
+        target = os.path.join(simplified_dir, part)
+        gdf.assign(geometry=simplified).to_parquet(target + '.tmp', compression='zstd', index=False)
+        os.replace(target + '.tmp', target)
+        versions.append({
+            'tolerance_deg': tolerance,
+            'grid_deg': tolerance * GRID_FRACTION,
+            'file': part,
+            'vertices': version_vertices,
+            'area_error_km2': float(errors.sum()),
+            'max_feature_error_km2': float(errors.max()) if len(errors) else 0.0,
+        })
+        previous_vertices = version_vertices
+    return {'kind': kind, 'stamp': list(data_store._file_stamp(path)), 'vertices': vertices, 'versions': versions}
+
+
+# Simplify every source file that changed since its versions were written (all of
+# them with force); returns one row per version
+def simplify_all(aoi_files=None, simplified_dir=SIMPLIFIED_DIR, force=False, log=print):
+    os.makedirs(simplified_dir, exist_ok=True)
+    manifest_file = os.path.join(simplified_dir, data_store.SIMPLIFIED_MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_file):
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+
+    for kind, path in source_files(aoi_files):
+        key = data_store.store_key(path)
+        previous = manifest.get(key)
+        if not force and previous is not None and previous['stamp'] == list(data_store._file_stamp(path)):
+            continue
+        start = time.perf_counter()
+        manifest[key] = simplify_file(kind, path, simplified_dir)
+        log(f"{key}: {len(manifest[key]['versions'])} version(s) in {time.perf_counter() - start:.2f} s")
+        with open(manifest_file + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(manifest_file + '.tmp', manifest_file)
+
+    rows = []
+    for key, entry in manifest.items():
+        for version in entry['versions']:
+            rows.append({
+                'file': key,
+                'tolerance_deg': version['tolerance_deg'],
+                'vertices': f"{version['vertices']}/{entry['vertices']}",
+                'area_error_km2': round(version['area_error_km2'], 3),
+                'max_feature_error_km2': round(version['max_feature_error_km2'], 3),
+            })
+    return pd.DataFrame(rows, columns=['file', 'tolerance_deg', 'vertices', 'area_error_km2', 'max_feature_error_km2'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write multi-resolution versions of the AOI and footprint files')
+    parser.add_argument('--aoi', action='append', help='AOI file (repeatable, default: config.aoi_file)')
+    parser.add_argument('--force', action='store_true', help='Rebuild every version')
+    args = parser.parse_args()
+    report = simplify_all(args.aoi, force=args.force)
+    print(report.to_string(index=False))
+    tolerance = config.area_tolerance_km2
+    chosen = {data_store.store_key(path): data_store.simplified_file(path) for _, path in source_files(args.aoi)}
+    print(f"\nVersions used with area_tolerance_km2 = {tolerance}:")
+    for key, path in chosen.items():
+        print(f"  {key}: {data_store.store_key(path)}")
@@ -0,0 +1,131 @@
+import os
+import sys
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+import shapely
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import coverage
+import data_store
+
+# Shared fixtures of the tests: the sources of config.py and the coverage of one date
+# worked out the way the original app.py did it (a sequential difference of each
+# satellite's union from the AOI), which every faster path is checked against.
+DATE = date(2025, 8, 20)
+
+# Tolerance in km² of area comparisons with the baseline: overlays of the same
+# frames unioned in another order differ by a few km² over the EEZ (~0.002%)
+AREA_TOLERANCE_KM2 = 5.0
+
+
+def _area_km2(geoms):
+    return float(coverage.area_km2(list(geoms)))
+
+
+# Sentinel frames of a date as app.py selected them: the rows of the reference plan
+# on the matching day of each satellite's revisit cycle, per satellite
+def baseline_sentinel(sentinel_data, selected_date):
+    frames = {}
+    for satellite in sentinel_data['satellite'].unique():
+        sat_data = sentinel_data[sentinel_data['satellite'] == satellite]
+        revisit_frequency = int(sat_data['revisit_frequency'].iloc[0])
+        reference_date = sat_data['acquisition_date'].min().date()
+        target_date = reference_date + timedelta(days=(selected_date - reference_date).days % revisit_frequency)
+        frames[satellite] = (target_date, sat_data[sat_data['acquisition_date'].dt.date == target_date])
+    return frames
+
+
+# Frames of every satellite on a date as app.py selected them, in its order:
+# {satellite: frames} for the Sentinel satellites, Landsat (August only, every
+# undated scene) and the commercial satellites with frames on the date
+def baseline_frames(sentinel_data, landsat_data, daily_data, selected_date):
+    frames = {satellite: filtered for satellite, (_, filtered) in baseline_sentinel(sentinel_data, selected_date).items()}
+    if landsat_data is not None and selected_date.month == 8:
+        if landsat_data['acquisition_date'].isna().all():
+            filtered = landsat_data
+        else:
+            filtered = landsat_data[landsat_data['acquisition_date'].dt.date == selected_date]
+        for satellite in filtered['satellite'].unique():
+            frames[satellite] = filtered[filtered['satellite'] == satellite]
+    if daily_data is not None:
+        filtered = daily_data[daily_data['acquisition_date'].dt.date == selected_date]
+        for satellite in filtered['satellite'].unique():
+            frames[satellite] = filtered[filtered['satellite'] == satellite]
+    return frames
+
+
+# Coverage of a date as app.py computed it: the AOI less each satellite's union in
+# turn (the Landsat satellites as one union), repaired after each step, and the area
+# of every valid frame's intersection with the AOI. Areas in km². With 'satellites',
+# only those satellites' frames count.
+def baseline_day(aoi_gdf, sentinel_data, landsat_data, daily_data, selected_date, satellites=None):
+    frames = baseline_frames(sentinel_data, landsat_data, daily_data, selected_date)
+    if satellites is not None:
+        frames = {satellite: filtered for satellite, filtered in frames.items() if satellite in satellites}
+    steps = [filtered for satellite, filtered in frames.items() if not satellite.startswith('LANDSAT')]
+    landsat = [filtered for satellite, filtered in frames.items() if satellite.startswith('LANDSAT')]
+    if landsat:
+        steps.insert(sum(satellite.startswith('Sentinel') for satellite in frames), pd.concat(landsat))
+
+    residual = aoi_gdf.geometry
+    for filtered in steps:
+        if not filtered.empty:
+            residual = residual.difference(shapely.union_all(filtered.geometry.to_numpy())).make_valid()
+
+    frame_areas = {}
+    for satellite, filtered in frames.items():
+        frame_areas[satellite] = [
+            _area_km2(aoi_gdf.geometry.intersection(geom).make_valid())
+            for geom in filtered.geometry if geom is not None and geom.is_valid and not geom.is_empty
+        ]
+
+    original_area = _area_km2(aoi_gdf.geometry)
+    residual_area = _area_km2(residual)
+    return {
+        'original_area_km2': original_area,
+        'residual_area_km2': residual_area,
+        'combined_area_km2': original_area - residual_area,
+        'covered_percentage': (1 - residual_area / original_area) * 100,
+        'frames': frames,
+        'frame_areas_km2': frame_areas,
+    }
+
+
+@pytest.fixture(scope='session')
+def aoi():
+    return data_store.load_aoi(config.aoi_file)
+
+
+@pytest.fixture(scope='session')
+def sentinel_data():
+    return data_store.load_sentinel(config.satellite_configs)
+
+
+@pytest.fixture(scope='session')
+def landsat_data():
+    return data_store.load_landsat(config.landsat8_file, config.landsat9_file)
+
+
+@pytest.fixture(scope='session')
+def daily_data():
+    return data_store.load_commercial_day(DATE)
+
+
+@pytest.fixture(scope='session')
+def baseline(aoi, sentinel_data, landsat_data, daily_data):
+    return baseline_day(aoi, sentinel_data, landsat_data, daily_data, DATE)
+
+
+@pytest.fixture(scope='session')
+def day(aoi, sentinel_data, landsat_data, daily_data):
+    return coverage.compute_day(aoi, sentinel_data, landsat_data, daily_data, DATE,
+                                backend=coverage.VectorBackend())
+
+
+# Geometries as a sorted list of WKB, to compare sets of frames
+def frame_keys(geoms):
+    return sorted(shapely.to_wkb(list(geoms)))
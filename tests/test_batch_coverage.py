@@ -0,0 +1,93 @@
+import os
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+import batch_coverage
+import config
+from conftest import AREA_TOLERANCE_KM2, DATE
+
+DATES = [DATE, DATE + timedelta(days=1)]
+
+
+def _run(output_dir, store_format, messages=None):
+    log = messages.append if messages is not None else lambda message: None
+    return batch_coverage.run_batch(DATES[0], DATES[-1], output_dir=str(output_dir), store_format=store_format,
+                                    workers=1, log=log)
+
+
+@pytest.fixture(scope='module', params=batch_coverage.STORE_FORMATS)
+def batch(request, tmp_path_factory):
+    output_dir = tmp_path_factory.mktemp(f'batch_{request.param}')
+    _run(output_dir, request.param)
+    return output_dir, batch_coverage.DayStore(str(output_dir), request.param)
+
+
+def test_day_rows_match_baseline(batch, baseline):
+    _, store = batch
+    days, satellites = store.read(DATES)
+    assert sorted(days['date']) == [selected_date.isoformat() for selected_date in DATES]
+    day = days[days['date'] == DATE.isoformat()].iloc[0]
+    assert day['combined_area_km2'] == pytest.approx(baseline['combined_area_km2'], abs=AREA_TOLERANCE_KM2)
+    assert day['covered_percentage'] == pytest.approx(baseline['covered_percentage'], abs=0.01)
+    counts = satellites[satellites['date'] == DATE.isoformat()].set_index('satellite')['frame_count'].to_dict()
+    assert counts == {satellite: len(frames) for satellite, frames in baseline['frames'].items()}
+
+
+# A second run computes nothing and keeps one row per date and satellite
+def test_rerun_computes_nothing(batch):
+    output_dir, store = batch
+    messages = []
+    _run(output_dir, store.format, messages)
+    assert messages[0] == f"{len(DATES)} of {len(DATES)} dates already computed, 0 to go"
+    days, satellites = store.read(DATES)
+    assert len(days) == len(DATES)
+    assert not satellites.duplicated(['date', 'satellite']).any()
+
+
+# A day whose day row never got written is dropped and computed again
+def test_interrupted_day_is_recomputed(batch):
+    output_dir, store = batch
+    days, satellites = store.read(DATES)
+    last = DATES[-1].isoformat()
+    if store.format == 'csv':
+        days[days['date'] != last].to_csv(store._path('days'), index=False)
+    else:
+        os.remove(store._path('days', last))
+    assert set(store.done()) == {DATES[0].isoformat()}
+
+    messages = []
+    _run(output_dir, store.format, messages)
+    assert messages[0] == f"{len(DATES) - 1} of {len(DATES)} dates already computed, 1 to go"
+    rerun_days, rerun_satellites = store.read(DATES)
+    assert len(rerun_days) == len(DATES)
+    assert not rerun_satellites.duplicated(['date', 'satellite']).any()
+    assert len(rerun_satellites) == len(satellites)
+
+
+# A day computed from other source files is computed again
+def test_changed_sources_recomputed(batch, monkeypatch):
+    output_dir, store = batch
+    _, satellites = store.read(DATES)
+    last = DATES[-1].isoformat()
+    source_key = batch_coverage.source_key
+    monkeypatch.setattr(batch_coverage, 'source_key', lambda selected_date, aoi_file, configs: (
+        'changed' if selected_date == DATES[-1] else source_key(selected_date, aoi_file, configs)))
+    messages = []
+    _run(output_dir, store.format, messages)
+    assert messages[0] == f"{len(DATES) - 1} of {len(DATES)} dates already computed, 1 to go (1 with changed sources)"
+    assert store.done()[last] == 'changed'
+    rerun_days, rerun_satellites = store.read(DATES)
+    assert len(rerun_days) == len(DATES)
+    assert len(rerun_satellites) == len(satellites)
+
+
+# The per-satellite reports list the free Sentinel satellites only
+def test_reports_sentinel_rows(batch):
+    output_dir, _ = batch
+    sentinel = {sat_config['name'] for sat_config in config.satellite_configs}
+    for name in ['free_satellite_individual_coverage_august_2025.csv', 'satellite_coverage_areas_august_2025.csv']:
+        report = pd.read_csv(output_dir / name)
+        assert set(report['Satellite']) == sentinel
+        assert sorted(report['Date'].unique()) == [selected_date.isoformat() for selected_date in DATES]
@@ -0,0 +1,49 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+
+import clip_plans
+import config
+import coverage
+import data_store
+from conftest import DATE, baseline_sentinel
+
+
+@pytest.fixture(scope='module')
+def aoi_file_gdf():
+    return data_store.read_geojson(config.aoi_file)
+
+
+@pytest.fixture(scope='module', params=config.satellite_configs, ids=lambda sat_config: sat_config['name'])
+def plan(request):
+    return request.param, data_store.read_geojson(request.param['plan_file'])
+
+
+# Rows of a clip result sorted by their attributes
+def _sorted(gdf):
+    return gdf.sort_values([column for column in gdf.columns if column != 'geometry']).reset_index(drop=True)
+
+
+# Same rows, attributes and geometries as gpd.overlay(how='intersection')
+def test_clip_plan_matches_overlay(plan, aoi_file_gdf):
+    _, plan_gdf = plan
+    clipped = _sorted(clip_plans.clip_plan(plan_gdf, aoi_file_gdf))
+    expected = _sorted(gpd.overlay(plan_gdf, aoi_file_gdf, how='intersection', keep_geom_type=True))
+    assert list(clipped.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(pd.DataFrame(clipped.drop(columns='geometry')),
+                                  pd.DataFrame(expected.drop(columns='geometry')), check_dtype=False)
+    clipped, expected = clipped.geometry.to_crs(coverage.AREA_CRS), expected.geometry.to_crs(coverage.AREA_CRS)
+    np.testing.assert_allclose(clipped.area, expected.area, rtol=1e-9)
+    assert clipped.symmetric_difference(expected).area.max() < 1.0
+
+
+# The clipped plan's frames on the baseline's cycle day of DATE cover the AOI as the
+# baseline's frames do
+def test_clipped_frames_match_baseline(plan, aoi_file_gdf, aoi, sentinel_data, baseline):
+    sat_config, plan_gdf = plan
+    clipped = clip_plans.clip_plan(plan_gdf, aoi_file_gdf)
+    target_date, _ = baseline_sentinel(sentinel_data, DATE)[sat_config['name']]
+    on_day = clipped[pd.to_datetime(clipped['acquisition_date']).dt.date == target_date]
+    np.testing.assert_allclose(np.sort(coverage.frame_areas_km2(aoi, on_day.geometry.to_numpy())),
+                               np.sort(baseline['frame_areas_km2'][sat_config['name']]), rtol=1e-6, atol=1e-3)
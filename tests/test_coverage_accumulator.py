@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import config
+import coverage
+from conftest import AREA_TOLERANCE_KM2, DATE, baseline_day
+
+SENTINEL = {sat_config['name'] for sat_config in config.satellite_configs}
+
+
+def _compute(backend, sources, satellites=None):
+    return coverage.compute_day(*sources, DATE, backend=backend, satellites=satellites)
+
+
+@pytest.fixture(scope='module')
+def sources(aoi, sentinel_data, landsat_data, daily_data):
+    return aoi, sentinel_data, landsat_data, daily_data
+
+
+# Same frame and satellite areas as the plain vector backend, same coverage up to
+# union-order slivers
+def assert_same_day(day, expected):
+    np.testing.assert_allclose(day['frames']['area_km2'], expected['frames']['area_km2'], rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(day['satellites']['union_area_km2'], expected['satellites']['union_area_km2'],
+                               rtol=1e-9, atol=1e-6)
+    for key in ['free_area_km2', 'commercial_area_km2', 'combined_area_km2']:
+        assert day[key] == pytest.approx(expected[key], abs=AREA_TOLERANCE_KM2), key
+
+
+def test_matches_vector_backend(sources, day):
+    assert_same_day(_compute(coverage.CoverageAccumulator(), sources), day)
+
+
+# Switching satellites off and on again reuses the memoized unions and gives the
+# results of a fresh computation each time
+def test_toggles(sources, day):
+    accumulator = coverage.CoverageAccumulator()
+    full = _compute(accumulator, sources)
+    sentinel = _compute(accumulator, sources, SENTINEL)
+    assert_same_day(sentinel, _compute(coverage.VectorBackend(), sources, SENTINEL))
+    hits = accumulator.stats['hits']
+    again = _compute(accumulator, sources)
+    assert accumulator.stats['hits'] > hits
+    assert again['combined_area_km2'] == full['combined_area_km2']
+    assert_same_day(again, day)
+
+
+def test_sentinel_only_matches_baseline(sources, aoi, sentinel_data, landsat_data, daily_data):
+    expected = baseline_day(aoi, sentinel_data, landsat_data, daily_data, DATE, satellites=SENTINEL)
+    sentinel = _compute(coverage.CoverageAccumulator(), sources, SENTINEL)
+    assert sentinel['combined_area_km2'] == pytest.approx(expected['combined_area_km2'], abs=AREA_TOLERANCE_KM2)
+    assert sentinel['covered_percentage'] == pytest.approx(expected['covered_percentage'], abs=0.01)
+    assert sentinel['covered_percentage'] < 99
+
+
+def test_memo_bounded(sources, day):
+    accumulator = coverage.CoverageAccumulator(max_entries=4)
+    _compute(accumulator, sources, SENTINEL)
+    assert len(accumulator._memo) == 4
+    assert_same_day(_compute(accumulator, sources), day)
+    assert len(accumulator._memo) == 4
@@ -0,0 +1,79 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+import config
+import coverage
+import coverage_api
+from conftest import AREA_TOLERANCE_KM2, DATE
+
+SENTINEL = sorted(sat_config['name'] for sat_config in config.satellite_configs)
+
+
+# The API memoizes unions in the shared backend; later modules start from a fresh one
+@pytest.fixture(scope='module', autouse=True)
+def clear_backend():
+    yield
+    coverage.VECTOR_BACKEND.clear()
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = coverage_api.serve(port=0, warm_up=False)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://{server.server_address[0]}:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+# (status, JSON body) of a GET
+def get(server, path):
+    try:
+        with urllib.request.urlopen(server + path) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_default_aoi_named_none():
+    assert coverage_api._aoi_name(None) is None
+    assert coverage_api._aoi_name(os.path.basename(config.aoi_file)) is None
+    with pytest.raises(ValueError):
+        coverage_api._aoi_name('nowhere.geojson')
+
+
+def test_satellites_checked():
+    assert coverage_api._satellites(None) is None
+    assert coverage_api._satellites(list(reversed(SENTINEL)) + SENTINEL[:1]) == tuple(SENTINEL)
+    with pytest.raises(ValueError):
+        coverage_api._satellites(['NOPE'])
+
+
+def test_result_matches_baseline(baseline):
+    result = coverage_api.coverage_result(DATE)
+    assert result['date'] == DATE.isoformat()
+    assert result['aoi'] == os.path.basename(config.aoi_file)
+    assert result['covered_area_km2'] == pytest.approx(baseline['combined_area_km2'], abs=AREA_TOLERANCE_KM2)
+    assert result['covered_percentage'] == pytest.approx(baseline['covered_percentage'], abs=0.01)
+    assert [row['frame_type'] for row in result['frame_summary']] == ['free', 'commercial']
+    assert sum(row['frames'] for row in result['satellites']) == sum(len(frames) for frames in baseline['frames'].values())
+    # Naming the default AOI reads the same cached result
+    assert coverage_api.coverage_result(DATE, os.path.basename(config.aoi_file)) is result
+
+
+def test_http(server, baseline):
+    status, payload = get(server, f'/coverage?date={DATE.isoformat()}&satellites={",".join(SENTINEL)}')
+    assert status == 200
+    assert {row['satellite'] for row in payload['satellites']} <= set(SENTINEL)
+    assert payload['covered_percentage'] <= baseline['covered_percentage'] + 0.01
+    assert get(server, f'/coverage?date={DATE.isoformat()}&satellites=NOPE')[0] == 400
+    assert get(server, f'/coverage?date={DATE.isoformat()}&aoi=nowhere.geojson')[0] == 400
+    assert get(server, '/coverage')[0] == 400
+    assert get(server, '/nothing')[0] == 404
+    status, payload = get(server, '/aois')
+    assert status == 200 and os.path.basename(config.aoi_file) in payload['aois']
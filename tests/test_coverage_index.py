@@ -0,0 +1,71 @@
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+import coverage
+import coverage_index
+from conftest import AREA_TOLERANCE_KM2, DATE
+
+
+@pytest.fixture(scope='module')
+def index_file(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('index') / 'coverage_index.sqlite')
+    coverage_index.build_index(DATE, DATE, index_file=path, log=lambda message: None)
+    return path
+
+
+def test_index_is_current(index_file):
+    assert coverage_index.index_is_current(index_file)
+    assert not coverage_index.index_is_current(index_file, backend='raster')
+    assert coverage_index.lookup_day(DATE + timedelta(days=1), index_file) is None
+
+
+# The index stores compute_day's result with the default (memoizing) backend as is
+def test_lookup_matches_compute_day(index_file, aoi, sentinel_data, landsat_data, daily_data):
+    day = coverage.compute_day(aoi, sentinel_data, landsat_data, daily_data, DATE, backend=coverage.CoverageAccumulator())
+    indexed = coverage_index.lookup_day(DATE, index_file)
+    for key in ['original_area_km2', 'free_area_km2', 'commercial_area_km2', 'combined_area_km2',
+                'residual_area_km2', 'covered_percentage']:
+        assert indexed[key] == pytest.approx(day[key], abs=1e-6), key
+    assert (indexed['free_frames'], indexed['commercial_frames']) == (day['free_frames'], day['commercial_frames'])
+    pd.testing.assert_frame_equal(indexed['satellites'], day['satellites'], check_dtype=False)
+    np.testing.assert_allclose(indexed['frames']['area_km2'], day['frames']['area_km2'])
+    assert list(indexed['frames']['timestamp']) == list(day['frames']['timestamp'])
+
+
+def test_lookup_matches_baseline(index_file, baseline):
+    indexed = coverage_index.lookup_day(DATE, index_file)
+    assert indexed['original_area_km2'] == pytest.approx(baseline['original_area_km2'], abs=AREA_TOLERANCE_KM2)
+    assert indexed['combined_area_km2'] == pytest.approx(baseline['combined_area_km2'], abs=AREA_TOLERANCE_KM2)
+    assert indexed['covered_percentage'] == pytest.approx(baseline['covered_percentage'], abs=0.01)
+    counts = indexed['satellites'].set_index('satellite')['frame_count'].to_dict()
+    assert counts == {satellite: len(frames) for satellite, frames in baseline['frames'].items()}
+
+
+# The per-satellite reports list the free Sentinel satellites only
+def test_export_reports_sentinel_rows(index_file, tmp_path):
+    written = coverage_index.export_csvs(str(tmp_path), index_file)
+    assert {os.path.basename(path) for path in written} >= {
+        'free_satellite_individual_coverage_august_2025.csv', 'satellite_coverage_areas_august_2025.csv',
+    }
+    sentinel = {sat_config['name'] for sat_config in config.satellite_configs}
+    for name in ['free_satellite_individual_coverage_august_2025.csv', 'satellite_coverage_areas_august_2025.csv']:
+        report = pd.read_csv(tmp_path / name)
+        assert set(report['Satellite']) == sentinel
+
+
+# A rebuild over another range drops the dates of the previous build
+def test_rebuild_drops_other_dates(tmp_path):
+    path = str(tmp_path / 'coverage_index.sqlite')
+    next_day = DATE + timedelta(days=1)
+    coverage_index.build_index(DATE, DATE, index_file=path, log=lambda message: None)
+    coverage_index.build_index(next_day, next_day, index_file=path, log=lambda message: None)
+    assert coverage_index.lookup_day(DATE, path) is None
+    assert coverage_index.lookup_day(next_day, path)['date'] == next_day
+    coverage_index.export_csvs(str(tmp_path), path)
+    report = pd.read_csv(tmp_path / 'all_satellite_combined_coverage_august_2025.csv')
+    assert list(report['Date']) == [next_day.isoformat()]
@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+import shapely
+
+import coverage_summary
+import data_store
+import footprint_catalog
+from conftest import DATE
+
+DATES = [DATE + timedelta(days=k) for k in range(-2, 3)]
+
+
+@pytest.fixture(scope='module')
+def catalog(sentinel_data, landsat_data):
+    return footprint_catalog.build_catalog(sentinel_data, landsat_data,
+                                           {selected_date: data_store.load_commercial_day(selected_date)
+                                            for selected_date in DATES})
+
+
+@pytest.fixture(scope='module')
+def expected(catalog, aoi):
+    return coverage_summary.CoverageSummary(catalog).summary(aoi, DATES[0], DATES[-1])
+
+
+def test_frames_match_baseline(catalog, aoi, baseline):
+    table = coverage_summary.CoverageSummary(catalog).summary(aoi, DATE, DATE).set_index('Satellite')
+    geometry = shapely.union_all(aoi.geometry.to_numpy())
+    for satellite, frames in baseline['frames'].items():
+        assert table.loc[satellite, 'Total Frames'] == frames.geometry.intersects(geometry).sum(), satellite
+    assert table.loc['ALL', 'AOI Covered (%)'] == pytest.approx(baseline['covered_percentage'], abs=0.5)
+
+
+# Growing the last range at either end gives the table of a fresh aggregation
+def test_extended_range_matches_rebuild(catalog, aoi, expected):
+    summary = coverage_summary.CoverageSummary(catalog)
+    summary.summary(aoi, DATE, DATE + timedelta(days=1))
+    table = summary.summary(aoi, DATES[0], DATES[-1])
+    assert summary.stats['extended'] == 1
+    pd.testing.assert_frame_equal(table, expected)
+
+
+# An aggregation interrupted mid-range leaves the last range intact
+def test_interrupted_aggregation(catalog, aoi, expected):
+    summary = coverage_summary.CoverageSummary(catalog)
+    summary.summary(aoi, DATE, DATE)
+
+    def progress(done, total):
+        if done == 2:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        summary.summary(aoi, DATES[0], DATES[-1], progress=progress)
+    pd.testing.assert_frame_equal(summary.summary(aoi, DATES[0], DATES[-1]), expected)
+
+
+# Day records and masks evicted from their LRUs are rebuilt on demand
+def test_bounded_caches(catalog, aoi, expected):
+    summary = coverage_summary.CoverageSummary(catalog, max_days=1, max_masks=1)
+    summary.summary(aoi, DATES[0], DATES[1])
+    summary.summary(aoi, DATES[3], DATES[4])
+    assert len(summary._days) == 1
+    assert len(summary._masks) <= max([1] + [len(record) for record in summary._days.values()])
+    pd.testing.assert_frame_equal(summary.summary(aoi, DATES[0], DATES[-1]), expected)
+    assert summary.stats['days'] == len(DATES) + 2
@@ -0,0 +1,45 @@
+from datetime import date, timedelta
+
+import pytest
+
+import cycle_projection
+from conftest import DATE, baseline_sentinel, frame_keys
+
+
+@pytest.fixture(scope='module')
+def projector(sentinel_data):
+    return cycle_projection.CycleProjector(sentinel_data)
+
+
+# Same reference-plan day and frames as the baseline, moved to the selected date
+def test_selections_match_baseline(projector, sentinel_data):
+    expected = baseline_sentinel(sentinel_data, DATE)
+    selections = projector.selections(DATE)
+    assert [satellite for satellite, *_ in selections] == list(expected)
+    for satellite, source, sensor, target_date, frames in selections:
+        expected_date, expected_frames = expected[satellite]
+        assert (source, target_date) == ('sentinel', expected_date)
+        assert frame_keys(frames['geometry']) == frame_keys(expected_frames.geometry), satellite
+        assert (frames['acquisition_date'].dt.date == DATE).all(), satellite
+
+
+# Dates before and long after the reference plans map onto the same cycle days
+@pytest.mark.parametrize('selected_date', [date(2024, 2, 29), date(2025, 7, 1), date(2026, 12, 31)])
+def test_selections_any_date(projector, sentinel_data, selected_date):
+    expected = baseline_sentinel(sentinel_data, selected_date)
+    for satellite, _, _, target_date, frames in projector.selections(selected_date):
+        assert target_date == expected[satellite][0]
+        assert frame_keys(frames['geometry']) == frame_keys(expected[satellite][1].geometry)
+
+
+# A range is the per-date selections in date order; a whole cycle uses every
+# reference-plan row once
+def test_project_range(projector):
+    start_date, end_date = DATE, DATE + timedelta(days=11)
+    projected = list(projector.project(start_date, end_date, satellites=['Sentinel-1A']))
+    assert [selected_date for selected_date, *_ in projected] == [start_date + timedelta(days=k) for k in range(12)]
+    for selected_date, satellite, sensor, target_date, frames in projected:
+        [(_, _, expected_sensor, expected_date, expected_frames)] = projector.selections(selected_date, ['Sentinel-1A'])
+        assert (sensor, target_date) == (expected_sensor, expected_date)
+        assert frame_keys(frames['geometry']) == frame_keys(expected_frames['geometry'])
+    assert sum(len(frames) for *_, frames in projected) == len(projector.frames['Sentinel-1A'])
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+import shapely
+
+import coverage
+import footprint_catalog
+from conftest import DATE, frame_keys
+
+
+@pytest.fixture(scope='module')
+def catalog(sentinel_data, landsat_data, daily_data):
+    return footprint_catalog.build_catalog(sentinel_data, landsat_data, {DATE: daily_data})
+
+
+def test_select_frames_match_coverage(catalog, sentinel_data, landsat_data, daily_data):
+    expected = coverage.select_frames(sentinel_data, landsat_data, daily_data, DATE)
+    selections = catalog.select_frames(DATE)
+    assert [selection[:4] for selection in selections] == [selection[:4] for selection in expected]
+    for (satellite, *_, frames), (*_, expected_frames) in zip(selections, expected):
+        assert frame_keys(frames['geometry']) == frame_keys(expected_frames['geometry']), satellite
+        assert sorted(frames['timestamp']) == sorted(expected_frames['timestamp']), satellite
+
+
+# Frames of DATE intersecting the AOI, per satellite, as the baseline selects them
+def test_query_matches_baseline(catalog, aoi, baseline):
+    geometry = shapely.union_all(aoi.geometry.to_numpy())
+    frames = catalog.query(DATE, aoi=aoi)
+    for satellite, expected in baseline['frames'].items():
+        expected = expected.geometry[expected.geometry.intersects(geometry)]
+        assert frame_keys(frames.loc[frames['satellite'] == satellite, 'geometry']) == frame_keys(expected), satellite
+    assert len(frames[frames['source'] == 'sentinel']) == 5
+
+
+def test_query_filters(catalog, aoi):
+    frames = catalog.query(DATE, aoi=aoi)
+    assert frame_keys(catalog.query(DATE, aoi=aoi, sources=['commercial'])['geometry']) == \
+        frame_keys(frames.loc[frames['source'] == 'commercial', 'geometry'])
+    assert set(catalog.query(DATE, aoi=aoi, satellites=['Sentinel-1C', 'LANDSAT-8'])['satellite']) == \
+        {'Sentinel-1C', 'LANDSAT-8'}
+    bbox = (36.0, 24.0, 40.0, 28.0)
+    in_bbox = catalog.query(DATE, aoi=aoi, bbox=bbox)
+    box = shapely.intersection(shapely.union_all(aoi.geometry.to_numpy()), shapely.box(*bbox))
+    assert frame_keys(in_bbox['geometry']) == frame_keys(frames.geometry[frames.geometry.intersects(box)])
+
+
+# A range query is the per-day queries one after the other
+def test_query_range(catalog, aoi):
+    end_date = DATE + timedelta(days=3)
+    frames = catalog.query(DATE, end_date, aoi=aoi)
+    days = pd.concat([catalog.query(DATE + timedelta(days=k), aoi=aoi) for k in range(4)], ignore_index=True)
+    assert list(frames['satellite']) == list(days['satellite'])
+    assert frame_keys(frames['geometry']) == frame_keys(days['geometry'])
+    assert set(frames['acquisition_date'].dt.date.dropna()) <= {DATE + timedelta(days=k) for k in range(4)}
+
+
+def test_compute_day_with_catalog(catalog, aoi, day):
+    indexed = coverage.compute_day(aoi, None, None, None, DATE, backend=coverage.VectorBackend(), catalog=catalog)
+    pd.testing.assert_frame_equal(indexed['satellites'], day['satellites'])
+    assert indexed['combined_area_km2'] == pytest.approx(day['combined_area_km2'], abs=1e-6)
@@ -0,0 +1,33 @@
+import geopandas as gpd
+import numpy as np
+import pytest
+import shapely
+
+import coverage
+from conftest import AREA_TOLERANCE_KM2
+
+
+# Per-frame areas of compute_day are the baseline's per-frame AOI intersections
+def test_frame_areas_match_baseline(day, baseline):
+    frames = day['frames']
+    for satellite, areas in baseline['frame_areas_km2'].items():
+        computed = frames.loc[frames['satellite'] == satellite, 'area_km2'].to_numpy()
+        np.testing.assert_allclose(np.sort(computed), np.sort(areas), rtol=1e-9, atol=1e-6, err_msg=satellite)
+
+
+def test_combined_area_matches_baseline(day, baseline):
+    assert day['original_area_km2'] == pytest.approx(baseline['original_area_km2'], abs=1e-6)
+    assert day['combined_area_km2'] == pytest.approx(baseline['combined_area_km2'], abs=AREA_TOLERANCE_KM2)
+    assert day['covered_percentage'] == pytest.approx(baseline['covered_percentage'], abs=0.01)
+
+
+# Missing, empty and invalid geometries get 0; each AOI polygon counts once
+def test_frame_areas_edge_cases():
+    aoi = gpd.GeoDataFrame(geometry=[shapely.box(40, 20, 41, 21), shapely.box(42, 20, 43, 21)], crs='EPSG:4326')
+    bowtie = shapely.Polygon([(40, 20), (41, 21), (41, 20), (40, 21)])
+    spanning = shapely.box(40.5, 20, 42.5, 21)
+    areas = coverage.frame_areas_km2(aoi, [None, shapely.Polygon(), bowtie, spanning, shapely.box(50, 20, 51, 21)])
+    assert list(areas[[0, 1, 2, 4]]) == [0.0, 0.0, 0.0, 0.0]
+    expected = coverage.area_km2([shapely.box(40.5, 20, 41, 21), shapely.box(42, 20, 42.5, 21)])
+    assert areas[3] == pytest.approx(expected)
+    assert len(coverage.frame_areas_km2(aoi, [])) == 0
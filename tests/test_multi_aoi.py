@@ -0,0 +1,58 @@
+import os
+
+import geopandas as gpd
+import numpy as np
+import pytest
+
+import config
+import coverage
+import footprint_catalog
+import multi_aoi
+from conftest import AREA_TOLERANCE_KM2, DATE
+
+AOI_FILES = [config.aoi_file, os.path.join(config.aoi_dir, 'aoi_2025-08-03.geojson')]
+
+
+@pytest.fixture(scope='module')
+def matrix():
+    return multi_aoi.coverage_matrix(AOI_FILES, DATE, DATE, workers=1, log=lambda message: None)
+
+
+def test_all_row_matches_baseline(matrix, baseline):
+    stem = os.path.splitext(os.path.basename(config.aoi_file))[0]
+    row = matrix[(matrix['aoi'] == stem) & (matrix['satellite'] == 'ALL')].iloc[0]
+    assert row['area_km2'] == pytest.approx(baseline['combined_area_km2'], abs=AREA_TOLERANCE_KM2)
+    assert row['percentage'] == pytest.approx(baseline['covered_percentage'], abs=0.01)
+
+
+# Each AOI's rows are compute_day's satellite unions and combined area for that AOI
+def test_matrix_matches_compute_day(matrix, sentinel_data, landsat_data, daily_data):
+    names, geoms = multi_aoi.load_aois(AOI_FILES)
+    catalog = footprint_catalog.build_catalog(sentinel_data, landsat_data, {DATE: daily_data})
+    for name, geom in zip(names, geoms):
+        day = coverage.compute_day(gpd.GeoDataFrame(geometry=[geom], crs='EPSG:4326'), None, None, None, DATE,
+                                   backend=coverage.VectorBackend(), catalog=catalog)
+        rows = matrix[matrix['aoi'] == name].set_index('satellite')
+        for sat in day['satellites'].itertuples(index=False):
+            area = rows.loc[sat.satellite, 'area_km2'] if sat.satellite in rows.index else 0.0
+            assert area == pytest.approx(sat.union_area_km2, abs=AREA_TOLERANCE_KM2), (name, sat.satellite)
+        assert rows.loc['ALL', 'area_km2'] == pytest.approx(day['combined_area_km2'], abs=AREA_TOLERANCE_KM2)
+
+
+# Evicting memoized unions does not change the rows
+def test_bounded_memo(sentinel_data, landsat_data, daily_data):
+    names, geoms = multi_aoi.load_aois(AOI_FILES)
+    catalog = footprint_catalog.build_catalog(sentinel_data, landsat_data, {DATE: daily_data})
+    unbounded = multi_aoi.date_rows(multi_aoi.AoiSet(names, geoms), catalog, DATE)
+    aois = multi_aoi.AoiSet(names, geoms, max_memo=1)
+    rows = multi_aoi.date_rows(aois, catalog, DATE)
+    assert len(aois._memo) == 1
+    assert [row[:5] for row in rows] == [row[:5] for row in unbounded]
+    np.testing.assert_allclose([row[5] for row in rows], [row[5] for row in unbounded])
+
+
+def test_load_aois_names():
+    names, geoms = multi_aoi.load_aois([AOI_FILES[1]], by_feature=True)
+    assert names[0] == 'aoi_2025-08-03:0' and len(names) == len(geoms)
+    with pytest.raises(ValueError):
+        multi_aoi.load_aois([AOI_FILES[1], AOI_FILES[1]])
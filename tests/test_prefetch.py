@@ -0,0 +1,91 @@
+import threading
+from datetime import date
+
+import pytest
+
+import prefetch
+
+
+# Compute function recording its calls; 'blocker' waits for the gate
+class Compute:
+    def __init__(self):
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.calls = []
+
+    def __call__(self, key, cancelled):
+        self.calls.append(key)
+        if key == 'blocker':
+            self.started.set()
+            self.gate.wait(5)
+            if cancelled():
+                raise prefetch.Cancelled()
+        return f'value of {key}'
+
+
+@pytest.fixture
+def prefetcher():
+    prefetcher = prefetch.Prefetcher(max_entries=4)
+    yield prefetcher
+    prefetcher.shutdown()
+
+
+# Keeps the single worker busy so the next jobs stay queued
+@pytest.fixture
+def busy(prefetcher):
+    compute = Compute()
+    prefetcher.schedule(['blocker'], compute, owner='busy')
+    compute.started.wait(5)
+    yield compute
+    compute.gate.set()
+
+
+def test_neighbour_dates():
+    assert prefetch.neighbour_dates(date(2025, 8, 1), first_date=date(2025, 8, 1), last_date=date(2025, 8, 31)) == [
+        date(2025, 8, 2), date(2025, 8, 3)]
+    assert prefetch.neighbour_dates(date(2025, 8, 20), count=1) == [date(2025, 8, 21), date(2025, 8, 19)]
+
+
+def test_scheduled_result_is_served(prefetcher):
+    compute = Compute()
+    compute.gate.set()
+    prefetcher.schedule(['a'], compute, owner='s1')
+    assert prefetcher.get('a', compute) == 'value of a'
+    assert compute.calls == ['a']
+    assert prefetcher.get('a', compute) == 'value of a'
+    assert prefetcher.stats['hits'] + prefetcher.stats['waits'] == 2
+
+
+# A job stays scheduled while any session still wants it
+def test_shared_job_cancelled_by_last_owner(prefetcher, busy):
+    prefetcher.schedule(['a'], busy, owner='s1')
+    prefetcher.schedule(['a'], busy, owner='s2')
+    assert prefetcher.stats['scheduled'] == 2
+    prefetcher.schedule(['b'], busy, owner='s1')
+    assert 'a' in prefetcher.status()['pending']
+    prefetcher.schedule([], busy, owner='s2')
+    assert 'a' not in prefetcher.status()['pending']
+    assert prefetcher.stats['cancelled'] == 1
+
+
+# A queued job is dropped and computed in the foreground instead of waited for
+def test_queued_job_computed_here(prefetcher, busy):
+    prefetcher.schedule(['a'], busy, owner='s1')
+    assert prefetcher.get('a', busy) == 'value of a'
+    assert prefetcher.stats['misses'] == 1
+    assert 'a' not in prefetcher.status()['pending']
+
+
+# A running job cancelled at a stage boundary is computed again here
+def test_cancelled_running_job(prefetcher, busy):
+    prefetcher.schedule([], busy, owner='busy')
+    busy.gate.set()
+    assert prefetcher.get('blocker', busy) == 'value of blocker'
+    assert busy.calls == ['blocker', 'blocker']
+
+
+def test_results_bounded(prefetcher):
+    compute = Compute()
+    for key in 'abcdef':
+        prefetcher.get(key, compute)
+    assert prefetcher.status()['ready'] == list('cdef')
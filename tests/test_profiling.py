@@ -0,0 +1,57 @@
+import time
+import tracemalloc
+
+import pytest
+
+import profiling
+
+
+@pytest.fixture(autouse=True)
+def clean_tracing():
+    yield
+    profiling.activate(None)
+    profiling._tracing_owners.clear()
+    if profiling._started_tracing:
+        tracemalloc.stop()
+        profiling._started_tracing = False
+
+
+def test_stages_nest_and_record():
+    profiler = profiling.activate(profiling.Profiler())
+    with profiling.stage('outer'):
+        with profiling.stage('inner'):
+            profiling.record('frames', 3)
+    assert [row['stage'] for row in profiler.stages] == ['outer / inner', 'outer']
+    assert list(profiler.stage_table()['stage']) == ['outer', '  inner']
+    assert profiler.counts == {'frames': 3}
+    profiling.activate(None)
+    assert not profiling.active()
+    assert profiling.stage('ignored') is profiling.stage('ignored')
+
+
+# tracemalloc runs while any session traces and stops after the last one
+def test_tracing_shared_by_sessions():
+    profiling.activate(profiling.Profiler(trace_memory=True), owner='a')
+    profiling.activate(profiling.Profiler(trace_memory=True), owner='b')
+    profiling.activate(None, owner='a')
+    assert tracemalloc.is_tracing()
+    profiling.activate(profiling.Profiler(), owner='b')
+    assert not tracemalloc.is_tracing()
+
+
+# A session that stopped rerunning (closed tab) does not keep tracing on
+def test_stale_owner_expires():
+    profiling.activate(profiling.Profiler(trace_memory=True), owner='closed')
+    profiling._tracing_owners['closed'] = time.monotonic() - profiling.TRACING_OWNER_TTL_S - 1
+    profiling.activate(profiling.Profiler(trace_memory=True), owner='open')
+    assert set(profiling._tracing_owners) == {'open'}
+    profiling.activate(None, owner='open')
+    assert not tracemalloc.is_tracing()
+
+
+def test_traced_peak_recorded():
+    profiler = profiling.activate(profiling.Profiler(trace_memory=True), owner='a')
+    with profiling.stage('allocate'):
+        data = [bytes(1024) for _ in range(1024)]
+    assert len(data) == 1024
+    assert profiler.stages[0]['traced_peak_mib'] >= 1.0
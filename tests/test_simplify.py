@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+
+import geopandas as gpd
+import pytest
+
+import config
+import coverage
+import data_store
+import simplify
+from conftest import DATE
+
+AOI_FILES = [config.aoi_file, os.path.join(config.aoi_dir, 'aoi_2025-08-03.geojson')]
+
+
+# Versions of the two AOI files written to a scratch directory
+@pytest.fixture(scope='module')
+def simplified_dir(tmp_path_factory):
+    simplified_dir = str(tmp_path_factory.mktemp('simplified'))
+    manifest = {data_store.store_key(path): simplify.simplify_file('aoi', path, simplified_dir) for path in AOI_FILES}
+    with open(os.path.join(simplified_dir, data_store.SIMPLIFIED_MANIFEST), 'w') as f:
+        json.dump(manifest, f)
+    return simplified_dir
+
+
+def _area_km2(path):
+    gdf = gpd.read_parquet(path) if path.endswith('.parquet') else data_store.read_geojson(path)
+    return gdf.to_crs(coverage.AREA_CRS).area.sum() / 1_000_000
+
+
+# Every version's area is within its recorded error of the original's
+def test_version_errors(simplified_dir):
+    for path in AOI_FILES:
+        entry = data_store.simplified_manifest(simplified_dir)[data_store.store_key(path)]
+        assert entry['versions']
+        original = _area_km2(path)
+        for version in entry['versions']:
+            area = _area_km2(os.path.join(simplified_dir, version['file']))
+            assert abs(area - original) <= version['area_error_km2'] + 1e-6, version['file']
+
+
+# The chosen versions' summed error stays within the budget and coarsens as it grows
+@pytest.mark.parametrize('tolerance_km2', [0.0, 1.0, 5.0, 50.0, 500.0])
+def test_choice_within_budget(simplified_dir, tolerance_km2):
+    chosen = data_store.simplified_choice(tolerance_km2, simplified_dir)
+    assert sum(version['area_error_km2'] for version in chosen.values()) <= tolerance_km2
+    coarser = data_store.simplified_choice(tolerance_km2 * 2 + 1, simplified_dir)
+    for key, version in chosen.items():
+        assert coarser[key]['tolerance_deg'] >= version['tolerance_deg']
+    assert bool(chosen) == (tolerance_km2 > 0)
+
+
+def test_simplified_version(simplified_dir):
+    chosen = data_store.simplified_choice(50.0, simplified_dir)
+    total = 0.0
+    for path in AOI_FILES:
+        version_file, error = data_store.simplified_version(path, 50.0, simplified_dir)
+        version = chosen[data_store.store_key(path)]
+        assert version_file == os.path.join(simplified_dir, version['file'])
+        assert error == version['area_error_km2']
+        total += error
+        assert data_store.simplified_version(path, 0.0, simplified_dir) == (path, 0.0)
+    assert total <= 50.0
+    commercial_file = config.commercial_file(DATE)
+    assert data_store.simplified_version(commercial_file, 50.0, simplified_dir) == (commercial_file, 0.0)
+
+
+# A file changed since its versions were written is read in full
+def test_changed_file_read_in_full(tmp_path):
+    path = str(tmp_path / 'aoi.geojson')
+    shutil.copy(config.aoi_file, path)
+    simplified_dir = str(tmp_path / 'simplified')
+    manifest = {data_store.store_key(path): simplify.simplify_file('aoi', path, simplified_dir)}
+    with open(os.path.join(simplified_dir, data_store.SIMPLIFIED_MANIFEST), 'w') as f:
+        json.dump(manifest, f)
+    assert data_store.simplified_version(path, 50.0, simplified_dir)[0] != path
+    with open(path, 'a') as f:
+        f.write('\n')
+    assert data_store.simplified_version(path, 50.0, simplified_dir) == (path, 0.0)
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+import shapely
+
+import config
+import data_store
+import tile_server
+from conftest import DATE
+
+ZOOM = 5
+
+
+@pytest.fixture
+def stamps(monkeypatch):
+    current = {'key': 'a' * 16}
+    monkeypatch.setattr(tile_server, 'source_key', lambda selected_date: current['key'])
+    return current
+
+
+# The tile under a Sentinel frame of DATE inside the AOI
+@pytest.fixture(scope='module')
+def tile(day):
+    frames = day['frames']
+    aoi = shapely.union_all(data_store.load_aoi(config.aoi_file).geometry.to_numpy())
+    inside = shapely.intersection(frames.loc[frames['source'] == 'sentinel', 'geometry'].iloc[0], aoi)
+    xs, ys = tile_server.tile_range(shapely.point_on_surface(inside).bounds, ZOOM)
+    return ZOOM, xs[0], ys[0]
+
+
+def _date_dir(cache_dir):
+    return os.path.join(cache_dir, DATE.isoformat())
+
+
+def test_tile_cached(tmp_path, stamps, tile):
+    png = tile_server.get_tile(DATE, 'sentinel', *tile, cache_dir=str(tmp_path))
+    assert png.startswith(b'\x89PNG') and png != tile_server.EMPTY_TILE
+    path = os.path.join(_date_dir(tmp_path), 'all', 'sentinel', *map(str, tile)) + '.png'
+    with open(path, 'rb') as f:
+        assert f.read() == png
+    assert tile_server.get_tile(DATE, 'sentinel', *tile, cache_dir=str(tmp_path)) == png
+
+
+# A changed source stamp drops the date's tiles and in-memory layers, then serves again
+def test_changed_sources_drop_date_cache(tmp_path, stamps, tile):
+    png = tile_server.get_tile(DATE, 'residual', *tile, cache_dir=str(tmp_path))
+    stale = os.path.join(_date_dir(tmp_path), 'all', 'stale.png')
+    with open(stale, 'wb') as f:
+        f.write(b'stale')
+    stamps['key'] = 'b' * 16
+    assert tile_server.get_tile(DATE, 'residual', *tile, cache_dir=str(tmp_path)) == png
+    assert not os.path.exists(stale)
+    assert tile_server._cache_stamp(_date_dir(tmp_path)) == 'b' * 16
+    assert tile_server.get_tile(DATE, 'residual', *tile, cache_dir=str(tmp_path)) == png
+
+
+# A tile rendered while the sources change is served but not written to the new cache
+def test_tile_rendered_across_change_not_cached(tmp_path, stamps, tile, monkeypatch):
+    def render(selected_date, layer, z, x, y, excluded=frozenset()):
+        stamps['key'] = 'c' * 16
+        tile_server._check_date_cache(selected_date, str(tmp_path))
+        return b'old'
+
+    monkeypatch.setattr(tile_server, 'render_tile', render)
+    assert tile_server.get_tile(DATE, 'landsat', *tile, cache_dir=str(tmp_path)) == b'old'
+    assert not os.path.exists(os.path.join(_date_dir(tmp_path), 'all', 'landsat'))
+
+
+# Switched-off satellites are left out of the tiles and keyed in the cache and URLs
+def test_excluded_satellites(tmp_path, stamps, tile):
+    full = tile_server.get_tile(DATE, 'sentinel', *tile, cache_dir=str(tmp_path))
+    excluded = frozenset(sat_config['name'] for sat_config in config.satellite_configs)
+    assert tile_server.get_tile(DATE, 'sentinel', *tile, cache_dir=str(tmp_path), excluded=excluded) != full
+    assert os.path.isdir(os.path.join(_date_dir(tmp_path), tile_server.exclusion_key(excluded), 'sentinel'))
+    url = tile_server.tile_url(DATE, 'sentinel', ['Sentinel-2A', 'Sentinel-1A'])
+    assert url.endswith(f"?v={'a' * 16}&exclude=Sentinel-1A%2CSentinel-2A")
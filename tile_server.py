@@ -0,0 +1,350 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+import numpy as np
+import shapely
+
+import config
+import coverage
+import coverage_index
+import data_store
+import footprint_catalog
+
+# Local PNG tile server for the coverage map. Tiles are rasterized on request from
+# a date's coverage (the index when current, otherwise computed) and cached on disk
+# under <TILE_CACHE_DIR>/<date>/<satellites>/<layer>/<zoom>/<x>/<y>.png, where
+# <satellites> is 'all' or a key of the satellites switched off (their frames are
+# left out and the residual AOI is recomputed without them); a date's tiles are
+# dropped when the coverage sources change. Tile URLs carry the sources'
+# fingerprint (?v=) and the satellites switched off (&exclude=), so browsers may
+# cache them: a changed source or selection is a new URL. Each pixel is filled when
+# its center falls inside a footprint (shapely.contains_xy), and footprint outlines
+# are drawn white. Everything runs in-process: no external tile service or renderer.
+TILE_CACHE_DIR = os.path.join(config.base_dir, 'tile_cache')
+TILE_HOST = '127.0.0.1'
+TILE_PORT = 8765
+TILE_SIZE = 256
+MIN_ZOOM = 3
+MAX_ZOOM = 12
+
+# Layers served per date (frames are split by coverage.select_frames source)
+TILE_LAYERS = ['sentinel', 'landsat', 'commercial', 'residual']
+
+# Fill colors (RGB) per satellite; other (commercial) satellites get a stable palette color
+SATELLITE_COLORS = {
+    'Sentinel-1A': (0, 0, 255),
+    'Sentinel-1C': (255, 0, 0),
+    'Sentinel-2A': (0, 128, 0),
+    'Sentinel-2B': (128, 0, 128),
+    'Sentinel-2C': (255, 165, 0),
+    'LANDSAT-8': (0, 255, 255),
+    'LANDSAT-9': (255, 0, 255),
+}
+PALETTE = [(0, 100, 0), (165, 42, 42), (0, 0, 139), (139, 0, 0), (255, 192, 203), (128, 128, 128),
+           (173, 216, 230), (144, 238, 144), (245, 245, 220), (95, 158, 160)]
+RESIDUAL_COLOR = (255, 255, 0)
+FILL_ALPHA = {'residual': 77}
+DEFAULT_FILL_ALPHA = 128
+
+# Number of (date, satellites switched off) coverages kept in memory
+MAX_DAYS_IN_MEMORY = 8
+
+_TILE_PATH = re.compile(r'^/tiles/(\d{4}-\d{2}-\d{2})/([a-z]+)/(\d+)/(\d+)/(\d+)\.png$')
+
+_days = OrderedDict()
+_days_lock = threading.Lock()
+# Held while a date's cache directory is checked, dropped or written to
+_cache_lock = threading.Lock()
+_server = None
+
+
+# Fill color of a satellite
+def satellite_rgb(satellite):
+    if satellite in SATELLITE_COLORS:
+        return SATELLITE_COLORS[satellite]
+    return PALETTE[zlib.crc32(satellite.encode('utf-8')) % len(PALETTE)]
+
+
+# Encode an (h, w, 4) uint8 RGBA array as PNG (stdlib zlib, no imaging library)
+def encode_png(rgba):
+    height, width, _ = rgba.shape
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgba.reshape(height, width * 4)
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', zlib.compress(raw.tobytes(), 6)) + chunk(b'IEND', b''))
+
+
+EMPTY_TILE = encode_png(np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8))
+
+
+# Longitude/latitude bounds of a Web Mercator tile
+def tile_bounds(z, x, y):
+    n = 2 ** z
+    lon_min, lon_max = x / n * 360 - 180, (x + 1) / n * 360 - 180
+    lat_max = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y / n))))
+    lat_min = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + 1) / n))))
+    return lon_min, lat_min, lon_max, lat_max
+
+
+# Longitudes of pixel column centers and latitudes of pixel row centers of a tile
+def pixel_centers(z, x, y):
+    n = 2 ** z
+    offsets = (np.arange(TILE_SIZE) + 0.5) / TILE_SIZE
+    lons = (x + offsets) / n * 360 - 180
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + offsets) / n))))
+    return lons, lats
+
+
+# Range of tiles covering a lon/lat bounding box at a zoom level
+def tile_range(bounds, z):
+    lon_min, lat_min, lon_max, lat_max = bounds
+    n = 2 ** z
+
+    def tile_xy(lon, lat):
+        lat = np.radians(np.clip(lat, -85.0511, 85.0511))
+        tx = int((lon + 180) / 360 * n)
+        ty = int((1 - np.log(np.tan(lat) + 1 / np.cos(lat)) / np.pi) / 2 * n)
+        return min(max(tx, 0), n - 1), min(max(ty, 0), n - 1)
+
+    x0, y0 = tile_xy(lon_min, lat_max)
+    x1, y1 = tile_xy(lon_max, lat_min)
+    return range(x0, x1 + 1), range(y0, y1 + 1)
+
+
+# Cache directory name of a set of satellites switched off ('all' when none)
+def exclusion_key(excluded):
+    if not excluded:
+        return 'all'
+    return 'x-' + hashlib.sha256(json.dumps(sorted(excluded)).encode('utf-8')).hexdigest()[:12]
+
+
+# Geometries, colors and a spatial index per layer for a date without some
+# satellites (kept in a small LRU)
+def day_layers(selected_date, excluded=frozenset()):
+    key = (selected_date, frozenset(excluded))
+    with _days_lock:
+        if key in _days:
+            _days.move_to_end(key)
+            return _days[key]
+    day = coverage_index.load_day(selected_date)
+    if excluded:
+        counted = {satellite for satellite in day['satellites']['satellite'] if satellite not in excluded}
+        day = coverage.compute_day(data_store.load_aoi(config.aoi_file), None, None, None, selected_date,
+                                   satellites=counted, catalog=footprint_catalog.shared_catalog())
+    frames = day['frames']
+    layers = {}
+    for layer in TILE_LAYERS:
+        if layer == 'residual':
+            geoms = np.array([g for g in day['residual'] if g is not None and not g.is_empty], dtype=object)
+            colors = [RESIDUAL_COLOR] * len(geoms)
+        else:
+            selected = frames[(frames['source'] == layer) & frames.geometry.notna()]
+            geoms = selected.geometry.to_numpy()
+            colors = [satellite_rgb(satellite) for satellite in selected['satellite']]
+        shapely.prepare(geoms)
+        layers[layer] = {'geoms': geoms, 'colors': colors, 'tree': shapely.STRtree(geoms)}
+    with _days_lock:
+        _days[key] = layers
+        while len(_days) > MAX_DAYS_IN_MEMORY:
+            _days.popitem(last=False)
+    return layers
+
+
+# Pixels on the edge of a mask (set pixels with an unset 4-neighbour inside the tile)
+def _outline(mask):
+    padded = np.pad(mask, 1, mode='edge')
+    interior = padded[:-2, 1:-1] & padded[2:, 1:-1] & padded[1:-1, :-2] & padded[1:-1, 2:]
+    return mask & ~interior
+
+
+# Rasterize one layer of a date into a PNG tile
+def render_tile(selected_date, layer, z, x, y, excluded=frozenset()):
+    layers = day_layers(selected_date, excluded)
+    data = layers[layer]
+    candidates = data['tree'].query(shapely.box(*tile_bounds(z, x, y)))
+    if len(candidates) == 0:
+        return EMPTY_TILE
+    lons, lats = pixel_centers(z, x, y)
+    rgba = np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+    edges = np.zeros((TILE_SIZE, TILE_SIZE), dtype=bool)
+    alpha = FILL_ALPHA.get(layer, DEFAULT_FILL_ALPHA)
+    for k in np.sort(candidates):
+        geom = data['geoms'][k]
+        minx, miny, maxx, maxy = geom.bounds
+        cols = np.flatnonzero((lons >= minx) & (lons <= maxx))
+        rows = np.flatnonzero((lats >= miny) & (lats <= maxy))
+        if len(cols) == 0 or len(rows) == 0:
+            continue
+        window = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+        mask = np.zeros((TILE_SIZE, TILE_SIZE), dtype=bool)
+        mask[window] = shapely.contains_xy(geom, lons[window[1]][None, :], lats[window[0]][:, None])
+        rgba[mask] = (*data['colors'][k], alpha)
+        edges |= _outline(mask)
+    rgba[edges] = (255, 255, 255, 255)
+    return encode_png(rgba) if rgba[..., 3].any() else EMPTY_TILE
+
+
+# Fingerprint of the coverage sources of a date (tiles are rebuilt when it changes)
+def source_key(selected_date):
+    stamps = coverage_index.source_stamps([selected_date])
+    return hashlib.sha256(json.dumps(stamps, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+# Sources' fingerprint a date's cached tiles were rendered from (None when none are)
+def _cache_stamp(date_dir):
+    stamp_file = os.path.join(date_dir, 'sources.txt')
+    if not os.path.exists(stamp_file):
+        return None
+    with open(stamp_file) as f:
+        return f.read()
+
+
+# Drop a date's cached tiles if they were rendered from other source files.
+# Returns the sources' fingerprint the date's cache now holds.
+def _check_date_cache(selected_date, cache_dir):
+    date_dir = os.path.join(cache_dir, selected_date.isoformat())
+    key = source_key(selected_date)
+    with _cache_lock:
+        stamp = _cache_stamp(date_dir)
+        if stamp == key:
+            return key
+        if stamp is not None:
+            shutil.rmtree(date_dir, ignore_errors=True)
+            with _days_lock:
+                for day_key in [day_key for day_key in _days if day_key[0] == selected_date]:
+                    del _days[day_key]
+        os.makedirs(date_dir, exist_ok=True)
+        with open(os.path.join(date_dir, 'sources.txt'), 'w') as f:
+            f.write(key)
+    return key
+
+
+# PNG bytes of a tile without some satellites, from the disk cache or rendered and cached
+def get_tile(selected_date, layer, z, x, y, cache_dir=TILE_CACHE_DIR, excluded=frozenset()):
+    if layer not in TILE_LAYERS:
+        raise ValueError(f"Unknown layer {layer!r}, expected one of {TILE_LAYERS}")
+    if not MIN_ZOOM <= z <= MAX_ZOOM:
+        return EMPTY_TILE
+    key = _check_date_cache(selected_date, cache_dir)
+    date_dir = os.path.join(cache_dir, selected_date.isoformat())
+    path = os.path.join(date_dir, exclusion_key(excluded), layer, str(z), str(x), f"{y}.png")
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    png = render_tile(selected_date, layer, z, x, y, excluded)
+    with _cache_lock:
+        # A tile rendered while the date's sources changed is served but not cached
+        if _cache_stamp(date_dir) == key:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(png)
+            os.replace(tmp_path, path)
+    return png
+
+
+# Render and cache every tile over the AOI for some dates and zoom levels
+def pregenerate(dates, zooms=range(MIN_ZOOM, 9), layers=TILE_LAYERS, cache_dir=TILE_CACHE_DIR, log=print):
+    bounds = shapely.total_bounds(data_store.load_aoi(config.aoi_file).geometry.to_numpy())
+    for selected_date in dates:
+        count = 0
+        for z in zooms:
+            xs, ys = tile_range(bounds, z)
+            for x in xs:
+                for y in ys:
+                    for layer in layers:
+                        get_tile(selected_date, layer, z, x, y, cache_dir)
+                        count += 1
+        log(f"{selected_date}: {count} tiles")
+
+
+# Map layer names (as shown in the layer control) of the tile layers
+LAYER_NAMES = {'sentinel': 'Sentinel', 'landsat': 'Landsat', 'commercial': 'Commercial', 'residual': 'AOI (Saudi Arabia EEZ)'}
+
+
+# URL template of a layer's tiles for folium.TileLayer, versioned by the sources'
+# fingerprint (see source_key) and without some satellites
+def tile_url(selected_date, layer, excluded=(), host=TILE_HOST, port=TILE_PORT, version=None):
+    url = (f"http://{host}:{port}/tiles/{selected_date.isoformat()}/{layer}/{{z}}/{{x}}/{{y}}.png"
+           f"?v={version or source_key(selected_date)}")
+    if excluded:
+        url += f"&exclude={quote(','.join(sorted(excluded)))}"
+    return url
+
+
+# Tile layers of a date without some satellites for map_render.build_map(mode='tiles')
+def tile_layers(selected_date, excluded=(), host=TILE_HOST, port=TILE_PORT):
+    version = source_key(selected_date)
+    return {LAYER_NAMES[layer]: tile_url(selected_date, layer, excluded, host, port, version) for layer in TILE_LAYERS}
+
+
+class TileHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        match = _TILE_PATH.match(url.path)
+        if match is None or match.group(2) not in TILE_LAYERS:
+            self.send_error(404)
+            return
+        try:
+            selected_date = date.fromisoformat(match.group(1))
+            z, x, y = (int(value) for value in match.group(3, 4, 5))
+            excluded = frozenset(s for s in parse_qs(url.query).get('exclude', [''])[-1].split(',') if s)
+            png = get_tile(selected_date, match.group(2), z, x, y, excluded=excluded)
+        except Exception as e:
+            self.send_error(500, str(e))
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(png)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        # The URL changes with the sources (?v=), so a cached tile is never stale
+        self.send_header('Cache-Control', 'max-age=3600')
+        self.end_headers()
+        self.wfile.write(png)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Start the tile server in a daemon thread (once per process); False if the port is taken
+def ensure_server(host=TILE_HOST, port=TILE_PORT):
+    global _server
+    with _days_lock:
+        if _server is not None:
+            return True
+        try:
+            _server = ThreadingHTTPServer((host, port), TileHandler)
+        except OSError:
+            return False
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve (or pre-generate) coverage map tiles')
+    parser.add_argument('--port', type=int, default=TILE_PORT)
+    parser.add_argument('--pregenerate', nargs=2, type=date.fromisoformat, metavar=('START', 'END'),
+                        help='Render every tile over the AOI for a date range and exit')
+    parser.add_argument('--max-zoom', type=int, default=8, help='Highest zoom level to pre-generate')
+    args = parser.parse_args()
+    if args.pregenerate:
+        pregenerate(coverage_index.date_range(*args.pregenerate), range(MIN_ZOOM, args.max_zoom + 1))
+    else:
+        print(f"Serving tiles on http://{TILE_HOST}:{args.port}/tiles/<date>/<layer>/<z>/<x>/<y>.png")
+        ThreadingHTTPServer((TILE_HOST, args.port), TileHandler).serve_forever()